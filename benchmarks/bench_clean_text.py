@@ -0,0 +1,56 @@
+"""clean_text 基准测试：逐条多次替换 vs 预编译单遍清理 vs 进程池批量清理
+
+运行：python benchmarks/bench_clean_text.py [文本条数]
+"""
+import re
+import sys
+import time
+from py_artisan.ai import text_utils
+
+def clean_text_multipass(text, remove_urls=True, remove_numbers=False, remove_punctuation=False):
+    """优化前的实现：每个规则一次 re.sub，模式字符串每次调用都查 re 缓存"""
+    if remove_urls:
+        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+    if remove_numbers:
+        text = re.sub(r'\d+', '', text)
+    if remove_punctuation:
+        text = re.sub(r'[^\w\s]', '', text)
+    return text.strip()
+
+def make_corpus(count):
+    return [
+        f"第{i}条评论：访问 https://example.com/item/{i}?ref=feed 查看详情，价格 {i % 997} 元！"
+        f" Item #{i} costs ${i % 97}.99, see http://shop.example.org/p/{i}."
+        for i in range(count)
+    ]
+
+def bench(name, fn, baseline=None):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    speedup = f"  x{baseline / elapsed:.2f}" if baseline else ""
+    print(f"{name:<28}{elapsed * 1000:10.1f} ms{speedup}")
+    return elapsed, result
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    corpus = make_corpus(count)
+    options = dict(remove_urls=True, remove_numbers=True, remove_punctuation=True)
+    print(f"{count} texts, all rules enabled")
+    
+    baseline, expected = bench("multi-pass clean_text", lambda: [clean_text_multipass(t, **options) for t in corpus])
+    _, result = bench("clean_text", lambda: [text_utils.clean_text(t, **options) for t in corpus], baseline)
+    assert result == expected
+    cleaner = text_utils.TextCleaner(**options)
+    _, result = bench("TextCleaner.clean_batch", lambda: cleaner.clean_batch(corpus), baseline)
+    assert result == expected
+    for workers in (2, 4):
+        _, result = bench(
+            f"clean_texts(workers={workers})",
+            lambda: list(text_utils.clean_texts(corpus, workers=workers, chunk_size=4096, **options)),
+            baseline
+        )
+        assert result == expected
+
+if __name__ == "__main__":
+    main()
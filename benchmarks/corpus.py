@@ -0,0 +1,75 @@
+"""基准测试用的合成语料
+
+语料按种子确定生成，同样的参数在任何机器上得到同样的文本，便于对比结果。
+"""
+import random
+from typing import List
+
+# 常用汉字区间
+_CJK_START, _CJK_END = 0x4E00, 0x9FA5
+_LATIN_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+SCRIPTS = ("latin", "cjk", "mixed")
+
+def _latin_sentence(rng: random.Random) -> str:
+    words = [
+        "".join(rng.choice(_LATIN_LETTERS) for _ in range(rng.randint(2, 10)))
+        for _ in range(rng.randint(6, 20))
+    ]
+    words[0] = words[0].capitalize()
+    if rng.random() < 0.2:
+        words.insert(rng.randrange(len(words)), f"https://example.com/{words[-1]}/{rng.randint(1, 9999)}")
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words)), str(rng.randint(0, 100000)))
+    return " ".join(words) + rng.choice([". ", "! ", "? ", ", "])
+
+def _cjk_sentence(rng: random.Random) -> str:
+    text = "".join(chr(rng.randint(_CJK_START, _CJK_END)) for _ in range(rng.randint(8, 40)))
+    if rng.random() < 0.2:
+        text += f"（详见 https://example.cn/{rng.randint(1, 9999)}）"
+    if rng.random() < 0.3:
+        text += str(rng.randint(0, 100000))
+    return text + rng.choice(["。", "！", "？", "，"])
+
+def make_text(size: int, script: str = "latin", seed: int = 0) -> str:
+    """
+    生成约 size 个字符的文本，段落之间以空行分隔
+    
+    Args:
+        size: 目标字符数
+        script: latin、cjk 或 mixed（句子级别混排）
+        seed: 随机种子
+        
+    Returns:
+        str: 长度恰好为 size 的文本
+    """
+    if script not in SCRIPTS:
+        raise ValueError(f"Unsupported script: {script}")
+    rng = random.Random(f"{script}:{seed}")
+    parts: List[str] = []
+    length = 0
+    while length < size:
+        for _ in range(rng.randint(3, 8)):
+            if script == "latin" or (script == "mixed" and rng.random() < 0.5):
+                sentence = _latin_sentence(rng)
+            else:
+                sentence = _cjk_sentence(rng)
+            parts.append(sentence)
+            length += len(sentence)
+        parts.append("\n\n")
+        length += 2
+    return "".join(parts)[:size]
+
+def make_corpus(count: int, size: int, script: str = "latin", seed: int = 0) -> List[str]:
+    """
+    生成 count 篇长度为 size 的文档
+    
+    Args:
+        count: 文档数
+        size: 每篇文档的字符数
+        script: latin、cjk 或 mixed
+        seed: 随机种子
+        
+    Returns:
+        List[str]: 文档列表
+    """
+    return [make_text(size, script, seed * 100003 + i) for i in range(count)]
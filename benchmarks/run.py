@@ -0,0 +1,239 @@
+"""基准测试套件：文本分割与清理、文件下载、OpenAI 客户端并发
+
+在仓库根目录运行：
+    python -m benchmarks.run                                  # 全部用例
+    python -m benchmarks.run --quick -k split                 # 小规模，只运行名称包含 split 的用例
+    python -m benchmarks.run --output results.json            # 保存结果
+    python -m benchmarks.run --save-baseline baseline.json    # 保存为基线
+    python -m benchmarks.run --baseline baseline.json --fail-on-regression
+
+每个用例先预热一次，再重复 repeat 次，以中位数比较。与基线比较时，中位数变慢超过
+--tolerance（默认 20%）记为退化。下载和 OpenAI 用例使用本地服务，不访问外网。
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from benchmarks.corpus import SCRIPTS, make_corpus, make_text
+from py_artisan.ai import text_utils
+from py_artisan.ai.openai_utils import OpenAIClient
+from py_artisan.testing.http_stub import OpenAIStubServer, RangeFileServer
+from py_artisan.utils.file_downloader import FileDownloader
+
+@dataclass
+class Case:
+    """一个基准用例，fn 为被计时的函数"""
+    name: str
+    fn: Callable[[], Any]
+    work: float = 0.0   # 每次调用处理的量，用于计算吞吐量
+    unit: str = ""      # work 的单位，如 MB、requests
+
+BENCHMARKS: List[Callable[[argparse.Namespace, ExitStack], Iterator[Case]]] = []
+
+def benchmark(fn):
+    """注册用例生成函数，生成函数可以通过 ExitStack 启动在用例结束后关闭的资源"""
+    BENCHMARKS.append(fn)
+    return fn
+
+@benchmark
+def bench_split_text(args, stack):
+    size = 200_000 if args.quick else 2_000_000
+    for script in SCRIPTS:
+        text = make_text(size, script)
+        yield Case(f"split_text/{script}", lambda text=text: text_utils.split_text(text, 2000, 200), size / 1e6, "MChars")
+        yield Case(
+            f"split_text_by_tokens/{script}",
+            lambda text=text: text_utils.split_text_by_tokens(text, 512, 64),
+            size / 1e6,
+            "MChars"
+        )
+
+@benchmark
+def bench_clean_text(args, stack):
+    count = 2_000 if args.quick else 20_000
+    for script in SCRIPTS:
+        corpus = make_corpus(count, 200, script)
+        yield Case(
+            f"clean_text/{script}",
+            lambda corpus=corpus: [text_utils.clean_text(text, remove_numbers=True) for text in corpus],
+            count,
+            "texts"
+        )
+        cleaner = text_utils.TextCleaner(remove_numbers=True, remove_punctuation=True)
+        yield Case(f"TextCleaner.clean_batch/{script}", lambda corpus=corpus: cleaner.clean_batch(corpus), count, "texts")
+
+@benchmark
+def bench_download(args, stack):
+    size = (8 if args.quick else 64) * 1024 * 1024
+    server = stack.enter_context(RangeFileServer({"/data.bin": os.urandom(size)}))
+    directory = stack.enter_context(tempfile.TemporaryDirectory())
+    output = os.path.join(directory, "data.bin")
+    session = FileDownloader.create_session()
+    stack.callback(session.close)
+    yield Case(
+        "download/single_stream",
+        lambda: FileDownloader.download(server.url("/data.bin"), output, chunk_size=256 * 1024, session=session),
+        size / 1e6,
+        "MB"
+    )
+    for workers in (4, 8):
+        yield Case(
+            f"download/segmented_{workers}",
+            lambda workers=workers: FileDownloader.download(
+                server.url("/data.bin"),
+                output,
+                max_workers=workers,
+                segment_size=size // (workers * 2),
+                chunk_size=256 * 1024,
+                session=session
+            ),
+            size / 1e6,
+            "MB"
+        )
+
+@benchmark
+def bench_openai_client(args, stack):
+    latency = 0.05
+    count = 32 if args.quick else 128
+    server = stack.enter_context(OpenAIStubServer(latency=latency))
+    client = OpenAIClient("benchmark", base_url=server.url("/v1"), pool_size=32)
+    stack.callback(client.session.close)
+    requests_list = [{"messages": [{"role": "user", "content": f"question {i}"}]} for i in range(count)]
+    for concurrency in (1, 8, 32):
+        if concurrency == 1 and not args.quick:
+            continue  # 串行用例耗时为 count * latency，只在小规模下运行
+        yield Case(
+            f"openai/chat_completion_many_c{concurrency}",
+            lambda concurrency=concurrency: client.chat_completion_many(requests_list, max_concurrency=concurrency),
+            count,
+            "requests"
+        )
+        yield Case(
+            f"openai/achat_completion_many_c{concurrency}",
+            lambda concurrency=concurrency: asyncio.run(client.achat_completion_many(requests_list, max_concurrency=concurrency)),
+            count,
+            "requests"
+        )
+    texts = [f"passage {i}" for i in range(count * 16)]
+    yield Case(
+        "openai/embeddings",
+        lambda: client.embeddings(texts, batch_size=64, max_concurrency=8),
+        len(texts),
+        "texts"
+    )
+
+def measure(case: Case, repeat: int) -> Dict[str, Any]:
+    """预热一次后重复计时"""
+    case.fn()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        case.fn()
+        times.append(time.perf_counter() - started)
+    median = statistics.median(times)
+    result = {
+        "median": median,
+        "min": min(times),
+        "max": max(times),
+        "mean": statistics.mean(times),
+        "repeat": repeat,
+    }
+    if case.work:
+        result["throughput"] = case.work / median
+        result["unit"] = f"{case.unit}/s"
+    return result
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """
+    与基线比较中位数
+    
+    Returns:
+        List[str]: 退化的用例名称
+    """
+    regressions = []
+    print(f"\n{'case':<44}{'baseline':>12}{'current':>12}{'ratio':>9}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<44}{'-':>12}{result['median'] * 1000:>10.2f}ms{'new':>9}")
+            continue
+        ratio = result["median"] / baseline[name]["median"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        elif ratio < 1 - tolerance:
+            flag = "  faster"
+        print(f"{name:<44}{baseline[name]['median'] * 1000:>10.2f}ms{result['median'] * 1000:>10.2f}ms{ratio:>9.2f}{flag}")
+    return regressions
+
+def _environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--filter", default="", help="只运行名称包含该字符串的用例")
+    parser.add_argument("--quick", action="store_true", help="使用小规模输入")
+    parser.add_argument("--repeat", type=int, default=None, help="重复次数，默认 5（--quick 时为 3）")
+    parser.add_argument("--output", help="把结果写入 JSON 文件")
+    parser.add_argument("--baseline", help="与基线 JSON 文件比较")
+    parser.add_argument("--save-baseline", help="把结果写为基线 JSON 文件")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="中位数允许变慢的比例")
+    parser.add_argument("--fail-on-regression", action="store_true", help="出现退化时返回非零状态")
+    args = parser.parse_args(argv)
+    repeat = args.repeat or (3 if args.quick else 5)
+    
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'case':<44}{'median':>12}{'min':>12}{'throughput':>20}")
+    for generate in BENCHMARKS:
+        with ExitStack() as stack:
+            for case in generate(args, stack):
+                if args.filter not in case.name:
+                    continue
+                result = measure(case, repeat)
+                results[case.name] = result
+                throughput = f"{result['throughput']:.1f} {result['unit']}" if "throughput" in result else ""
+                print(f"{case.name:<44}{result['median'] * 1000:>10.2f}ms{result['min'] * 1000:>10.2f}ms{throughput:>20}")
+    
+    report = {"environment": _environment(), "quick": args.quick, "results": results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("quick") != args.quick:
+            print("warning: baseline was recorded with a different --quick setting", file=sys.stderr)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            if args.fail_on_regression:
+                return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,27 @@
-"""AI 工具包模块"""
-from . import openai_utils
-from . import text_utils
-from .langchain import langchain_utils
+"""AI 工具包模块
 
-__all__ = ['openai_utils', 'text_utils'] 
\ No newline at end of file
+子模块在首次访问时才导入，只用到 text_utils 的程序不需要加载 requests、LangChain 等依赖。
+"""
+import importlib
+
+__all__ = ['openai_utils', 'text_utils', 'pipeline']
+
+_SUBMODULES = {
+    'openai_utils': '.openai_utils',
+    'text_utils': '.text_utils',
+    'pipeline': '.pipeline',
+    'response_cache': '.response_cache',
+    'embedding_store': '.embedding_store',
+    'langchain': '.langchain',
+    'langchain_utils': '.langchain.langchain_utils',
+}
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        module = importlib.import_module(_SUBMODULES[name], __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
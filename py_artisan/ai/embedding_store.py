@@ -0,0 +1,237 @@
+"""向量存储模块"""
+import os
+import json
+import hashlib
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+def content_key(text: str, namespace: str = "") -> int:
+    """
+    计算文本的64位内容哈希，作为向量的键
+    
+    Args:
+        text: 文本内容
+        namespace: 命名空间（如模型名称），不同模型的向量互不混用
+        
+    Returns:
+        int: 无符号64位整数
+    """
+    digest = hashlib.blake2b(f"{namespace}\n{text}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+class EmbeddingStore:
+    """
+    基于 numpy memmap 的 float32 向量存储，按内容哈希索引
+    
+    目录结构：
+        meta.json          维度、条数和容量
+        vectors.f32        向量，按写入顺序排列，容量按倍数增长
+        keys.u64           每行向量的键
+        index_keys.npy     排好序的键
+        index_rows.npy     与 index_keys 对应的行号
+        
+    打开时所有文件都以 memmap 方式映射，不会反序列化整个存储，
+    百万级向量的加载耗时与条数无关。查询先查最近写入的内存字典，
+    再在有序键上二分查找；flush 时只排序新写入的键，再按插入位置并入有序索引。
+    键为64位哈希，百万级条目的碰撞概率约为 1e-8。
+    """
+    
+    def __init__(self, path: str, dim: Optional[int] = None):
+        """
+        打开或创建向量存储
+        
+        Args:
+            path: 存储目录
+            dim: 向量维度，新建时可省略，首次写入时确定
+            
+        Examples:
+            >>> store = EmbeddingStore("~/.cache/py_artisan/embeddings")
+            >>> vectors = client.embeddings(chunks, store=store)
+        """
+        import numpy as np
+        
+        self.path = os.path.expanduser(path)
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending: Dict[int, int] = {}   # 尚未合并进有序索引的键 -> 行号
+        self._vectors = None
+        self._keys = None
+        self.count = 0
+        self.capacity = 0
+        self.dim = dim
+        
+        meta_path = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if dim is not None and dim != meta["dim"]:
+                raise ValueError(f"Store dimension is {meta['dim']}, got {dim}")
+            self.dim = meta["dim"]
+            self.count = meta["count"]
+            self.capacity = meta["capacity"]
+            self._map(self.capacity)
+        
+        self._index_keys = np.zeros(0, dtype=np.uint64)
+        self._index_rows = np.zeros(0, dtype=np.int64)
+        index_path = os.path.join(self.path, "index_keys.npy")
+        if os.path.exists(index_path):
+            self._index_keys = np.load(index_path, mmap_mode="r")
+            self._index_rows = np.load(os.path.join(self.path, "index_rows.npy"), mmap_mode="r")
+    
+    def _map(self, capacity: int) -> None:
+        """按容量映射向量和键文件，调用方需持有锁或处于初始化中"""
+        import numpy as np
+        
+        vectors_path = os.path.join(self.path, "vectors.f32")
+        keys_path = os.path.join(self.path, "keys.u64")
+        for file_path, size in ((vectors_path, capacity * self.dim * 4), (keys_path, capacity * 8)):
+            with open(file_path, "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)
+        self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._keys = np.memmap(keys_path, dtype=np.uint64, mode="r+", shape=(capacity,))
+        self.capacity = capacity
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def __contains__(self, key: int) -> bool:
+        return self._find(key) is not None
+    
+    @property
+    def vectors(self):
+        """全部向量的只读视图，形状为 (count, dim)"""
+        import numpy as np
+        
+        if self._vectors is None:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return self._vectors[:self.count]
+    
+    def _find(self, key: int) -> Optional[int]:
+        """查找键对应的行号"""
+        import numpy as np
+        
+        row = self._pending.get(key)
+        if row is not None:
+            return row
+        keys = self._index_keys
+        position = int(np.searchsorted(keys, np.uint64(key)))
+        if position < len(keys) and int(keys[position]) == key:
+            return int(self._index_rows[position])
+        return None
+    
+    def get(self, key: int):
+        """
+        读取单个向量
+        
+        Args:
+            key: 内容哈希
+            
+        Returns:
+            Optional[numpy.ndarray]: 向量，不存在时返回None
+        """
+        row = self._find(key)
+        return None if row is None else self._vectors[row]
+    
+    def get_many(self, keys: Sequence[int]) -> Tuple[List[Optional[int]], "object"]:
+        """
+        批量查找向量
+        
+        Args:
+            keys: 内容哈希列表
+            
+        Returns:
+            Tuple[List[Optional[int]], numpy.ndarray]: 每个键的行号（不存在为None）和对应向量矩阵，
+            不存在的键对应的行为0
+        """
+        import numpy as np
+        
+        rows = [self._find(key) for key in keys]
+        result = np.zeros((len(keys), self.dim or 0), dtype=np.float32)
+        found = [i for i, row in enumerate(rows) if row is not None]
+        if found:
+            result[found] = self._vectors[[rows[i] for i in found]]
+        return rows, result
+    
+    def add(self, keys: Sequence[int], vectors) -> None:
+        """
+        写入向量，已存在的键会被跳过
+        
+        Args:
+            keys: 内容哈希列表
+            vectors: 形状为 (len(keys), dim) 的向量
+        """
+        import numpy as np
+        
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(keys) == 0:
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            if vectors.shape != (len(keys), self.dim):
+                raise ValueError(f"Expected vectors of shape ({len(keys)}, {self.dim}), got {vectors.shape}")
+            
+            new = []
+            seen = set()
+            for i, key in enumerate(keys):
+                if key not in seen and self._find(key) is None:
+                    seen.add(key)
+                    new.append(i)
+            if not new:
+                return
+            if self.count + len(new) > self.capacity:
+                self._map(max(self.count + len(new), 2 * self.capacity, 1024))
+            
+            start = self.count
+            self._vectors[start:start + len(new)] = vectors[new]
+            self._keys[start:start + len(new)] = np.array([keys[i] for i in new], dtype=np.uint64)
+            for offset, i in enumerate(new):
+                self._pending[keys[i]] = start + offset
+            self.count += len(new)
+    
+    def flush(self) -> None:
+        """把数据写回磁盘，并把新写入的键合并进有序索引"""
+        import numpy as np
+        
+        with self._lock:
+            if self._vectors is None:
+                return
+            self._vectors.flush()
+            self._keys.flush()
+            if self._pending:
+                if len(self._index_keys) + len(self._pending) == self.count:
+                    # 只排序新写入的键，再按插入位置并入已有的有序索引，O(N + K log K)
+                    new_keys = np.fromiter(self._pending.keys(), dtype=np.uint64, count=len(self._pending))
+                    new_rows = np.fromiter(self._pending.values(), dtype=np.int64, count=len(self._pending))
+                    order = np.argsort(new_keys)
+                    positions = np.searchsorted(self._index_keys, new_keys[order])
+                    index_keys = np.insert(self._index_keys, positions, new_keys[order])
+                    index_rows = np.insert(self._index_rows, positions, new_rows[order])
+                else:
+                    # 索引与数据不一致（如索引文件丢失）时整体重建
+                    keys = np.asarray(self._keys[:self.count])
+                    index_rows = np.argsort(keys, kind="stable").astype(np.int64)
+                    index_keys = keys[index_rows]
+                for name, array in (("index_keys", index_keys), ("index_rows", index_rows)):
+                    tmp_path = os.path.join(self.path, f"{name}.tmp.npy")
+                    np.save(tmp_path, array)
+                    os.replace(tmp_path, os.path.join(self.path, f"{name}.npy"))
+                self._index_keys = np.load(os.path.join(self.path, "index_keys.npy"), mmap_mode="r")
+                self._index_rows = np.load(os.path.join(self.path, "index_rows.npy"), mmap_mode="r")
+                self._pending.clear()
+            
+            tmp_path = os.path.join(self.path, "meta.json.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"dim": self.dim, "count": self.count, "capacity": self.capacity}, f)
+            os.replace(tmp_path, os.path.join(self.path, "meta.json"))
+    
+    def close(self) -> None:
+        """写回数据"""
+        self.flush()
+    
+    def __enter__(self) -> "EmbeddingStore":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
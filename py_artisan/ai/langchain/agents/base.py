@@ -1,12 +1,225 @@
+import asyncio
+import functools
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Any
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, TimeoutError, wait
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional, Set, Tuple
 from py_artisan.ai.langchain.llm_facetory import LLMFactory
 
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _default_executor() -> ThreadPoolExecutor:
+    """所有 agent 共享的线程池，供默认的 arun 执行同步的 run"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="agent")
+    return _executor
+
+@dataclass
+class AgentResult:
+    """批量执行中单个输入的结果"""
+    index: int                              # 输入在批次中的序号
+    input: Any
+    output: Any = None
+    error: Optional[BaseException] = None   # 失败或超时时的异常
+    elapsed: float = 0.0                    # 耗时（秒）
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 class BaseAgent(ABC):
+    """
+    Agent 基类
+    
+    同一个 agent 的所有调用共享 self.llm。run_many/arun_many 并发处理一批输入，
+    按完成顺序返回结果，同时在途的调用数不超过 max_concurrency，输入按需读取，
+    因此可以是惰性的生成器。
+    """
+    
+    # 默认 arun 使用的执行器，None 表示使用共享线程池
+    executor: Optional[Executor] = None
+    
     def __init__(self, provider: str = None):
-        self.llm = LLMFactory.create_llm(provider)
+        self.llm = LLMFactory.get_or_create(provider)
     
     @abstractmethod
     def run(self, *args, **kwargs) -> Any:
         """执行 agent 的主要功能"""
-        pass
\ No newline at end of file
+        pass
+    
+    async def arun(self, *args, **kwargs) -> Any:
+        """
+        异步执行 agent 的主要功能
+        
+        默认在线程池中执行 run；LLM 支持原生异步调用（如 ainvoke）时子类可以覆盖此方法。
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor or _default_executor(),
+            functools.partial(self.run, *args, **kwargs)
+        )
+    
+    def run_many(
+        self,
+        inputs: Iterable[Any],
+        max_concurrency: int = 4,
+        timeout: Optional[float] = None,
+        return_exceptions: bool = True,
+        **kwargs
+    ) -> Iterator[AgentResult]:
+        """
+        在线程池中并发执行一批输入
+        
+        每个输入调用 run(input, **kwargs)。超时的输入立即返回 TimeoutError 结果，
+        但已经开始的 run 无法被中断，它所在的线程会在 run 返回后才空闲。
+        超时从 run 在工作线程中开始执行时计算，排队等待被占用线程的输入不会因此连带超时；
+        尚未开始的输入在开始后最迟 timeout 秒内被检查。提前停止迭代时，尚未开始的输入会被取消。
+        
+        Args:
+            inputs: 输入序列
+            max_concurrency: 同时在途的调用数
+            timeout: 每个输入从开始执行起的最长时间（秒），None表示不限制
+            return_exceptions: True 时失败作为结果返回，否则抛出第一个异常并取消其余输入
+            **kwargs: 传给 run 的其他参数
+            
+        Returns:
+            Iterator[AgentResult]: 按完成顺序返回的结果
+            
+        Examples:
+            >>> for result in agent.run_many(questions, max_concurrency=8, timeout=60):
+            ...     print(result.index, result.output if result.ok else result.error)
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        
+        items = enumerate(inputs)
+        pending: Dict[Future, Tuple[int, Any]] = {}
+        starts: Dict[int, float] = {}  # 输入开始执行的时间，由工作线程记录
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="agent")
+        
+        def call(index: int, item: Any) -> Any:
+            starts[index] = time.monotonic()
+            return self.run(item, **kwargs)
+        
+        def submit() -> bool:
+            for index, item in items:
+                future = executor.submit(call, index, item)
+                pending[future] = (index, item)
+                return True
+            return False
+        
+        try:
+            while len(pending) < max_concurrency and submit():
+                pass
+            while pending:
+                wait_time = None
+                if timeout is not None:
+                    started = [starts[index] for index, _ in pending.values() if index in starts]
+                    if len(started) < len(pending):
+                        # 排队中的输入开始后才有截止时间
+                        wait_time = timeout
+                    if started:
+                        remaining = max(0.0, min(started) + timeout - time.monotonic())
+                        wait_time = remaining if wait_time is None else min(wait_time, remaining)
+                done, _ = wait(pending, wait_time, FIRST_COMPLETED)
+                now = time.monotonic()
+                if timeout is not None:
+                    done |= {
+                        future for future, (index, _) in pending.items()
+                        if index in starts and now - starts[index] >= timeout
+                    }
+                
+                for future in done:
+                    index, item = pending.pop(future)
+                    start = starts.pop(index, now)
+                    if future.done():
+                        error = future.exception()
+                        output = None if error is not None else future.result()
+                    else:
+                        future.cancel()
+                        error, output = TimeoutError(f"Input {index} timed out after {timeout}s"), None
+                    if error is not None and not return_exceptions:
+                        raise error
+                    submit()
+                    yield AgentResult(index, item, output, error, now - start)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+    
+    async def arun_many(
+        self,
+        inputs: Iterable[Any],
+        max_concurrency: int = 4,
+        timeout: Optional[float] = None,
+        return_exceptions: bool = True,
+        **kwargs
+    ) -> AsyncIterator[AgentResult]:
+        """
+        异步并发执行一批输入
+        
+        每个输入调用 arun(input, **kwargs)，超时的输入返回 TimeoutError 结果。
+        原生异步的 arun 超时后会被取消；默认的 arun 在线程池中执行 run，
+        等待被取消后 run 仍会在后台线程中运行到返回为止，超时从调用 arun 时开始计算。
+        提前停止迭代或外层任务被取消时，所有在途的 arun 调用都会被取消（同样无法中断已开始的 run）。
+        
+        Args:
+            inputs: 输入序列
+            max_concurrency: 同时在途的调用数
+            timeout: 每个输入的最长时间（秒），None表示不限制
+            return_exceptions: True 时失败作为结果返回，否则抛出第一个异常并取消其余输入
+            **kwargs: 传给 arun 的其他参数
+            
+        Returns:
+            AsyncIterator[AgentResult]: 按完成顺序返回的结果
+            
+        Examples:
+            >>> async for result in agent.arun_many(questions, max_concurrency=16):
+            ...     results[result.index] = result.output
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        
+        items = enumerate(inputs)
+        pending: Set[asyncio.Future] = set()
+        
+        async def call(index: int, item: Any) -> AgentResult:
+            start = time.monotonic()
+            try:
+                output = await asyncio.wait_for(self.arun(item, **kwargs), timeout)
+            except asyncio.TimeoutError:
+                error = TimeoutError(f"Input {index} timed out after {timeout}s")
+                return AgentResult(index, item, error=error, elapsed=time.monotonic() - start)
+            except Exception as e:
+                return AgentResult(index, item, error=e, elapsed=time.monotonic() - start)
+            return AgentResult(index, item, output, elapsed=time.monotonic() - start)
+        
+        def submit() -> bool:
+            for index, item in items:
+                pending.add(asyncio.ensure_future(call(index, item)))
+                return True
+            return False
+        
+        try:
+            while len(pending) < max_concurrency and submit():
+                pass
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                for task in done:
+                    result = task.result()
+                    if result.error is not None and not return_exceptions:
+                        raise result.error
+                    submit()
+                    yield result
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
@@ -1,6 +1,14 @@
 """LangChain 工具模块"""
-from typing import List, Dict, Any, Optional
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Iterable, Optional
 from dataclasses import dataclass
+from py_artisan.ai.langchain.memory import ConversationMemory, Summarizer
+from py_artisan.ai.response_cache import ResponseCache, SqliteCacheStore, request_key
+from py_artisan.ai.text_utils import split_text
+from py_artisan.utils import metrics
+from py_artisan.utils.concurrent_utils import bounded_map
 
 @dataclass
 class ChainConfig:
@@ -9,6 +17,7 @@ class ChainConfig:
     temperature: float = 0.7
     max_tokens: int = 1000
     prompt_template: Optional[str] = None
+    history_max_tokens: Optional[int] = 4000  # 对话历史窗口的 token 预算，None表示不限制
 
 class BaseChain:
     """基础链式调用类"""
@@ -39,10 +48,36 @@ class BaseChain:
 class ConversationChain(BaseChain):
     """对话链"""
     
-    def __init__(self, config: Optional[ChainConfig] = None):
+    def __init__(self, config: Optional[ChainConfig] = None, summarizer: Optional[Summarizer] = None):
+        """
+        初始化对话链
+        
+        Args:
+            config: 链配置，如果为None则使用默认配置
+            summarizer: 把移出窗口的旧消息压缩为摘要的函数（可选）
+        """
         super().__init__(config)
-        self.history: List[Dict[str, str]] = []
+        self.memory = ConversationMemory(
+            max_tokens=self.config.history_max_tokens,
+            summarizer=summarizer
+        )
+    
+    @property
+    def history(self) -> ConversationMemory:
+        """
+        对话历史，支持 len()、迭代、下标访问、append(dict) 和 to_list()
+        
+        赋值一个字典列表会替换全部历史，例如 chain.history = []。
+        """
+        return self.memory
     
+    @history.setter
+    def history(self, messages: Iterable[Dict[str, str]]) -> None:
+        messages = list(messages)
+        self.memory.clear()
+        self.memory.extend(messages)
+    
+    @metrics.timed("conversation_chain")
     def run(self, input_text: str) -> str:
         """
         运行对话链
@@ -58,15 +93,175 @@ class ConversationChain(BaseChain):
             >>> response = chain.run("你好")
         """
         # TODO: 实现对话链逻辑
-        return "这是一个示例响应"
+        response = "这是一个示例响应"
+        self.memory.add_user_message(input_text)
+        self.memory.add_ai_message(response)
+        return response
     
     def clear_history(self):
         """清空对话历史"""
-        self.history.clear()
+        self.memory.clear()
+
+DEFAULT_MAP_PROMPT = "请总结以下内容的要点：\n\n{text}"
+DEFAULT_REDUCE_PROMPT = "请把以下几段摘要合并为一份完整的摘要：\n\n{text}"
+
+ProgressCallback = Callable[[str, int, int], None]
+
+@dataclass
+class DocumentChainStats:
+    """DocumentChain 单次运行的统计"""
+    chunks: int = 0             # 分割得到的文本段数
+    skipped: int = 0            # 作为近似重复跳过的文本段数
+    cache_hits: int = 0         # 命中缓存的 map/reduce 调用数
+    reduce_levels: int = 0      # 归约树的层数
+    split_time: float = 0.0
+    map_time: float = 0.0
+    reduce_time: float = 0.0
+    total_time: float = 0.0
 
 class DocumentChain(BaseChain):
-    """文档处理链"""
+    """
+    文档处理链，对长文档执行 map-reduce
     
+    文档先用 text_utils 分割，map 阶段在线程池中并发处理各段，
+    reduce 阶段每次合并 reduce_fan_in 个结果，逐层归约，层数随文档长度对数增长。
+    每次 map/reduce 的结果按输入内容写入缓存，失败后重跑只会计算缺失的部分。
+    默认缓存只在进程内有效，容量随文档段数扩大；需要在进程崩溃后续跑时传入 cache_path，
+    结果会同时写入 sqlite 文件。
+    未提供 map_fn、reduce_fn 和 llm 时，map 原样返回、reduce 按行拼接。
+    """
+    
+    def __init__(
+        self,
+        config: Optional[ChainConfig] = None,
+        map_fn: Optional[Callable[[str], str]] = None,
+        reduce_fn: Optional[Callable[[List[str]], str]] = None,
+        llm: Any = None,
+        max_workers: int = 4,
+        chunk_size: int = 2000,
+        chunk_overlap: int = 200,
+        reduce_fan_in: int = 4,
+        cache: Optional[ResponseCache] = None,
+        cache_path: Optional[str] = None,
+        cache_namespace: Optional[str] = None,
+        near_duplicate_threshold: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None
+    ):
+        """
+        初始化文档处理链
+        
+        Args:
+            config: 链配置，prompt_template 作为 map 提示词（包含 {text}）
+            map_fn: 处理单个文本段的函数（可选）
+            reduce_fn: 合并多个结果的函数（可选）
+            llm: LangChain LLM，未提供 map_fn/reduce_fn 时用它生成摘要（可选）
+            max_workers: 并发调用数
+            chunk_size: 每段最大长度
+            chunk_overlap: 相邻两段的重叠长度
+            reduce_fan_in: 每次合并的结果数，至少为2
+            cache: 保存部分结果的缓存，默认为进程内缓存
+            cache_path: 未提供 cache 时使用的 sqlite 持久化文件路径（可选）
+            cache_namespace: 缓存命名空间，默认由模型名、提示词以及 map_fn、reduce_fn 和 llm 的
+                限定名组成；函数同名但行为不同（如闭包捕获的参数不同）时需要显式指定
+            near_duplicate_threshold: 设置后跳过与已处理段近似重复的文本段（需要 numpy）
+            on_progress: 进度回调 (阶段, 已完成数, 总数)，阶段为 "map" 或 "reduce"
+            
+        Examples:
+            >>> chain = DocumentChain(llm=LLMFactory.get_or_create(), max_workers=8)
+            >>> summary = chain.run(long_text)
+            >>> chain.last_stats.map_time
+            >>> chain = DocumentChain(llm=llm, cache_path="~/.cache/py_artisan/chains.db")
+        """
+        super().__init__(config)
+        if reduce_fan_in < 2:
+            raise ValueError("reduce_fan_in must be at least 2")
+        
+        self.llm = llm
+        self.map_fn = map_fn or (self._llm_map if llm is not None else (lambda text: text))
+        self.reduce_fn = reduce_fn or (self._llm_reduce if llm is not None else "\n".join)
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.reduce_fan_in = reduce_fan_in
+        # 自建的缓存在 run 中按文档段数扩容，避免早期的 map 结果在长文档上被淘汰
+        self._owns_cache = cache is None
+        if cache is None:
+            cache = ResponseCache(ttl=None, store=SqliteCacheStore(cache_path) if cache_path else None)
+        self.cache = cache
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.on_progress = on_progress
+        self.last_stats = DocumentChainStats()
+        self._stats_lock = threading.Lock()
+        # 缓存键包含模型、提示词以及处理函数，配置不同的链不会共享结果
+        self._namespace = cache_namespace or "\n".join([
+            self.config.model_name,
+            self.config.prompt_template or DEFAULT_MAP_PROMPT,
+            self._identity(self.map_fn),
+            self._identity(self.reduce_fn),
+            self._identity(llm)
+        ])
+    
+    @staticmethod
+    def _identity(obj: Any) -> str:
+        """函数或模型在进程之间稳定的标识：模块和限定名，模型再加上模型名"""
+        if obj is None:
+            return ""
+        target = getattr(obj, "__func__", obj)
+        if not hasattr(target, "__qualname__"):
+            target = type(obj)
+        name = f"{getattr(target, '__module__', None) or 'builtins'}.{target.__qualname__}"
+        model = getattr(obj, "model_name", None) or getattr(obj, "model", None)
+        return f"{name}:{model}" if isinstance(model, str) else name
+    
+    def _invoke(self, prompt: str) -> str:
+        result = self.llm.invoke(prompt)
+        return getattr(result, "content", result)
+    
+    def _llm_map(self, text: str) -> str:
+        template = self.config.prompt_template or DEFAULT_MAP_PROMPT
+        return self._invoke(template.format(text=text))
+    
+    def _llm_reduce(self, texts: List[str]) -> str:
+        return self._invoke(DEFAULT_REDUCE_PROMPT.format(text="\n\n".join(texts)))
+    
+    def _cached(self, stage: str, payload: Any, compute: Callable[[], str], stats: DocumentChainStats) -> str:
+        """读取部分结果缓存，未命中时计算并写入"""
+        key = request_key({"stage": stage, "input": payload}, namespace=self._namespace)
+        value = self.cache.get(key)
+        if value is not None:
+            with self._stats_lock:
+                stats.cache_hits += 1
+            return value
+        value = compute()
+        self.cache.set(key, value)
+        return value
+    
+    def _parallel(
+        self,
+        executor: ThreadPoolExecutor,
+        stage: str,
+        fn: Callable[[Any], str],
+        items: List[Any],
+        progress: List[int],
+        total: int
+    ) -> List[str]:
+        """并发执行并按输入顺序返回结果，同时汇报进度"""
+        results = []
+        for result in bounded_map(executor, fn, items, self.max_workers * 2):
+            results.append(result)
+            progress[0] += 1
+            if self.on_progress is not None:
+                self.on_progress(stage, progress[0], total)
+        return results
+    
+    def _dedupe(self, chunks: List[str]) -> List[str]:
+        """跳过近似重复的文本段"""
+        from py_artisan.ai.text_utils import MinHashIndex
+        
+        index = MinHashIndex(self.near_duplicate_threshold)
+        return [chunk for chunk in chunks if index.add_if_new(chunk)]
+    
+    @metrics.timed("document_chain")
     def run(self, input_text: str) -> str:
         """
         运行文档处理链
@@ -81,5 +276,73 @@ class DocumentChain(BaseChain):
             >>> chain = DocumentChain()
             >>> summary = chain.run("这是一个长文档...")
         """
-        # TODO: 实现文档处理链逻辑
-        return "这是文档处理的示例结果" 
\ No newline at end of file
+        stats = DocumentChainStats()
+        self.last_stats = stats
+        started = time.perf_counter()
+        
+        chunks = split_text(input_text, max_length=self.chunk_size, overlap=self.chunk_overlap)
+        stats.chunks = len(chunks)
+        if self.near_duplicate_threshold is not None and len(chunks) > 1:
+            unique = self._dedupe(chunks)
+            stats.skipped = len(chunks) - len(unique)
+            chunks = unique
+        stats.split_time = time.perf_counter() - started
+        if self._owns_cache:
+            # 归约树的节点数少于段数，两倍段数足以容纳本次运行的全部部分结果
+            self.cache.max_entries = max(self.cache.max_entries, 2 * len(chunks))
+        if not chunks:
+            stats.total_time = stats.split_time
+            return ""
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            stage_started = time.perf_counter()
+            results = self._parallel(
+                executor,
+                "map",
+                lambda chunk: self._cached("map", chunk, lambda: self.map_fn(chunk), stats),
+                chunks,
+                [0],
+                len(chunks)
+            )
+            stats.map_time = time.perf_counter() - stage_started
+            
+            # 归约树的总节点数：每层 ceil(n / fan_in)
+            total, count = 0, len(results)
+            while count > 1:
+                count = -(-count // self.reduce_fan_in)
+                total += count
+            
+            stage_started = time.perf_counter()
+            progress = [0]
+            while len(results) > 1:
+                groups = [
+                    results[i:i + self.reduce_fan_in]
+                    for i in range(0, len(results), self.reduce_fan_in)
+                ]
+                results = self._parallel(
+                    executor,
+                    "reduce",
+                    lambda group: group[0] if len(group) == 1 else self._cached(
+                        "reduce", group, lambda: self.reduce_fn(group), stats
+                    ),
+                    groups,
+                    progress,
+                    total
+                )
+                stats.reduce_levels += 1
+            stats.reduce_time = time.perf_counter() - stage_started
+        
+        stats.total_time = time.perf_counter() - started
+        self._record_metrics(stats)
+        return results[0]
+
+    @staticmethod
+    def _record_metrics(stats: DocumentChainStats) -> None:
+        """把单次运行的统计写入默认指标注册表"""
+        if not metrics.is_enabled():
+            return
+        metrics.inc("document_chain_chunks_total", stats.chunks)
+        metrics.inc("document_chain_skipped_chunks_total", stats.skipped)
+        metrics.inc("document_chain_cache_hits_total", stats.cache_hits)
+        for stage, seconds in (("split", stats.split_time), ("map", stats.map_time), ("reduce", stats.reduce_time)):
+            metrics.observe("document_chain_stage_seconds", seconds, stage=stage)
@@ -1,60 +1,312 @@
 """LLM Factory module"""
-from typing import Optional
-from langchain_openai import ChatOpenAI
-from langchain_community.llms import Ollama
-from langchain_community.chat_models import ChatOllama
-from langchain.callbacks.manager import CallbackManager
-from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
-from py_artisan.utils.config import Config
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from py_artisan.utils import metrics
+from py_artisan.utils.config import Config, Settings
+
+# Provider SDKs are imported inside the _create_* methods, so importing this
+# module (e.g. through BaseAgent) stays cheap until an LLM is actually built.
+
+# Settings read for each provider: (argument name, env var, description, parser[, default]).
+# Settings with a default are optional.
+PROVIDER_SETTINGS = {
+    'openai': (
+        ('api_key', 'OPENAI_API_KEY', 'OpenAI API Key', str),
+        ('model', 'OPENAI_API_MODEL', 'OpenAI model name', str),
+        ('temperature', 'OPENAI_TEMPERATURE', 'Temperature for OpenAI', float),
+        ('request_timeout', 'OPENAI_TIMEOUT', 'Timeout for OpenAI requests', int),
+    ),
+    'ollama': (
+        ('base_url', 'OLLAMA_BASE_URL', 'Ollama service URL', str),
+        ('model', 'OLLAMA_MODEL', 'Ollama model name', str),
+        ('temperature', 'OLLAMA_TEMPERATURE', 'Temperature for Ollama', float),
+    ),
+    'local': (
+        ('model_path', 'LOCAL_MODEL_PATH', 'Path to local model file', str),
+        ('temperature', 'LOCAL_MODEL_TEMPERATURE', 'Temperature for local model', float),
+        ('max_tokens', 'LOCAL_MODEL_MAX_TOKENS', 'Max tokens for local model', int),
+        ('n_ctx', 'LOCAL_MODEL_N_CTX', 'Context length per local model worker', int, 2048),
+        ('n_batch', 'LOCAL_MODEL_N_BATCH', 'Prompt batch size per local model worker', int, 512),
+        ('n_threads', 'LOCAL_MODEL_N_THREADS', 'Threads per local model worker', int, None),
+        ('workers', 'LOCAL_MODEL_WORKERS', 'Local model worker processes', int, 1),
+    ),
+}
+
+# Typed Settings getter for each parser; parsed values are memoized per snapshot
+_GETTERS = {str: Settings.get_str, int: Settings.get_int, float: Settings.get_float}
+
+RegistryKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
 
 class LLMFactory:
+    """
+    Build LLM instances and keep a registry of shared ones
+    
+    create_llm always builds a new instance. get_or_create returns the instance
+    registered for the provider and its resolved settings, building it once;
+    concurrent callers for the same key wait for that single construction
+    instead of loading a model twice.
+    """
+    
+    _registry: Dict[RegistryKey, Any] = {}
+    _key_locks: Dict[RegistryKey, threading.Lock] = {}
+    _lock = threading.Lock()
+    
     @staticmethod
-    def create_llm(provider: str = None):
-        """Create LLM instance"""
-        provider = provider or Config.get_env('LLM_PROVIDER', 'LLM provider (openai/ollama/local)')
+    def _resolve_provider(provider: Optional[str] = None) -> str:
+        """Resolve the provider name, falling back to LLM_PROVIDER"""
+        provider = provider or Config.settings().get_str('LLM_PROVIDER', description='LLM provider (openai/ollama/local)')
         provider = provider.lower()
+        if provider not in PROVIDER_SETTINGS:
+            raise ValueError(f"Unsupported LLM provider: {provider}")
+        return provider
+    
+    @staticmethod
+    def resolve_config(provider: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Read and parse the settings of a provider
+        
+        Values come from the current Config.settings() snapshot, whose typed
+        getters memoize the parsed values, so get_or_create does not re-read
+        and re-parse the environment on every call. Call Config.refresh()
+        after changing os.environ directly.
+        
+        Args:
+            provider: LLM provider (openai/ollama/local), defaults to LLM_PROVIDER
+            
+        Returns:
+            Dict[str, Any]: Parsed settings keyed by constructor argument name
+            
+        Raises:
+            ValueError: When the provider is unsupported or a setting is missing
+        """
+        provider = LLMFactory._resolve_provider(provider)
+        settings = Config.settings()
+        return {
+            name: _GETTERS[parse](settings, key, *default, description=description)
+            for name, key, description, parse, *default in PROVIDER_SETTINGS[provider]
+        }
+    
+    @staticmethod
+    @metrics.timed('llm_create')
+    def create_llm(provider: str = None, config: Optional[Dict[str, Any]] = None, sink: Any = None):
+        """
+        Create LLM instance
+        
+        When metrics are enabled the LLM also gets a MetricsHandler, so every
+        call reports its latency, first-token latency and token counts.
+        
+        Args:
+            provider: LLM provider (openai/ollama/local), defaults to LLM_PROVIDER
+            config: Resolved settings, read from the environment when omitted
+            sink: Streaming sink attached to an Ollama LLM, see _create_ollama_llm
+        """
+        provider = LLMFactory._resolve_provider(provider)
+        config = config if config is not None else LLMFactory.resolve_config(provider)
         
         if provider == 'openai':
-            return LLMFactory._create_openai_llm()
+            llm = LLMFactory._create_openai_llm(config)
         elif provider == 'ollama':
-            return LLMFactory._create_ollama_llm()
-        elif provider == 'local':
-            return LLMFactory._create_local_llm()
+            llm = LLMFactory._create_ollama_llm(config, sink)
         else:
-            raise ValueError(f"Unsupported LLM provider: {provider}")
+            llm = LLMFactory._create_local_llm(config)
+        
+        if metrics.is_enabled():
+            from py_artisan.ai.langchain.streaming import MetricsHandler
+            
+            llm.callbacks = list(llm.callbacks or []) + [MetricsHandler(provider)]
+        return llm
     
     @staticmethod
-    def _create_openai_llm():
+    def registry_key(provider: Optional[str] = None) -> RegistryKey:
+        """
+        Get the registry key for a provider and its current settings
+        
+        Args:
+            provider: LLM provider, defaults to LLM_PROVIDER
+            
+        Returns:
+            RegistryKey: (provider, sorted settings items)
+        """
+        provider = LLMFactory._resolve_provider(provider)
+        return provider, tuple(sorted(LLMFactory.resolve_config(provider).items()))
+    
+    @classmethod
+    def get_or_create(cls, provider: Optional[str] = None):
+        """
+        Get the shared LLM for a provider, building it on first use
+        
+        The key includes the resolved settings, so changing e.g. the model
+        name yields a different instance.
+        
+        Args:
+            provider: LLM provider (openai/ollama/local), defaults to LLM_PROVIDER
+            
+        Returns:
+            Shared LLM instance
+            
+        Examples:
+            >>> llm = LLMFactory.get_or_create('local')
+            >>> LLMFactory.get_or_create('local') is llm
+            True
+        """
+        key = cls.registry_key(provider)
+        llm = cls._registry.get(key)
+        if llm is not None:
+            metrics.inc('llm_registry_requests_total', result='hit')
+            return llm
+        
+        metrics.inc('llm_registry_requests_total', result='miss')
+        with cls._lock:
+            key_lock = cls._key_locks.setdefault(key, threading.Lock())
+        # Build outside the registry lock so other keys are not blocked
+        with key_lock:
+            llm = cls._registry.get(key)
+            if llm is None:
+                llm = cls.create_llm(key[0], dict(key[1]))
+                with cls._lock:
+                    cls._registry[key] = llm
+        return llm
+    
+    @classmethod
+    def evict(cls, provider: Optional[str] = None) -> int:
+        """
+        Remove shared LLMs from the registry
+        
+        Evicted LLMs backed by a LocalInferencePool have the pool closed, so its
+        worker processes stop; calls still holding such an LLM will fail.
+        
+        Args:
+            provider: Only evict instances of this provider, None evicts all
+            
+        Returns:
+            int: Number of evicted instances
+        """
+        with cls._lock:
+            keys = [
+                key for key in cls._registry
+                if provider is None or key[0] == provider.lower()
+            ]
+            evicted = [cls._registry.pop(key) for key in keys]
+            for key in keys:
+                cls._key_locks.pop(key, None)
+        # Close outside the registry lock, stopping workers can take a while
+        for llm in evicted:
+            pool = getattr(llm, 'pool', None)
+            if pool is not None and callable(getattr(pool, 'close', None)):
+                pool.close()
+        return len(keys)
+    
+    @classmethod
+    def _on_settings_changed(cls, changed, settings) -> None:
+        """Evict shared LLMs whose provider settings changed"""
+        for provider, entries in PROVIDER_SETTINGS.items():
+            if any(entry[1] in changed for entry in entries):
+                cls.evict(provider)
+    
+    @classmethod
+    def prewarm(cls, providers: Iterable[Optional[str]] = (None,), wait: bool = True) -> Optional[threading.Thread]:
+        """
+        Build shared LLMs ahead of time, e.g. at application startup
+        
+        Args:
+            providers: Providers to build, None stands for LLM_PROVIDER
+            wait: Block until built; otherwise build on a daemon thread
+            
+        Returns:
+            Optional[threading.Thread]: The background thread when wait is False
+            
+        Examples:
+            >>> LLMFactory.prewarm(['local'], wait=False)
+        """
+        providers: List[Optional[str]] = list(providers)
+        
+        def build():
+            for provider in providers:
+                cls.get_or_create(provider)
+        
+        if wait:
+            build()
+            return None
+        thread = threading.Thread(target=build, name='llm-prewarm', daemon=True)
+        thread.start()
+        return thread
+    
+    @staticmethod
+    def _create_openai_llm(config: Optional[Dict[str, Any]] = None):
         """Create OpenAI LLM"""
+        from langchain_openai import ChatOpenAI
+        
+        config = config or LLMFactory.resolve_config('openai')
         return ChatOpenAI(
-            api_key=Config.get_env('OPENAI_API_KEY', 'OpenAI API Key'),
-            model=Config.get_env('OPENAI_API_MODEL', 'OpenAI model name'),
-            temperature=float(Config.get_env('OPENAI_TEMPERATURE', 'Temperature for OpenAI')),
-            request_timeout=int(Config.get_env('OPENAI_TIMEOUT', 'Timeout for OpenAI requests'))
+            api_key=config['api_key'],
+            model=config['model'],
+            temperature=config['temperature'],
+            request_timeout=config['request_timeout']
         )
     
     @staticmethod
-    def _create_ollama_llm():
-        """Create Ollama LLM"""
-        callback_manager = CallbackManager([StreamingStdOutCallbackHandler()])
+    def _create_ollama_llm(config: Optional[Dict[str, Any]] = None, sink: Any = None):
+        """
+        Create Ollama LLM
+        
+        Tokens are streamed but not printed. Pass a sink to receive them for
+        every call on this instance, or pass sinks per call through
+        llm.invoke(..., config={'callbacks': [sink]}), which also works with
+        the shared instances returned by get_or_create.
+        
+        Args:
+            config: Resolved settings, read from the environment when omitted
+            sink: None, 'stdout', 'null' or a callback handler such as
+                streaming.QueueSink; 'stdout' restores printing every token
+        """
+        from langchain_community.chat_models import ChatOllama
+        from py_artisan.ai.langchain.streaming import resolve_sink
+        
+        config = config or LLMFactory.resolve_config('ollama')
+        handler = resolve_sink(sink)
         
         return ChatOllama(
-            base_url=Config.get_env('OLLAMA_BASE_URL', 'Ollama service URL'),
-            model=Config.get_env('OLLAMA_MODEL', 'Ollama model name'),
-            temperature=float(Config.get_env('OLLAMA_TEMPERATURE', 'Temperature for Ollama')),
-            callback_manager=callback_manager,
+            base_url=config['base_url'],
+            model=config['model'],
+            temperature=config['temperature'],
+            callbacks=[handler] if handler is not None else None,
             streaming=True
         )
     
     @staticmethod
-    def _create_local_llm():
-        """Create local LLM"""
+    def _create_local_llm(config: Optional[Dict[str, Any]] = None):
+        """
+        Create local LLM
+        
+        With LOCAL_MODEL_WORKERS above 1 the model runs in a LocalInferencePool
+        of worker processes sharing the memory-mapped model file, and the
+        returned LLM dispatches each call to the least-loaded worker.
+        """
+        config = config or LLMFactory.resolve_config('local')
+        workers = config.get('workers', 1)
+        if workers > 1:
+            from py_artisan.ai.langchain.local_pool import LocalInferencePool
+            
+            return LocalInferencePool(
+                config['model_path'],
+                workers=workers,
+                n_threads=config.get('n_threads'),
+                n_batch=config.get('n_batch', 512),
+                n_ctx=config.get('n_ctx', 2048),
+                temperature=config['temperature'],
+                max_tokens=config['max_tokens']
+            ).as_llm()
+        
         from langchain_community.llms import LlamaCpp
         
         return LlamaCpp(
-            model_path=Config.get_env('LOCAL_MODEL_PATH', 'Path to local model file'),
-            temperature=float(Config.get_env('LOCAL_MODEL_TEMPERATURE', 'Temperature for local model')),
-            max_tokens=int(Config.get_env('LOCAL_MODEL_MAX_TOKENS', 'Max tokens for local model')),
-            n_ctx=2048,
+            model_path=config['model_path'],
+            temperature=config['temperature'],
+            max_tokens=config['max_tokens'],
+            n_ctx=config.get('n_ctx', 2048),
+            n_batch=config.get('n_batch', 512),
+            n_threads=config.get('n_threads'),
             verbose=False
-        ) 
\ No newline at end of file
+        )
+
+Config.subscribe(LLMFactory._on_settings_changed)
@@ -0,0 +1,387 @@
+"""本地模型推理进程池模块"""
+import os
+import pickle
+import asyncio
+import itertools
+import threading
+import weakref
+import multiprocessing
+from multiprocessing import connection
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from langchain_core.language_models.llms import LLM
+
+_READY = "ready"
+
+def _create_llamacpp(**kwargs):
+    """默认的工作进程模型：以 mmap 方式加载模型文件的 LlamaCpp"""
+    from langchain_community.llms import LlamaCpp
+    
+    return LlamaCpp(use_mmap=True, verbose=False, **kwargs)
+
+def _portable_error(error: BaseException) -> BaseException:
+    """无法跨进程传递的异常转换为 RuntimeError"""
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+def _worker_main(index: int, factory: Callable[..., Any], model_kwargs: Dict[str, Any], tasks, results) -> None:
+    """工作进程入口：加载模型后循环处理请求，收到 None 时退出"""
+    try:
+        model = factory(**model_kwargs)
+    except BaseException as e:
+        results.send((_READY, index, _portable_error(e)))
+        return
+    results.send((_READY, index, None))
+    
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        request_id, prompt, kwargs = task
+        try:
+            results.send((request_id, model.invoke(prompt, **kwargs), None))
+        except Exception as e:
+            results.send((request_id, None, _portable_error(e)))
+
+def _shutdown(processes: List[Any], task_queues: List[Any], wakeup, timeout: float) -> None:
+    """停止工作进程，超时未退出的进程被终止，最后唤醒结果线程"""
+    for tasks in task_queues:
+        try:
+            tasks.put(None)
+        except Exception:
+            pass
+    for process in processes:
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+    try:
+        wakeup.send(None)
+    except OSError:
+        # 结果线程已经退出并关闭了读端
+        pass
+
+def _collect(pool_ref: "weakref.ref[LocalInferencePool]", wakeup) -> None:
+    """
+    在后台线程中接收工作进程的结果，并处理意外退出的进程
+    
+    同时等待各进程的结果管道和 sentinel。等待期间只持有推理池的弱引用，
+    推理池被回收时 finalizer 停止工作进程并通过 wakeup 让本线程退出。
+    """
+    while True:
+        pool = pool_ref()
+        if pool is None:
+            return
+        with pool._lock:
+            if pool._closed:
+                return
+            workers = [
+                (index, process, pool._connections[index])
+                for index, process in enumerate(pool._processes)
+                if pool._alive[index]
+            ]
+        del pool
+        waitables = {wakeup: None}
+        for worker in workers:
+            waitables[worker[2]] = worker
+            waitables[worker[1].sentinel] = worker
+        ready = connection.wait(list(waitables))
+        if wakeup in ready:
+            return
+        
+        pool = pool_ref()
+        if pool is None:
+            return
+        exited = []
+        for key in ready:
+            index, process, conn = waitables[key]
+            if key is conn:
+                try:
+                    pool._handle(conn.recv())
+                    continue
+                except (EOFError, OSError):
+                    pass
+            if (index, process) not in exited:
+                exited.append((index, process))
+        for index, process in exited:
+            # 先处理进程退出前已经发出的结果
+            conn = waitables[process.sentinel][2]
+            try:
+                while conn.poll():
+                    pool._handle(conn.recv())
+            except (EOFError, OSError):
+                pass
+            pool._worker_exited(index, process)
+        del pool
+
+class LocalInferencePool:
+    """
+    多进程本地推理池
+    
+    每个工作进程独立加载同一个模型文件。llama.cpp 以 mmap 方式读取权重，
+    各进程映射的是同一份页缓存，内存占用不会随进程数成倍增长。
+    请求被派发给在途请求最少的工作进程，每个进程同时只处理一个请求。
+    CPU 核心在进程间均分：n_threads 未指定时为 cpu_count // workers。
+    每个进程通过独立的管道返回结果，一个进程崩溃不会影响其他进程的结果通道。
+    工作进程意外退出（如崩溃或被 OOM 终止）时，派发给它的请求以 RuntimeError 结束，
+    并重新启动一个进程；加载模型期间退出的进程不再重启，请求改派给其余进程。
+    """
+    
+    def __init__(
+        self,
+        model_path: str,
+        workers: int = 2,
+        n_threads: Optional[int] = None,
+        n_batch: int = 512,
+        n_ctx: int = 2048,
+        worker_factory: Optional[Callable[..., Any]] = None,
+        mp_context: str = "spawn",
+        ready_timeout: Optional[float] = None,
+        respawn: bool = True,
+        **model_kwargs
+    ):
+        """
+        启动推理池并等待所有工作进程加载完模型
+        
+        Args:
+            model_path: 模型文件路径（GGUF）
+            workers: 工作进程数
+            n_threads: 每个进程的推理线程数，默认均分 CPU 核心
+            n_batch: 每个进程的 prompt 批大小
+            n_ctx: 每个进程的上下文长度
+            worker_factory: 在工作进程中构建模型的函数，接收模型参数，返回带 invoke 方法的对象；
+                必须可以被 pickle（模块级函数或类），默认构建 LlamaCpp
+            mp_context: 进程启动方式，默认 spawn，避免 fork 继承父进程中的线程和模型状态
+            ready_timeout: 等待模型加载的最长时间（秒），None表示不限制
+            respawn: 工作进程意外退出后是否重新启动
+            **model_kwargs: 传给模型的其他参数，如 temperature、max_tokens
+            
+        Raises:
+            ValueError: 任一工作进程加载模型失败
+            
+        Examples:
+            >>> with LocalInferencePool("models/qwen2-7b.gguf", workers=4, n_ctx=4096) as pool:
+            ...     answers = pool.map(prompts)
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if n_threads is None:
+            n_threads = max(1, (os.cpu_count() or 1) // workers)
+        
+        self.workers = workers
+        self.respawn = respawn
+        self.model_kwargs = dict(
+            model_path=model_path,
+            n_threads=n_threads,
+            n_batch=n_batch,
+            n_ctx=n_ctx,
+            **model_kwargs
+        )
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._futures: Dict[int, Tuple[Future, int]] = {}
+        self._loads = [0] * workers
+        self._ready: List[Optional[BaseException]] = [None] * workers
+        self._starting: Set[int] = set(range(workers))  # 尚未报告加载结果的进程
+        self._ready_event = threading.Event()
+        self._loaded = [False] * workers
+        self._alive = [True] * workers
+        self._closed = False
+        
+        self._context = multiprocessing.get_context(mp_context)
+        self._worker_factory = worker_factory or _create_llamacpp
+        self._task_queues = [self._context.Queue() for _ in range(workers)]
+        self._connections: List[Any] = [None] * workers
+        self._processes = [self._spawn(index, tasks) for index, tasks in enumerate(self._task_queues)]
+        wakeup, self._wakeup = self._context.Pipe(duplex=False)
+        # 后台线程只持有弱引用，不使用时推理池可以被回收
+        self._collector = threading.Thread(
+            target=_collect, args=(weakref.ref(self), wakeup), name="local-inference-results", daemon=True
+        )
+        self._collector.start()
+        self._finalizer = weakref.finalize(
+            self, _shutdown, self._processes, self._task_queues, self._wakeup, 5.0
+        )
+        
+        if not self._ready_event.wait(ready_timeout):
+            self.close()
+            raise ValueError(f"Workers did not load the model within {ready_timeout}s")
+        errors = [error for error in self._ready if error is not None]
+        if errors:
+            self.close()
+            raise ValueError(f"Failed to load model {model_path}: {errors[0]}") from errors[0]
+    
+    def _spawn(self, index: int, tasks) -> Any:
+        """启动一个工作进程，它的结果管道保存在 self._connections[index]"""
+        reader, writer = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, self._worker_factory, self.model_kwargs, tasks, writer),
+            name=f"local-inference-{index}",
+            daemon=True
+        )
+        process.start()
+        # 父进程不写入，关闭写端后进程退出时读端能收到 EOF
+        writer.close()
+        self._connections[index] = reader
+        return process
+    
+    def _handle(self, message: Tuple[Any, Any, Optional[BaseException]]) -> None:
+        """处理工作进程发来的一条消息，在结果线程中调用"""
+        request_id, value, error = message
+        if request_id == _READY:
+            with self._lock:
+                self._loaded[value] = error is None
+                if value in self._starting:
+                    self._ready[value] = error
+                    self._starting.discard(value)
+                    if not self._starting:
+                        self._ready_event.set()
+            return
+            
+        with self._lock:
+            entry = self._futures.pop(request_id, None)
+            if entry is None:
+                # 所在进程已被判定退出，请求已经以异常结束
+                return
+            future, index = entry
+            self._loads[index] -= 1
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+    
+    def _worker_exited(self, index: int, process: Any) -> None:
+        """
+        处理意外退出的工作进程，在结果线程中调用
+        
+        派发给该进程的请求以 RuntimeError 结束。加载成功过的进程在 respawn 时重新启动，
+        加载模型期间退出的进程不再重启，避免反复加载失败。
+        """
+        process.join()
+        with self._lock:
+            if self._closed or self._processes[index] is not process:
+                return
+            self._connections[index].close()
+            error = RuntimeError(f"Worker {index} exited unexpectedly with exit code {process.exitcode}")
+            failed = [request_id for request_id, (_, owner) in self._futures.items() if owner == index]
+            futures = [self._futures.pop(request_id)[0] for request_id in failed]
+            self._loads[index] = 0
+            
+            if index in self._starting:
+                self._ready[index] = error
+                self._starting.discard(index)
+                if not self._starting:
+                    self._ready_event.set()
+            if self.respawn and self._loaded[index]:
+                # 旧队列中可能残留已失败的请求，新进程使用新的队列
+                tasks = self._context.Queue()
+                self._task_queues[index] = tasks
+                self._loaded[index] = False
+                self._processes[index] = self._spawn(index, tasks)
+            else:
+                self._alive[index] = False
+        for future in futures:
+            future.set_exception(error)
+    
+    @property
+    def loads(self) -> List[int]:
+        """每个工作进程的在途请求数"""
+        with self._lock:
+            return list(self._loads)
+    
+    def submit(self, prompt: str, **kwargs) -> Future:
+        """
+        提交一个推理请求
+        
+        Args:
+            prompt: 提示文本
+            **kwargs: 传给模型 invoke 的参数，如 stop
+            
+        Returns:
+            Future: 结果为模型输出
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise ValueError("Pool is closed")
+            alive = [index for index in range(self.workers) if self._alive[index]]
+            if not alive:
+                raise ValueError("All workers have exited")
+            index = min(alive, key=self._loads.__getitem__)
+            request_id = next(self._ids)
+            self._futures[request_id] = (future, index)
+            self._loads[index] += 1
+            self._task_queues[index].put((request_id, prompt, kwargs))
+        return future
+    
+    def invoke(self, prompt: str, timeout: Optional[float] = None, **kwargs) -> Any:
+        """同步执行一个推理请求"""
+        return self.submit(prompt, **kwargs).result(timeout)
+    
+    def map(self, prompts: Sequence[str], timeout: Optional[float] = None, **kwargs) -> List[Any]:
+        """
+        并发执行一批推理请求
+        
+        Args:
+            prompts: 提示文本列表
+            timeout: 每个请求的最长等待时间（秒）
+            **kwargs: 传给模型 invoke 的参数
+            
+        Returns:
+            List[Any]: 与输入顺序一致的模型输出
+        """
+        futures = [self.submit(prompt, **kwargs) for prompt in prompts]
+        return [future.result(timeout) for future in futures]
+    
+    def as_llm(self) -> "PooledLLM":
+        """包装为 LangChain LLM，可以用在 BaseAgent 和各类链中"""
+        return PooledLLM(pool=self)
+    
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        停止所有工作进程，未完成的请求以异常结束
+        
+        Args:
+            timeout: 等待每个进程退出的时间（秒），超时后强制终止
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._finalizer.detach()
+        _shutdown(self._processes, self._task_queues, self._wakeup, timeout)
+        self._collector.join()
+        with self._lock:
+            futures = [future for future, _ in self._futures.values()]
+            self._futures.clear()
+        for future in futures:
+            future.set_exception(ValueError("Pool was closed before the request finished"))
+    
+    def __enter__(self) -> "LocalInferencePool":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class PooledLLM(LLM):
+    """把请求转发给 LocalInferencePool 的 LangChain LLM"""
+    
+    pool: Any
+    
+    def close(self) -> None:
+        """关闭底层的推理池"""
+        self.pool.close()
+    
+    @property
+    def _llm_type(self) -> str:
+        return "local_inference_pool"
+    
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> str:
+        return self.pool.invoke(prompt, stop=stop, **kwargs)
+    
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> str:
+        return await asyncio.wrap_future(self.pool.submit(prompt, stop=stop, **kwargs))
@@ -0,0 +1,265 @@
+"""对话记忆模块"""
+import threading
+from array import array
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+from py_artisan.ai.text_utils import TokenCounter, get_token_counter
+
+# 每条消息在 chat 格式中额外占用的 token 数（角色、分隔符等）
+MESSAGE_OVERHEAD_TOKENS = 4
+
+Summarizer = Callable[[Optional[str], List[Dict[str, str]]], str]
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _default_executor() -> ThreadPoolExecutor:
+    """所有会话共享的后台摘要线程池"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="memory-summarizer")
+    return _executor
+
+class Message:
+    """对话消息，使用 __slots__ 减少大量会话时的内存占用"""
+    
+    __slots__ = ("role", "content", "tokens")
+    
+    def __init__(self, role: str, content: str, tokens: int):
+        self.role = role
+        self.content = content
+        self.tokens = tokens
+    
+    def to_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+    
+    def __repr__(self) -> str:
+        return f"Message(role={self.role!r}, tokens={self.tokens})"
+
+class ConversationMemory:
+    """
+    带 token 预算的对话记忆
+    
+    每条消息的 token 数在写入时计算一次并保存在紧凑数组中，发送窗口随追加增量维护：
+    新消息加入后只需从窗口头部移出超出预算的旧消息，不会重新计算整段历史。
+    移出窗口的消息在配置了 summarizer 时于后台线程压缩为摘要，否则直接丢弃，
+    因此长时间运行的会话占用的内存有上限。摘要连续失败 max_summary_failures 次后，
+    等待压缩的消息也会被丢弃，避免积压无限增长。
+    
+    为兼容原先以字典列表保存的历史，append 也接受 {"role": ..., "content": ...} 字典，
+    to_list() 返回全部消息的字典列表。
+    """
+    
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        counter: Optional[TokenCounter] = None,
+        summarizer: Optional[Summarizer] = None,
+        summarize_after: int = 8,
+        executor: Optional[Executor] = None,
+        max_summary_failures: int = 3
+    ):
+        """
+        初始化对话记忆
+        
+        Args:
+            max_tokens: 窗口的 token 预算（含摘要），None表示不限制
+            counter: token计数器，默认使用 get_token_counter()
+            summarizer: 摘要函数 (旧摘要, 待压缩消息) -> 新摘要，None表示不生成摘要
+            summarize_after: 窗口外累积多少条消息后触发一次压缩
+            executor: 执行摘要的执行器，默认使用共享线程池
+            max_summary_failures: 摘要连续失败多少次后丢弃等待压缩的消息
+            
+        Examples:
+            >>> memory = ConversationMemory(max_tokens=2000, summarizer=summarize_with_llm)
+            >>> memory.append("user", "你好")
+            >>> messages = memory.window()
+        """
+        self.max_tokens = max_tokens
+        self.counter = counter
+        self.summarizer = summarizer
+        self.summarize_after = summarize_after
+        self.executor = executor
+        self.max_summary_failures = max_summary_failures
+        self.summary: Optional[Message] = None
+        self._messages: List[Message] = []
+        self._tokens = array("l")
+        self._start = 0           # 窗口中第一条消息的下标
+        self._window_tokens = 0   # 窗口中消息的 token 总数（不含摘要）
+        self._compacting: Optional[Future] = None
+        self._generation = 0      # clear 时递增，丢弃过期的压缩结果
+        self._failures = 0        # 连续摘要失败次数
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._messages)
+    
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter([message.to_dict() for message in self._messages])
+    
+    def __getitem__(self, index: int) -> Dict[str, str]:
+        return self._messages[index].to_dict()
+    
+    def _count(self, content: str) -> int:
+        counter = self.counter or get_token_counter()
+        return counter.count(content, cache=False) + MESSAGE_OVERHEAD_TOKENS
+    
+    @property
+    def window_tokens(self) -> int:
+        """当前窗口（含摘要）的 token 数"""
+        return self._window_tokens + (self.summary.tokens if self.summary else 0)
+    
+    @property
+    def total_tokens(self) -> int:
+        """保存的全部消息（含摘要）的 token 数"""
+        return sum(self._tokens) + (self.summary.tokens if self.summary else 0)
+    
+    def append(self, role: Union[str, Dict[str, str]], content: Optional[str] = None) -> None:
+        """
+        追加一条消息
+        
+        Args:
+            role: 角色（system/user/assistant），或 {"role": ..., "content": ...} 字典
+            content: 消息内容，role 为字典时省略
+            
+        Examples:
+            >>> memory.append("user", "你好")
+            >>> memory.append({"role": "assistant", "content": "你好！"})
+        """
+        if isinstance(role, dict):
+            role, content = role["role"], role["content"]
+        # 计数在锁外完成，避免阻塞同一会话的其他操作
+        message = Message(role, content, self._count(content))
+        with self._lock:
+            self._messages.append(message)
+            self._tokens.append(message.tokens)
+            self._window_tokens += message.tokens
+            self._shrink()
+            self._maybe_compact()
+    
+    def extend(self, messages: Iterable[Dict[str, str]]) -> None:
+        """依次追加多条字典格式的消息"""
+        for message in messages:
+            self.append(message)
+    
+    def to_list(self) -> List[Dict[str, str]]:
+        """
+        获取保存的全部消息
+        
+        Returns:
+            List[Dict[str, str]]: 尚未压缩的消息（不含摘要），窗口外的在前
+        """
+        with self._lock:
+            return [message.to_dict() for message in self._messages]
+    
+    def add_user_message(self, content: str) -> None:
+        """追加用户消息"""
+        self.append("user", content)
+    
+    def add_ai_message(self, content: str) -> None:
+        """追加助手消息"""
+        self.append("assistant", content)
+    
+    def _shrink(self) -> None:
+        """从窗口头部移出超出预算的消息，至少保留最新一条，调用方需持有锁"""
+        if self.max_tokens is None:
+            return
+        budget = self.max_tokens - (self.summary.tokens if self.summary else 0)
+        tokens = self._tokens
+        while self._window_tokens > budget and self._start < len(tokens) - 1:
+            self._window_tokens -= tokens[self._start]
+            self._start += 1
+        if self.summarizer is None and self._start:
+            # 没有摘要时窗口外的消息不再需要
+            self._drop(self._start)
+    
+    def _drop(self, count: int) -> None:
+        """删除最早的 count 条消息，调用方需持有锁"""
+        del self._messages[:count]
+        del self._tokens[:count]
+        self._start -= count
+    
+    def _maybe_compact(self) -> None:
+        """窗口外消息足够多时提交后台压缩，每个会话同时最多一个，调用方需持有锁"""
+        if self.summarizer is None or self._compacting is not None or self._start < self.summarize_after:
+            return
+        pending = self._messages[:self._start]
+        previous = self.summary.content if self.summary else None
+        executor = self.executor or _default_executor()
+        self._compacting = executor.submit(
+            self._compact,
+            previous,
+            [message.to_dict() for message in pending],
+            self._generation
+        )
+    
+    def _compact(self, previous: Optional[str], pending: List[Dict[str, str]], generation: int) -> None:
+        """在后台生成摘要并替换已压缩的消息"""
+        try:
+            content = self.summarizer(previous, pending)
+            summary = Message("system", content, self._count(content))
+        except Exception:
+            # 摘要失败时保留原消息，下次追加时重试；连续失败过多时丢弃这些消息
+            with self._lock:
+                if generation == self._generation:
+                    self._compacting = None
+                    self._failures += 1
+                    if self._failures >= self.max_summary_failures:
+                        self._failures = 0
+                        self._drop(len(pending))
+            raise
+        with self._lock:
+            if generation != self._generation:
+                # 压缩期间记忆被清空
+                return
+            self._compacting = None
+            self._failures = 0
+            self.summary = summary
+            self._drop(len(pending))
+            self._shrink()
+            self._maybe_compact()
+    
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """
+        等待后台压缩完成
+        
+        Args:
+            timeout: 每次压缩的最长等待时间（秒）
+        """
+        while True:
+            future = self._compacting
+            if future is None:
+                return
+            try:
+                future.result(timeout)
+            except Exception:
+                return
+    
+    def window(self) -> List[Dict[str, str]]:
+        """
+        获取在 token 预算内的消息窗口
+        
+        Returns:
+            List[Dict[str, str]]: 摘要（如有）加上最近的消息，可直接用作 chat messages
+        """
+        with self._lock:
+            messages = [message.to_dict() for message in self._messages[self._start:]]
+            if self.summary is not None:
+                messages.insert(0, self.summary.to_dict())
+            return messages
+    
+    def clear(self) -> None:
+        """清空消息和摘要"""
+        with self._lock:
+            if self._compacting is not None:
+                self._compacting.cancel()
+                self._compacting = None
+            self._generation += 1
+            self._failures = 0
+            self._messages.clear()
+            del self._tokens[:]
+            self._start = 0
+            self._window_tokens = 0
+            self.summary = None
@@ -0,0 +1,288 @@
+"""流式输出模块"""
+import sys
+import time
+import queue
+import asyncio
+from array import array
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, TextIO
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackHandler
+from py_artisan.utils import metrics
+
+class TokenTimings:
+    """
+    一次生成的 token 时间统计
+    
+    只保存相邻 token 的间隔，不保存 token 内容。
+    """
+    
+    def __init__(self):
+        self.start: Optional[float] = None
+        self.first_token: Optional[float] = None
+        self.last_token: Optional[float] = None
+        self.end: Optional[float] = None
+        self.gaps = array("d")   # 相邻 token 的间隔（秒）
+    
+    def reset(self) -> None:
+        self.__init__()
+    
+    def mark_start(self) -> None:
+        self.reset()
+        self.start = time.perf_counter()
+    
+    def mark_token(self) -> None:
+        now = time.perf_counter()
+        if self.start is None:
+            self.start = now
+        if self.first_token is None:
+            self.first_token = now
+        else:
+            self.gaps.append(now - self.last_token)
+        self.last_token = now
+    
+    def mark_end(self) -> None:
+        self.end = time.perf_counter()
+    
+    @property
+    def token_count(self) -> int:
+        return len(self.gaps) + 1 if self.first_token is not None else 0
+    
+    @property
+    def first_token_latency(self) -> Optional[float]:
+        """从开始生成到第一个 token 的时间（秒）"""
+        if self.first_token is None:
+            return None
+        return self.first_token - self.start
+    
+    @property
+    def max_gap(self) -> Optional[float]:
+        """最长的 token 间隔（秒）"""
+        return max(self.gaps) if self.gaps else None
+    
+    @property
+    def mean_gap(self) -> Optional[float]:
+        """平均 token 间隔（秒）"""
+        return sum(self.gaps) / len(self.gaps) if self.gaps else None
+    
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """首个 token 之后的生成速度"""
+        if not self.gaps:
+            return None
+        return len(self.gaps) / (self.last_token - self.first_token)
+    
+    def to_dict(self) -> dict:
+        return {
+            "token_count": self.token_count,
+            "first_token_latency": self.first_token_latency,
+            "mean_gap": self.mean_gap,
+            "max_gap": self.max_gap,
+            "tokens_per_second": self.tokens_per_second,
+        }
+
+class NullSink(BaseCallbackHandler):
+    """
+    丢弃 token 只记录时间统计的流式接收端，用于批处理任务
+    
+    Examples:
+        >>> sink = NullSink()
+        >>> llm.invoke(prompt, config={"callbacks": [sink]})
+        >>> sink.timings.first_token_latency
+    """
+    
+    def __init__(self):
+        self.timings = TokenTimings()
+    
+    def on_llm_start(self, serialized, prompts, **kwargs) -> None:
+        self.timings.mark_start()
+    
+    def on_chat_model_start(self, serialized, messages, **kwargs) -> None:
+        self.timings.mark_start()
+    
+    def on_llm_new_token(self, token: str, **kwargs) -> None:
+        self.timings.mark_token()
+    
+    def on_llm_end(self, response, **kwargs) -> None:
+        self.timings.mark_end()
+    
+    def on_llm_error(self, error: BaseException, **kwargs) -> None:
+        self.timings.mark_end()
+
+class StdOutSink(NullSink):
+    """把 token 写到标准输出，仅在显式指定时使用"""
+    
+    def __init__(self, stream: Optional[TextIO] = None):
+        super().__init__()
+        self.stream = stream
+    
+    def on_llm_new_token(self, token: str, **kwargs) -> None:
+        super().on_llm_new_token(token, **kwargs)
+        stream = self.stream or sys.stdout
+        stream.write(token)
+        stream.flush()
+
+_DONE = object()
+
+class _Error:
+    __slots__ = ("error",)
+    
+    def __init__(self, error: BaseException):
+        self.error = error
+
+class QueueSink(NullSink):
+    """
+    通过有界队列把 token 交给调用方的流式接收端
+    
+    队列满时生成 token 的线程会阻塞，消费方处理慢时生成也随之暂停。
+    一个接收端同一时间只用于一次生成；生成出错时迭代会抛出该异常。
+    
+    Examples:
+        >>> sink = QueueSink(maxsize=64)
+        >>> threading.Thread(target=llm.invoke, args=(prompt,), kwargs={"config": {"callbacks": [sink]}}).start()
+        >>> for token in sink:
+        ...     send(token)
+    """
+    
+    def __init__(self, maxsize: int = 256, timeout: Optional[float] = None):
+        """
+        初始化队列接收端
+        
+        Args:
+            maxsize: 队列中最多缓存的 token 数
+            timeout: 消费方等待下一个 token 的最长时间（秒），None表示不限制
+        """
+        super().__init__()
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize)
+        self.timeout = timeout
+    
+    def on_llm_new_token(self, token: str, **kwargs) -> None:
+        super().on_llm_new_token(token, **kwargs)
+        self.queue.put(token)
+    
+    def on_llm_end(self, response, **kwargs) -> None:
+        super().on_llm_end(response, **kwargs)
+        self.queue.put(_DONE)
+    
+    def on_llm_error(self, error: BaseException, **kwargs) -> None:
+        super().on_llm_error(error, **kwargs)
+        self.queue.put(_Error(error))
+    
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            item = self.queue.get(timeout=self.timeout)
+            if item is _DONE:
+                return
+            if isinstance(item, _Error):
+                raise item.error
+            yield item
+
+class AsyncQueueSink(AsyncCallbackHandler):
+    """
+    基于 asyncio.Queue 的流式接收端，配合 ainvoke/astream 使用
+    
+    队列满时生成协程会等待，消费方处理慢时生成也随之暂停。
+    
+    Examples:
+        >>> sink = AsyncQueueSink()
+        >>> task = asyncio.create_task(llm.ainvoke(prompt, config={"callbacks": [sink]}))
+        >>> async for token in sink:
+        ...     await websocket.send(token)
+    """
+    
+    def __init__(self, maxsize: int = 256):
+        """
+        初始化异步队列接收端
+        
+        Args:
+            maxsize: 队列中最多缓存的 token 数
+        """
+        self.queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize)
+        self.timings = TokenTimings()
+    
+    async def on_llm_start(self, serialized, prompts, **kwargs) -> None:
+        self.timings.mark_start()
+    
+    async def on_chat_model_start(self, serialized, messages, **kwargs) -> None:
+        self.timings.mark_start()
+    
+    async def on_llm_new_token(self, token: str, **kwargs) -> None:
+        self.timings.mark_token()
+        await self.queue.put(token)
+    
+    async def on_llm_end(self, response, **kwargs) -> None:
+        self.timings.mark_end()
+        await self.queue.put(_DONE)
+    
+    async def on_llm_error(self, error: BaseException, **kwargs) -> None:
+        self.timings.mark_end()
+        await self.queue.put(_Error(error))
+    
+    async def __aiter__(self) -> AsyncIterator[str]:
+        while True:
+            item = await self.queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Error):
+                raise item.error
+            yield item
+
+class MetricsHandler(BaseCallbackHandler):
+    """
+    把每次 LLM 调用的耗时、首 token 延迟和 token 用量写入默认指标注册表
+    
+    由 LLMFactory 在开启指标时挂载，可以同时服务多个并发调用。
+    """
+    
+    def __init__(self, provider: str):
+        self.provider = provider
+        self._runs: Dict[Any, List[Optional[float]]] = {}   # run_id -> [开始时间, 首个token时间]
+    
+    def _start(self, run_id: Any) -> None:
+        self._runs[run_id] = [time.perf_counter(), None]
+        metrics.add_gauge("llm_call_in_flight", 1, provider=self.provider)
+    
+    def on_llm_start(self, serialized, prompts, *, run_id=None, **kwargs) -> None:
+        self._start(run_id)
+    
+    def on_chat_model_start(self, serialized, messages, *, run_id=None, **kwargs) -> None:
+        self._start(run_id)
+    
+    def on_llm_new_token(self, token: str, *, run_id=None, **kwargs) -> None:
+        run = self._runs.get(run_id)
+        if run is not None and run[1] is None:
+            run[1] = time.perf_counter()
+            metrics.observe("llm_time_to_first_token_seconds", run[1] - run[0], provider=self.provider)
+    
+    def on_llm_end(self, response, *, run_id=None, **kwargs) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        metrics.add_gauge("llm_call_in_flight", -1, provider=self.provider)
+        metrics.observe("llm_call_seconds", time.perf_counter() - run[0], provider=self.provider)
+        usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+        for kind in ("prompt", "completion"):
+            if f"{kind}_tokens" in usage:
+                metrics.inc("llm_tokens_total", usage[f"{kind}_tokens"], provider=self.provider, kind=kind)
+    
+    def on_llm_error(self, error: BaseException, *, run_id=None, **kwargs) -> None:
+        if self._runs.pop(run_id, None) is None:
+            return
+        metrics.add_gauge("llm_call_in_flight", -1, provider=self.provider)
+        metrics.inc("llm_call_errors_total", provider=self.provider)
+
+def resolve_sink(sink: Any) -> Optional[BaseCallbackHandler]:
+    """
+    把 sink 参数转换为回调处理器
+    
+    Args:
+        sink: None、"stdout"、"null" 或回调处理器
+        
+    Returns:
+        Optional[BaseCallbackHandler]: 回调处理器，None表示不挂载
+    """
+    if sink is None or isinstance(sink, BaseCallbackHandler):
+        return sink
+    if sink == "stdout":
+        return StdOutSink()
+    if sink == "null":
+        return NullSink()
+    raise ValueError(f"Unsupported streaming sink: {sink!r}")
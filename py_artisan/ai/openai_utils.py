@@ -1,36 +1,433 @@
 """OpenAI API 工具模块"""
 import os
 import json
-from typing import List, Dict, Any, Optional
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Sequence, Union, Iterable, Iterator, AsyncIterator
 import requests
+from requests.adapters import HTTPAdapter
+from py_artisan.ai.response_cache import ResponseCache, request_key
+from py_artisan.utils import metrics
+
+if TYPE_CHECKING:
+    from py_artisan.ai.embedding_store import EmbeddingStore
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int = 0) -> int:
+    """
+    粗略估算一次请求消耗的token数
+    
+    ASCII 字符按 4 个字符 1 个token计算，其他字符（如中文）按 1 个字符 1 个token计算，
+    再加上最大生成token数。
+    
+    Args:
+        messages: 对话消息列表
+        max_tokens: 最大生成token数
+    
+    Returns:
+        int: 估算的token数
+    
+    Examples:
+        >>> estimate_tokens([{"role": "user", "content": "你好"}], max_tokens=100)
+        106
+    """
+    total = max_tokens
+    for message in messages:
+        content = message.get("content") or ""
+        ascii_count = sum(1 for ch in content if ord(ch) < 128)
+        total += ascii_count // 4 + (len(content) - ascii_count) + 4
+    return total
+
+class SSEParser:
+    """Server-Sent Events 增量解析器"""
+    
+    def __init__(self):
+        self._data: List[str] = []
+    
+    def feed_line(self, line: str) -> Optional[str]:
+        """
+        输入一行数据（不含换行符）
+        
+        Args:
+            line: SSE 响应中的一行
+        
+        Returns:
+            Optional[str]: 遇到空行时返回完整事件的 data 内容，否则返回None
+        """
+        if not line:
+            if not self._data:
+                return None
+            data = "\n".join(self._data)
+            self._data = []
+            return data
+        if line.startswith(":"):
+            # 注释行，通常用于保持连接
+            return None
+        field, _, value = line.partition(":")
+        if field == "data":
+            self._data.append(value[1:] if value.startswith(" ") else value)
+        return None
+
+def iter_sse_events(lines: Iterable[str]) -> Iterator[str]:
+    """
+    从行迭代器中解析 SSE 事件，遇到 [DONE] 结束
+    
+    Args:
+        lines: SSE 响应的行迭代器
+    
+    Returns:
+        Iterator[str]: 每个事件的 data 内容
+    
+    Examples:
+        >>> list(iter_sse_events([": ping", "data: {}", "", "data: [DONE]", ""]))
+        ['{}']
+    """
+    parser = SSEParser()
+    for line in lines:
+        data = parser.feed_line(line.rstrip("\r\n"))
+        if data is None:
+            continue
+        if data == "[DONE]":
+            return
+        yield data
+
+def _delta_content(data: str) -> str:
+    """从流式响应的 chunk 中取出增量文本"""
+    chunk = json.loads(data)
+    choices = chunk.get("choices") or []
+    if not choices:
+        return ""
+    return (choices[0].get("delta") or {}).get("content") or ""
+
+@dataclass
+class StreamMetrics:
+    """流式响应的延迟指标"""
+    started: float = 0.0
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    tokens: int = 0
+    
+    def record_token(self, now: float) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = now
+        self.tokens += 1
+    
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """首个token的延迟（秒）"""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+    
+    @property
+    def total_time(self) -> Optional[float]:
+        """从发送请求到接收完成的总时间（秒）"""
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started
+    
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """首个token之后的生成速度"""
+        if self.first_token_at is None or self.finished_at is None:
+            return None
+        elapsed = self.finished_at - self.first_token_at
+        if elapsed <= 0:
+            return None
+        return (self.tokens - 1) / elapsed if self.tokens > 1 else None
+
+def _record_stream(stream_metrics: StreamMetrics) -> None:
+    """把流式响应的延迟指标写入默认指标注册表"""
+    if not metrics.is_enabled():
+        return
+    metrics.inc("openai_stream_tokens_total", stream_metrics.tokens)
+    if stream_metrics.time_to_first_token is not None:
+        metrics.observe("openai_time_to_first_token_seconds", stream_metrics.time_to_first_token)
+    if stream_metrics.tokens_per_second is not None:
+        metrics.observe(
+            "openai_stream_tokens_per_second",
+            stream_metrics.tokens_per_second,
+            buckets=metrics.TOKENS_PER_SECOND_BUCKETS
+        )
+
+class ChatCompletionStream:
+    """
+    同步流式响应，迭代得到增量文本
+    
+    迭代结束后 metrics 中记录首token延迟与生成速度。
+    """
+    
+    def __init__(self, response: requests.Response, metrics: StreamMetrics, client: 'OpenAIClient'):
+        self.response = response
+        self.metrics = metrics
+        self._client = client
+    
+    def __iter__(self) -> Iterator[str]:
+        try:
+            lines = self.response.iter_lines(decode_unicode=True)
+            for data in iter_sse_events(line or "" for line in lines):
+                content = _delta_content(data)
+                if content:
+                    self.metrics.record_token(time.perf_counter())
+                    yield content
+        finally:
+            self.close()
+    
+    def __enter__(self) -> 'ChatCompletionStream':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """关闭连接并记录完成时间"""
+        if self.metrics.finished_at is None:
+            self.metrics.finished_at = time.perf_counter()
+            self._client.last_stream_metrics = self.metrics
+            _record_stream(self.metrics)
+        self.response.close()
+
+class AsyncChatCompletionStream:
+    """异步流式响应，使用 async for 迭代得到增量文本"""
+    
+    def __init__(self, client: 'OpenAIClient', data: Dict[str, Any], session: Any = None):
+        self._client = client
+        self._data = data
+        self._session = session
+        self.metrics = StreamMetrics()
+    
+    async def __aiter__(self) -> AsyncIterator[str]:
+        import aiohttp
+        
+        own_session = self._session is None
+        session = aiohttp.ClientSession() if own_session else self._session
+        url = f"{self._client.base_url}/chat/completions"
+        try:
+            if self._client.rate_limiter:
+                await self._client.rate_limiter.acquire_async(
+                    estimate_tokens(self._data["messages"], self._data["max_tokens"])
+                )
+            self.metrics.started = time.perf_counter()
+            async with session.post(url, headers=self._client.headers, json=self._data) as response:
+                response.raise_for_status()
+                parser = SSEParser()
+                async for raw_line in response.content:
+                    data = parser.feed_line(raw_line.decode("utf-8").rstrip("\r\n"))
+                    if data is None:
+                        continue
+                    if data == "[DONE]":
+                        break
+                    content = _delta_content(data)
+                    if content:
+                        self.metrics.record_token(time.perf_counter())
+                        yield content
+        finally:
+            self.metrics.finished_at = time.perf_counter()
+            self._client.last_stream_metrics = self.metrics
+            _record_stream(self.metrics)
+            if own_session:
+                await session.close()
+
+class RateLimiter:
+    """令牌桶限流器，同时限制每分钟请求数和每分钟token数"""
+    
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None
+    ):
+        """
+        初始化限流器
+        
+        Args:
+            requests_per_minute: 每分钟最大请求数，None表示不限制
+            tokens_per_minute: 每分钟最大token数，None表示不限制
+        
+        Examples:
+            >>> limiter = RateLimiter(requests_per_minute=3500, tokens_per_minute=90000)
+            >>> client = OpenAIClient(rate_limiter=limiter)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_budget = float(requests_per_minute or 0)
+        self._token_budget = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._request_budget = min(
+                float(self.requests_per_minute),
+                self._request_budget + elapsed * self.requests_per_minute / 60
+            )
+        if self.tokens_per_minute:
+            self._token_budget = min(
+                float(self.tokens_per_minute),
+                self._token_budget + elapsed * self.tokens_per_minute / 60
+            )
+    
+    def reserve(self, tokens: int = 0) -> float:
+        """
+        预留一次请求的额度
+        
+        额度不足时允许透支，返回需要等待的秒数，等待结束后透支部分已补回。
+        
+        Args:
+            tokens: 本次请求预计消耗的token数
+        
+        Returns:
+            float: 发送请求前需要等待的秒数
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = 0.0
+            if self.requests_per_minute:
+                self._request_budget -= 1
+                if self._request_budget < 0:
+                    wait = max(wait, -self._request_budget * 60 / self.requests_per_minute)
+            if self.tokens_per_minute:
+                self._token_budget -= tokens
+                if self._token_budget < 0:
+                    wait = max(wait, -self._token_budget * 60 / self.tokens_per_minute)
+            return wait
+    
+    def refund(self, tokens: int) -> None:
+        """
+        归还多预留的token额度（如预估值大于实际用量）
+        
+        Args:
+            tokens: 归还的token数，可以为负数表示追加扣除
+        """
+        if not self.tokens_per_minute:
+            return
+        with self._lock:
+            self._token_budget = min(float(self.tokens_per_minute), self._token_budget + tokens)
+    
+    def acquire(self, tokens: int = 0) -> None:
+        """阻塞直到额度可用"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+    
+    async def acquire_async(self, tokens: int = 0) -> None:
+        """异步等待直到额度可用"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
 
 class OpenAIClient:
     """OpenAI API 客户端"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        pool_size: int = 10,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None
+    ):
         """
         初始化 OpenAI 客户端
         
         Args:
             api_key: OpenAI API密钥，如果为None则从环境变量OPENAI_API_KEY获取
+            base_url: API地址，如果为None则从环境变量OPENAI_BASE_URL获取，默认为官方地址
+            pool_size: 连接池大小
+            rate_limiter: 客户端限流器（可选）
+            cache: 响应缓存（可选），默认只缓存 temperature=0 的请求
         """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         if not self.api_key:
             raise ValueError("OpenAI API key is required")
         
-        self.base_url = "https://api.openai.com/v1"
+        self.base_url = (base_url or os.getenv('OPENAI_BASE_URL') or "https://api.openai.com/v1").rstrip('/')
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        # 最近一次完成的流式调用的延迟指标
+        self.last_stream_metrics: Optional[StreamMetrics] = None
+        
+        # 复用连接，避免每次请求重新握手
+        self.pool_size = 0
+        self._pool_lock = threading.Lock()
+        self.session = requests.Session()
+        self._grow_pool(pool_size)
+    
+    def _grow_pool(self, size: int) -> None:
+        """
+        把连接池扩大到至少 size 个连接
+        
+        并发线程数超过连接池大小时，多出的连接用完即被丢弃（urllib3 报 "Connection pool is full"），
+        批量接口在启动线程前按并发数调用。旧适配器随即关闭：空闲连接立即释放，
+        进行中的请求不受影响，其连接在请求结束后关闭。
+        """
+        with self._pool_lock:
+            if size <= self.pool_size:
+                return
+            adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+            old_adapters = []
+            for prefix in ('http://', 'https://'):
+                old = self.session.get_adapter(prefix)
+                if all(old is not seen for seen in old_adapters):
+                    old_adapters.append(old)
+                self.session.mount(prefix, adapter)
+            for old in old_adapters:
+                old.close()
+            self.pool_size = size
+    
+    def _build_payload(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        stream: bool = False
+    ) -> Dict[str, Any]:
+        data = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if stream:
+            data["stream"] = True
+        return data
+    
+    def _cache_key(self, data: Dict[str, Any], cache: Optional[bool]) -> Optional[str]:
+        """返回请求的缓存键，不缓存时返回None"""
+        if self.cache is None or cache is False:
+            return None
+        if cache is None and data["temperature"] != 0:
+            # 非确定性请求默认不缓存
+            return None
+        return request_key(data, self.base_url)
+    
+    def _settle_tokens(self, estimated: int, result: Dict[str, Any]) -> None:
+        """根据实际用量修正限流器的token预留"""
+        usage = result.get("usage") or {}
+        if metrics.is_enabled():
+            for kind in ("prompt", "completion"):
+                if f"{kind}_tokens" in usage:
+                    metrics.inc("openai_tokens_total", usage[f"{kind}_tokens"], kind=kind)
+        if self.rate_limiter and "total_tokens" in usage:
+            self.rate_limiter.refund(estimated - usage["total_tokens"])
     
     def chat_completion(
         self,
         messages: List[Dict[str, str]],
         model: str = "gpt-3.5-turbo",
         temperature: float = 0.7,
-        max_tokens: int = 1000
-    ) -> Dict[str, Any]:
+        max_tokens: int = 1000,
+        stream: bool = False,
+        cache: Optional[bool] = None
+    ) -> Union[Dict[str, Any], ChatCompletionStream]:
         """
         调用 OpenAI Chat Completion API
         
@@ -39,10 +436,12 @@ class OpenAIClient:
             model: 模型名称
             temperature: 温度参数 (0-1)
             max_tokens: 最大生成token数
-            
+            stream: 是否以流式方式返回，见 chat_completion_stream
+            cache: 是否使用响应缓存，None表示仅缓存 temperature=0 的请求
+        
         Returns:
-            Dict: API 响应结果
-            
+            Dict: API 响应结果，stream=True 时返回 ChatCompletionStream
+        
         Examples:
             >>> client = OpenAIClient()
             >>> messages = [
@@ -51,14 +450,307 @@ class OpenAIClient:
             ... ]
             >>> response = client.chat_completion(messages)
         """
+        if stream:
+            return self.chat_completion_stream(messages, model, temperature, max_tokens)
+        
+        data = self._build_payload(messages, model, temperature, max_tokens)
+        key = self._cache_key(data, cache)
+        if key is None:
+            return self._post_chat_completion(data)
+        return self.cache.get_or_compute(key, lambda: self._post_chat_completion(data))
+    
+    @metrics.timed("openai_request", endpoint="chat")
+    def _post_chat_completion(self, data: Dict[str, Any]) -> Dict[str, Any]:
         url = f"{self.base_url}/chat/completions"
-        data = {
-            "model": model,
-            "messages": messages,
-            "temperature": temperature,
-            "max_tokens": max_tokens
-        }
+        estimated = estimate_tokens(data["messages"], data["max_tokens"])
+        if self.rate_limiter:
+            self.rate_limiter.acquire(estimated)
+        
+        response = self.session.post(url, headers=self.headers, json=data)
+        response.raise_for_status()
+        result = response.json()
+        self._settle_tokens(estimated, result)
+        return result
+    
+    def chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "gpt-3.5-turbo",
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> ChatCompletionStream:
+        """
+        以 SSE 流式方式调用 Chat Completion API
+        
+        Args:
+            messages: 对话消息列表
+            model: 模型名称
+            temperature: 温度参数 (0-1)
+            max_tokens: 最大生成token数
+        
+        Returns:
+            ChatCompletionStream: 迭代得到增量文本，结束后可读取 metrics
+        
+        Examples:
+            >>> stream = client.chat_completion_stream(messages)
+            >>> for token in stream:
+            ...     print(token, end="", flush=True)
+            >>> print(stream.metrics.time_to_first_token, stream.metrics.tokens_per_second)
+        """
+        url = f"{self.base_url}/chat/completions"
+        data = self._build_payload(messages, model, temperature, max_tokens, stream=True)
+        
+        if self.rate_limiter:
+            self.rate_limiter.acquire(estimate_tokens(messages, max_tokens))
+        
+        stream_metrics = StreamMetrics(started=time.perf_counter())
+        response = self.session.post(url, headers=self.headers, json=data, stream=True)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
+        return ChatCompletionStream(response, stream_metrics, self)
+    
+    def achat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "gpt-3.5-turbo",
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        session: Any = None
+    ) -> AsyncChatCompletionStream:
+        """
+        以 SSE 流式方式异步调用 Chat Completion API
+        
+        Args:
+            messages: 对话消息列表
+            model: 模型名称
+            temperature: 温度参数 (0-1)
+            max_tokens: 最大生成token数
+            session: 复用的 aiohttp.ClientSession（可选）
+        
+        Returns:
+            AsyncChatCompletionStream: 使用 async for 迭代得到增量文本
         
-        response = requests.post(url, headers=self.headers, json=data)
+        Examples:
+            >>> stream = client.achat_completion_stream(messages)
+            >>> async for token in stream:
+            ...     print(token, end="", flush=True)
+        """
+        data = self._build_payload(messages, model, temperature, max_tokens, stream=True)
+        return AsyncChatCompletionStream(self, data, session)
+    
+    def _safe_chat_completion(self, request: Dict[str, Any]) -> Union[Dict[str, Any], Exception]:
+        try:
+            return self.chat_completion(**request)
+        except Exception as e:
+            return e
+    
+    def chat_completion_many(
+        self,
+        requests_list: List[Dict[str, Any]],
+        max_concurrency: int = 8
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        并发批量调用 Chat Completion API
+        
+        所有请求共享同一个连接池，连接池小于 max_concurrency 时会先扩大；
+        单个请求失败不会中断整个批次，对应位置返回异常对象。
+        
+        Args:
+            requests_list: 请求参数列表，每项为 chat_completion 的关键字参数
+            max_concurrency: 最大并发数
+        
+        Returns:
+            List[Union[Dict, Exception]]: 与输入顺序一致的结果列表
+        
+        Examples:
+            >>> client = OpenAIClient(rate_limiter=RateLimiter(requests_per_minute=500))
+            >>> results = client.chat_completion_many([
+            ...     {"messages": [{"role": "user", "content": "你好"}]},
+            ...     {"messages": [{"role": "user", "content": "再见"}], "temperature": 0},
+            ... ], max_concurrency=16)
+        """
+        self._grow_pool(max_concurrency)
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            return list(executor.map(self._safe_chat_completion, requests_list))
+    
+    @metrics.timed("openai_request", endpoint="embeddings")
+    def _post_embeddings(self, model: str, inputs: List[str]) -> List[List[float]]:
+        """发送一个 embeddings 请求，按输入顺序返回向量"""
+        url = f"{self.base_url}/embeddings"
+        estimated = sum(estimate_tokens([{"content": text}]) for text in inputs)
+        if self.rate_limiter:
+            self.rate_limiter.acquire(estimated)
+        
+        response = self.session.post(url, headers=self.headers, json={"model": model, "input": inputs})
         response.raise_for_status()
-        return response.json() 
\ No newline at end of file
+        result = response.json()
+        self._settle_tokens(estimated, result)
+        return [item["embedding"] for item in sorted(result["data"], key=lambda item: item["index"])]
+    
+    @staticmethod
+    def _pack_batches(texts: List[str], batch_size: int, max_batch_tokens: int) -> List[List[str]]:
+        """按顺序把文本装入不超过 batch_size 条、max_batch_tokens 个token的批次"""
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        batch_tokens = 0
+        for text in texts:
+            tokens = estimate_tokens([{"content": text}])
+            if batch and (len(batch) >= batch_size or batch_tokens + tokens > max_batch_tokens):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def embeddings(
+        self,
+        texts: Sequence[str],
+        model: str = "text-embedding-3-small",
+        batch_size: int = 512,
+        max_batch_tokens: int = 100000,
+        max_concurrency: int = 4,
+        store: Optional["EmbeddingStore"] = None
+    ):
+        """
+        批量计算文本向量
+        
+        重复文本只计算一次；其余文本按顺序装入尽量大的批次（同时受条数和token数限制），
+        多个批次通过连接池并发发送。提供 store 时先按内容哈希查找已有向量，
+        只请求缺失的部分并写回存储，未变化的语料重新计算时不会发出任何请求。
+        
+        Args:
+            texts: 文本列表
+            model: 向量模型名称
+            batch_size: 每个请求的最大条数
+            max_batch_tokens: 每个请求的最大估算token数
+            max_concurrency: 最大并发请求数
+            store: 向量存储（可选）
+            
+        Returns:
+            numpy.ndarray: 形状为 (len(texts), dim) 的 float32 矩阵
+            
+        Examples:
+            >>> store = EmbeddingStore("embeddings")
+            >>> vectors = client.embeddings(split_text(document), store=store)
+            >>> store.flush()
+        """
+        import numpy as np
+        from py_artisan.ai.embedding_store import content_key
+        
+        unique = list(dict.fromkeys(texts))
+        keys = [content_key(text, model) for text in unique]
+        vectors: Dict[str, Any] = {}
+        if store is not None:
+            rows, found = store.get_many(keys)
+            for i, row in enumerate(rows):
+                if row is not None:
+                    vectors[unique[i]] = found[i]
+        
+        missing = [text for text in unique if text not in vectors]
+        if missing:
+            batches = self._pack_batches(missing, batch_size, max_batch_tokens)
+            self._grow_pool(max_concurrency)
+            with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                results = list(executor.map(lambda batch: self._post_embeddings(model, batch), batches))
+            computed = np.asarray([vector for result in results for vector in result], dtype=np.float32)
+            for text, vector in zip(missing, computed):
+                vectors[text] = vector
+            if store is not None:
+                store.add([content_key(text, model) for text in missing], computed)
+        
+        if not texts:
+            return np.zeros((0, store.dim if store is not None and store.dim else 0), dtype=np.float32)
+        return np.stack([vectors[text] for text in texts]).astype(np.float32, copy=False)
+    
+    async def achat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "gpt-3.5-turbo",
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        session: Any = None,
+        cache: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        异步调用 Chat Completion API
+        
+        Args:
+            messages: 对话消息列表
+            model: 模型名称
+            temperature: 温度参数 (0-1)
+            max_tokens: 最大生成token数
+            session: 复用的 aiohttp.ClientSession（可选）
+            cache: 是否使用响应缓存，None表示仅缓存 temperature=0 的请求
+        
+        Returns:
+            Dict: API 响应结果
+        
+        Examples:
+            >>> response = await client.achat_completion(messages)
+        """
+        data = self._build_payload(messages, model, temperature, max_tokens)
+        key = self._cache_key(data, cache)
+        if key is None:
+            return await self._apost_chat_completion(data, session)
+        return await self.cache.aget_or_compute(
+            key, lambda: self._apost_chat_completion(data, session)
+        )
+    
+    async def _apost_chat_completion(self, data: Dict[str, Any], session: Any = None) -> Dict[str, Any]:
+        import aiohttp
+        
+        if session is None:
+            async with aiohttp.ClientSession() as session:
+                return await self._apost_chat_completion(data, session)
+        return await self._apost_with_session(data, session)
+        
+    @metrics.timed("openai_request", endpoint="chat")
+    async def _apost_with_session(self, data: Dict[str, Any], session: Any) -> Dict[str, Any]:
+        url = f"{self.base_url}/chat/completions"
+        estimated = estimate_tokens(data["messages"], data["max_tokens"])
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async(estimated)
+        
+        async with session.post(url, headers=self.headers, json=data) as response:
+            response.raise_for_status()
+            result = await response.json()
+        self._settle_tokens(estimated, result)
+        return result
+    
+    async def achat_completion_many(
+        self,
+        requests_list: List[Dict[str, Any]],
+        max_concurrency: int = 8
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        异步并发批量调用 Chat Completion API
+        
+        Args:
+            requests_list: 请求参数列表，每项为 chat_completion 的关键字参数
+            max_concurrency: 最大并发数
+        
+        Returns:
+            List[Union[Dict, Exception]]: 与输入顺序一致的结果列表
+        
+        Examples:
+            >>> results = await client.achat_completion_many(requests_list, max_concurrency=64)
+        """
+        import aiohttp
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        connector = aiohttp.TCPConnector(limit=max_concurrency)
+        
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async def run(request: Dict[str, Any]) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self.achat_completion(**request, session=session)
+            
+            return await asyncio.gather(
+                *(run(request) for request in requests_list),
+                return_exceptions=True
+            )
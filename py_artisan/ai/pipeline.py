@@ -0,0 +1,228 @@
+"""语料预处理流水线模块"""
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from py_artisan.ai.text_utils import DEFAULT_SEPARATORS, MinHasher, MinHashIndex, TextCleaner, iter_text_spans
+from py_artisan.utils.concurrent_utils import bounded_map, chunked
+
+@dataclass(frozen=True)
+class ChunkRecord:
+    """预处理得到的文本段"""
+    doc_id: Any
+    offset: int  # 在清理后文档中的字符偏移
+    text: str
+
+Document = Union[str, os.PathLike, Tuple[Any, Union[str, os.PathLike]]]
+PathDocument = Union[str, os.PathLike, Tuple[Any, Union[str, os.PathLike]]]
+
+class TextPipeline:
+    """
+    清理 -> 分割 -> 去重 的语料预处理流水线
+    
+    清理、分割以及摘要和 MinHash 签名的计算在工作进程中按文档批次执行，
+    只有文件路径或文本本身跨进程传递；去重需要全局视角，在主进程中完成。对象本身可以被 pickle，
+    工作进程直接调用它的方法。文件按块读取、清理和分割，不会整体读入内存。
+    """
+    
+    def __init__(
+        self,
+        max_length: int = 2000,
+        overlap: int = 200,
+        separators: Sequence[str] = DEFAULT_SEPARATORS,
+        remove_urls: bool = True,
+        remove_numbers: bool = False,
+        remove_punctuation: bool = False,
+        dedupe: bool = True,
+        near_duplicate_threshold: Optional[float] = None,
+        encoding: str = "utf-8"
+    ):
+        """
+        初始化预处理流水线
+        
+        Args:
+            max_length: 每段最大长度
+            overlap: 相邻两段的重叠长度
+            separators: 按优先级排列的分隔符
+            remove_urls: 是否删除URL
+            remove_numbers: 是否删除数字
+            remove_punctuation: 是否删除标点符号
+            dedupe: 是否丢弃内容完全相同的文本段
+            near_duplicate_threshold: 设置后同时丢弃估计相似度不低于该值的近似重复段（需要 numpy）
+            encoding: 读取文件时使用的编码
+            
+        Examples:
+            >>> pipeline = TextPipeline(max_length=1000, overlap=100)
+            >>> for record in pipeline.run(paths=Path("corpus").glob("*.txt"), workers=8):
+            ...     print(record.doc_id, record.offset, len(record.text))
+        """
+        if max_length <= 0 or overlap < 0 or overlap >= max_length:
+            raise ValueError("max_length must be positive and greater than overlap")
+        
+        self.max_length = max_length
+        self.overlap = overlap
+        self.separators = tuple(separators)
+        self.cleaner = TextCleaner(remove_urls, remove_numbers, remove_punctuation)
+        self.dedupe = dedupe
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.hasher = MinHasher() if near_duplicate_threshold is not None else None
+        self.encoding = encoding
+    
+    def iter_process(self, doc_id: Any, source: Union[str, os.PathLike]) -> Iterator[Tuple[ChunkRecord, bytes, Any]]:
+        """
+        清理并分割单个文档，逐段返回
+        
+        Args:
+            doc_id: 文档标识
+            source: 文本，或文件路径（PathLike）
+            
+        Returns:
+            Iterator[Tuple[ChunkRecord, bytes, Any]]: 文本段、内容摘要和 MinHash 签名（未启用时为None）
+        """
+        if isinstance(source, str):
+            yield from self._records(doc_id, self.cleaner.clean(source))
+            return
+        with open(source, encoding=self.encoding, errors="replace") as f:
+            yield from self._records(doc_id, self.cleaner.iter_clean(f))
+    
+    def _records(self, doc_id: Any, text) -> Iterator[Tuple[ChunkRecord, bytes, Any]]:
+        for offset, segment in iter_text_spans(text, self.max_length, self.overlap, self.separators):
+            yield (
+                ChunkRecord(doc_id, offset, segment),
+                hashlib.blake2b(segment.encode("utf-8"), digest_size=16).digest(),
+                self.hasher.signature(segment) if self.hasher is not None else None
+            )
+    
+    def process(self, doc_id: Any, source: Union[str, os.PathLike]) -> List[Tuple[ChunkRecord, bytes, Any]]:
+        """
+        清理并分割单个文档
+        
+        Args:
+            doc_id: 文档标识
+            source: 文本，或文件路径（PathLike）
+            
+        Returns:
+            List[Tuple[ChunkRecord, bytes, Any]]: 文本段、内容摘要和 MinHash 签名（未启用时为None）
+        """
+        return list(self.iter_process(doc_id, source))
+    
+    def process_batch(self, batch: Sequence[Tuple[Any, Union[str, os.PathLike]]]) -> List[Tuple[ChunkRecord, bytes, Any]]:
+        """处理一批文档，作为进程池中的任务单元"""
+        return [item for doc_id, source in batch for item in self.iter_process(doc_id, source)]
+    
+    @staticmethod
+    def _normalize(
+        documents: Iterable[Document],
+        paths: Iterable[PathDocument]
+    ) -> Iterator[Tuple[Any, Union[str, os.PathLike]]]:
+        """统一为 (doc_id, source)，未给出标识时路径使用自身、文本使用序号"""
+        for index, document in enumerate(documents):
+            if isinstance(document, tuple):
+                yield document
+            elif isinstance(document, str):
+                yield index, document
+            else:
+                yield os.fspath(document), document
+        for path in paths:
+            if isinstance(path, tuple):
+                yield path[0], Path(path[1])
+            else:
+                yield os.fspath(path), Path(path)
+    
+    def run(
+        self,
+        documents: Iterable[Document] = (),
+        workers: int = 0,
+        batch_size: int = 16,
+        max_in_flight: Optional[int] = None,
+        ordered: bool = True,
+        paths: Iterable[PathDocument] = ()
+    ) -> Iterator[ChunkRecord]:
+        """
+        流式处理语料
+        
+        文档按 batch_size 打包提交，同时在途的批次数有上限，
+        因此输入可以是惰性的生成器，消费方处理慢时上游也会随之暂停。
+        documents 中的字符串总是视为文本本身，不检查文件系统；文件路径放在 paths 中或用 Path 包装。
+        
+        Args:
+            documents: 文档序列，元素为文本、文件路径（PathLike）或 (doc_id, 文本/路径)
+            workers: 工作进程数，0表示在当前进程中处理
+            batch_size: 每个进程任务包含的文档数
+            max_in_flight: 同时在途的批次数，默认为 workers 的2倍
+            ordered: True 时按文档顺序输出，否则按完成顺序输出
+            paths: 文件路径序列，元素为路径（字符串或 PathLike）或 (doc_id, 路径)，在 documents 之后处理
+            
+        Returns:
+            Iterator[ChunkRecord]: 文本段记录
+            
+        Examples:
+            >>> docs = ((row["id"], row["body"]) for row in rows)
+            >>> records = TextPipeline(max_length=500).run(docs, workers=4, ordered=False)
+            >>> records = TextPipeline().run(paths=glob.glob("corpus/*.txt"), workers=8)
+        """
+        seen: Set[bytes] = set()
+        index = None
+        if self.hasher is not None:
+            index = MinHashIndex(self.near_duplicate_threshold, hasher=self.hasher)
+        sources = self._normalize(documents, paths)
+        
+        if workers <= 0:
+            # 在当前进程中逐段处理，不需要把整个文档的结果放入列表
+            for doc_id, source in sources:
+                yield from self._dedupe(self.iter_process(doc_id, source), seen, index)
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for results in bounded_map(
+                executor,
+                self.process_batch,
+                chunked(sources, batch_size),
+                max_in_flight or workers * 2,
+                ordered=ordered
+            ):
+                yield from self._dedupe(results, seen, index)
+    
+    def _dedupe(
+        self,
+        results: Iterable[Tuple[ChunkRecord, bytes, Any]],
+        seen: Set[bytes],
+        index: Optional[MinHashIndex]
+    ) -> Iterator[ChunkRecord]:
+        """按摘要过滤已经输出过的文本段，启用近似去重时再查询 MinHash 索引"""
+        for record, digest, signature in results:
+            if self.dedupe:
+                if digest in seen:
+                    continue
+                seen.add(digest)
+            if index is not None and not index.add_if_new(record.text, signature=signature):
+                continue
+            yield record
+
+def preprocess_corpus(
+    documents: Iterable[Document] = (),
+    workers: int = 0,
+    ordered: bool = True,
+    paths: Iterable[PathDocument] = (),
+    **kwargs
+) -> Iterator[ChunkRecord]:
+    """
+    使用默认配置的 TextPipeline 处理语料
+    
+    Args:
+        documents: 文档序列，字符串视为文本本身
+        workers: 工作进程数，0表示在当前进程中处理
+        ordered: 是否按文档顺序输出
+        paths: 文件路径序列
+        **kwargs: 传给 TextPipeline 的参数
+        
+    Returns:
+        Iterator[ChunkRecord]: 文本段记录
+        
+    Examples:
+        >>> for record in preprocess_corpus(paths=glob.glob("*.txt"), workers=8, max_length=1000):
+        ...     index(record)
+    """
+    return TextPipeline(**kwargs).run(documents, workers=workers, ordered=ordered, paths=paths)
@@ -0,0 +1,310 @@
+"""API 响应缓存模块"""
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from py_artisan.utils import metrics
+
+def request_key(payload: Dict[str, Any], namespace: str = "") -> str:
+    """
+    计算请求的规范化哈希，作为缓存键
+    
+    Args:
+        payload: 请求体
+        namespace: 命名空间（如 API 地址），不同命名空间的相同请求互不共享
+    
+    Returns:
+        str: sha256 十六进制字符串
+    
+    Examples:
+        >>> request_key({"model": "gpt-4", "temperature": 0}) == request_key({"temperature": 0, "model": "gpt-4"})
+        True
+    """
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(f"{namespace}\n{canonical}".encode("utf-8")).hexdigest()
+
+_MISSING = object()
+
+class SqliteCacheStore:
+    """基于 sqlite 的持久化缓存层，值以 JSON 保存，可在多个进程间共享"""
+    
+    def __init__(self, path: str):
+        """
+        初始化持久化缓存
+        
+        Args:
+            path: sqlite 数据库文件路径
+        
+        Examples:
+            >>> store = SqliteCacheStore("~/.cache/py_artisan/responses.db")
+        """
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+    
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite 连接不能跨线程使用，每个线程各自持有一个
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取未过期的缓存值，不存在时返回 default"""
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return default
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            return default
+        return json.loads(value)
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存值"""
+        expires_at = time.time() + ttl if ttl else None
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at)
+            )
+    
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+class ResponseCache:
+    """
+    两级响应缓存：进程内 LRU（带过期时间）+ 可选的持久化层
+    
+    相同键的并发请求只会触发一次上游调用，其余调用等待并共享结果。
+    锁只保护内存层，持久化层的读写在锁外进行，内存命中不会被其他线程的磁盘读取阻塞。
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 3600,
+        store: Optional[SqliteCacheStore] = None
+    ):
+        """
+        初始化响应缓存
+        
+        Args:
+            max_entries: 内存中最多保存的条目数
+            ttl: 过期时间（秒），None表示不过期
+            store: 持久化缓存层（可选）
+        
+        Examples:
+            >>> cache = ResponseCache(max_entries=10000, store=SqliteCacheStore("responses.db"))
+            >>> client = OpenAIClient(cache=cache)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._async_inflight: Dict[Tuple[int, str], asyncio.Future] = {}
+    
+    def _lookup_memory(self, key: str) -> Tuple[bool, Any]:
+        """查询内存层，调用方需持有锁"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at is None or expires_at >= time.monotonic():
+                self._entries.move_to_end(key)
+                return True, value
+            del self._entries[key]
+        return False, None
+    
+    def _lookup(self, key: str) -> Tuple[bool, Any]:
+        """查询两级缓存，调用方不能持有锁"""
+        with self._lock:
+            found, value = self._lookup_memory(key)
+        if found or self.store is None:
+            return found, value
+        value = self.store.get(key, _MISSING)
+        if value is _MISSING:
+            return False, None
+        with self._lock:
+            # 读取期间其他线程可能已写入更新的值
+            found, current = self._lookup_memory(key)
+            if found:
+                return True, current
+            self._remember(key, value)
+        return True, value
+    
+    def _count(self, found: bool) -> None:
+        """记录命中或未命中，调用方需持有锁"""
+        if found:
+            self.hits += 1
+            metrics.inc("response_cache_requests_total", result="hit")
+        else:
+            self.misses += 1
+            metrics.inc("response_cache_requests_total", result="miss")
+    
+    def _remember(self, key: str, value: Any) -> None:
+        """写入内存层，调用方需持有锁"""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        读取缓存
+        
+        Args:
+            key: 缓存键
+        
+        Returns:
+            Optional[Any]: 缓存值，未命中时返回None
+        """
+        found, value = self._lookup(key)
+        with self._lock:
+            self._count(found)
+        return value
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        写入缓存
+        
+        Args:
+            key: 缓存键
+            value: 缓存值
+        """
+        with self._lock:
+            self._remember(key, value)
+        if self.store is not None:
+            self.store.set(key, value, self.ttl)
+    
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        读取缓存，未命中时调用 compute 计算并写入
+        
+        同一个键同时只会有一个 compute 在执行。
+        
+        Args:
+            key: 缓存键
+            compute: 计算缓存值的函数
+        
+        Returns:
+            Any: 缓存值或计算结果
+        """
+        found, value = self._lookup(key)
+        with self._lock:
+            if not found:
+                # 查询持久化层期间其他线程可能已完成计算
+                found, value = self._lookup_memory(key)
+            self._count(found)
+            if found:
+                return value
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        
+        if not leader:
+            return future.result()
+        
+        try:
+            value = compute()
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+    
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        get_or_compute 的异步版本
+        
+        Args:
+            key: 缓存键
+            compute: 返回可等待对象的函数
+        
+        Returns:
+            Any: 缓存值或计算结果
+        """
+        inflight_key = (id(asyncio.get_running_loop()), key)
+        found, value = self._lookup(key)
+        with self._lock:
+            if not found:
+                found, value = self._lookup_memory(key)
+            self._count(found)
+            if found:
+                return value
+            future = self._async_inflight.get(inflight_key)
+            leader = future is None
+            if leader:
+                future = self._async_inflight[inflight_key] = asyncio.get_running_loop().create_future()
+        
+        if not leader:
+            return await asyncio.shield(future)
+        
+        try:
+            value = await compute()
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                del self._async_inflight[inflight_key]
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+        
+        Returns:
+            Dict: 命中数、未命中数、命中率和内存条目数
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries)
+            }
+    
+    def clear(self) -> None:
+        """清空内存层和持久化层"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+        if self.store is not None:
+            self.store.clear()
@@ -1,6 +1,19 @@
 """文本处理工具模块"""
 import re
-from typing import List, Optional
+import codecs
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from py_artisan.utils.concurrent_utils import bounded_map, chunked
+
+# 默认分隔符，按优先级依次尝试：段落 -> 行 -> 句子 -> 词
+DEFAULT_SEPARATORS = (
+    "\n\n", "\n",
+    "。", "！", "？", ". ", "! ", "? ",
+    "；", "; ", "，", ", ", " "
+)
 
 def split_text(
     text: str,
@@ -27,25 +40,599 @@ def split_text(
     if len(text) <= max_length:
         return [text]
         
-    segments = []
-    start = 0
+    return list(iter_split_text(text, max_length, overlap, separators=(separator,)))
+
+def _iter_source(source: Union[str, IO, Iterable[str]], read_size: int, encoding: str) -> Iterator[str]:
+    """按块读取文本源，字节流（如二进制文件、mmap）按 encoding 增量解码，字符串迭代器原样返回"""
+    if isinstance(source, str):
+        yield source
+        return
+    if not hasattr(source, "read"):
+        yield from source
+        return
+        
+    decoder = None
+    while True:
+        data = source.read(read_size)
+        if not data:
+            break
+        if isinstance(data, str):
+            yield data
+            continue
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        yield decoder.decode(data)
+    if decoder is not None:
+        yield decoder.decode(b"", final=True)
+
+def iter_split_text(
+    source: Union[str, IO, Iterable[str]],
+    max_length: int = 2000,
+    overlap: int = 200,
+    separators: Sequence[str] = DEFAULT_SEPARATORS,
+    read_size: int = 1024 * 1024,
+    encoding: str = "utf-8"
+) -> Iterator[str]:
+    """
+    流式分割文本，逐段返回
+    
+    支持字符串、文本文件、二进制文件、mmap 以及字符串迭代器（如 TextCleaner.iter_clean
+    的输出）。每段在窗口后半部分按分隔符优先级
+    寻找切分点（分隔符保留在段尾），找不到时在 max_length 处硬切分。
+    每次至少前进 (max_length - overlap) / 2 个字符，因此总耗时与文本长度成线性关系，
+    内存占用约为一个窗口加一次读取的大小。
+    
+    Args:
+        source: 输入文本，带 read 方法的文件对象 / mmap，或依次拼接成全文的字符串迭代器
+        max_length: 每段最大长度
+        overlap: 相邻两段的重叠长度，必须小于 max_length
+        separators: 按优先级排列的分隔符
+        read_size: 每次从文件读取的大小
+        encoding: 字节流的编码，无法解码的字节会被替换
+        
+    Returns:
+        Iterator[str]: 文本段落迭代器
+        
+    Raises:
+        ValueError: 当 overlap 不小于 max_length 时
+        
+    Examples:
+        >>> with open("corpus.txt", "rb") as f:
+        ...     for segment in iter_split_text(f, max_length=1000, overlap=100):
+        ...         process(segment)
+    """
+    for _, segment in iter_text_spans(source, max_length, overlap, separators, read_size, encoding):
+        yield segment
+
+def iter_text_spans(
+    source: Union[str, IO, Iterable[str]],
+    max_length: int = 2000,
+    overlap: int = 200,
+    separators: Sequence[str] = DEFAULT_SEPARATORS,
+    read_size: int = 1024 * 1024,
+    encoding: str = "utf-8"
+) -> Iterator[Tuple[int, str]]:
+    """
+    与 iter_split_text 相同，额外返回每段在全文中的字符偏移
+    
+    Returns:
+        Iterator[Tuple[int, str]]: (偏移, 文本段) 迭代器
+        
+    Examples:
+        >>> for offset, segment in iter_text_spans(text, max_length=1000):
+        ...     assert text[offset:offset + len(segment)] == segment
+    """
+    if max_length <= 0 or overlap < 0 or overlap >= max_length:
+        raise ValueError("max_length must be positive and greater than overlap")
+        
+    # 切分点不早于窗口内该位置，保证每次至少前进 min_step 个字符
+    min_step = max(1, (max_length - overlap) // 2)
+    min_split = overlap + min_step
+    
+    pieces = _iter_source(source, read_size, encoding)
+    buffer = ""
+    pos = 0          # 当前段在 buffer 中的起点
+    base = 0         # buffer[0] 在全文中的偏移
+    exhausted = False
+    
+    while True:
+        # 保证窗口之后至少还有一个字符，或者已经读到末尾
+        while not exhausted and len(buffer) - pos <= max_length:
+            piece = next(pieces, None)
+            if piece is None:
+                exhausted = True
+                break
+            buffer = buffer[pos:] + piece
+            base += pos
+            pos = 0
+            
+        if len(buffer) - pos <= max_length:
+            if len(buffer) > pos:
+                yield base + pos, buffer[pos:]
+            return
+            
+        end = pos + max_length
+        split = end
+        for separator in separators:
+            found = buffer.rfind(separator, pos + min_split, end)
+            if found != -1:
+                split = found + len(separator)
+                break
+                
+        yield base + pos, buffer[pos:split]
+        pos = split - overlap
+
+class SimpleTokenizer:
+    """
+    无依赖的近似分词器
+    
+    中日韩字符每字计为一个token，连续的字母数字计为一个token，其余标点逐个计数。
+    """
+    
+    _pattern = re.compile(
+        r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]"
+        r"|[^\W\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+"
+        r"|[^\w\s]"
+    )
+    
+    def encode(self, text: str) -> List[str]:
+        return self._pattern.findall(text)
+    
+    def encode_batch(self, texts: Sequence[str]) -> List[List[str]]:
+        return [self._pattern.findall(text) for text in texts]
+
+def _default_tokenizer():
+    """优先使用 tiktoken 的 cl100k_base，未安装时退回 SimpleTokenizer"""
+    try:
+        import tiktoken
+    except ImportError:
+        return SimpleTokenizer()
+    return tiktoken.get_encoding("cl100k_base")
+
+class TokenCounter:
+    """
+    带 LRU 缓存的token计数器
+    
+    tokenizer 需要提供 encode(text) 方法，如果同时提供 encode_batch(texts)，
+    count_many 会批量编码未命中缓存的文本。tiktoken 的 encode 遇到 <|endoftext|>
+    等特殊 token 会抛出 ValueError，因此优先使用 encode_ordinary / encode_ordinary_batch，
+    把它们当作普通文本计数。
+    """
+    
+    def __init__(self, tokenizer=None, cache_size: int = 65536):
+        """
+        初始化token计数器
+        
+        Args:
+            tokenizer: 分词器，默认为 tiktoken cl100k_base 或 SimpleTokenizer
+            cache_size: 缓存的文本条数
+            
+        Examples:
+            >>> import tiktoken
+            >>> counter = TokenCounter(tiktoken.encoding_for_model("gpt-4"))
+            >>> counter.count("你好，世界")
+        """
+        self.tokenizer = tokenizer or _default_tokenizer()
+        self._encode = getattr(self.tokenizer, "encode_ordinary", None) or self.tokenizer.encode
+        self._encode_batch = (
+            getattr(self.tokenizer, "encode_ordinary_batch", None)
+            or getattr(self.tokenizer, "encode_batch", None)
+        )
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _remember(self, text: str, count: int) -> None:
+        with self._lock:
+            self._cache[text] = count
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def count(self, text: str, cache: bool = True) -> int:
+        """
+        计算文本的token数
+        
+        Args:
+            text: 输入文本
+            cache: 是否读写缓存
+            
+        Returns:
+            int: token数
+        """
+        if cache:
+            with self._lock:
+                count = self._cache.get(text)
+                if count is not None:
+                    self._cache.move_to_end(text)
+                    return count
+        count = len(self._encode(text))
+        if cache:
+            self._remember(text, count)
+        return count
     
-    while start < len(text):
-        end = start + max_length
+    def count_many(self, texts: Sequence[str]) -> List[int]:
+        """
+        批量计算token数，重复文本只编码一次
         
-        if end >= len(text):
-            segments.append(text[start:])
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            List[int]: 与输入顺序一致的token数
+        """
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for text in texts:
+                count = self._cache.get(text)
+                if count is not None:
+                    self._cache.move_to_end(text)
+                    counts[text] = count
+        missing = list(dict.fromkeys(text for text in texts if text not in counts))
+        if missing:
+            if self._encode_batch is not None:
+                encoded = self._encode_batch(missing)
+            else:
+                encoded = [self._encode(text) for text in missing]
+            for text, tokens in zip(missing, encoded):
+                counts[text] = len(tokens)
+                self._remember(text, len(tokens))
+        return [counts[text] for text in texts]
+
+_default_counter: Optional[TokenCounter] = None
+
+def get_token_counter() -> TokenCounter:
+    """获取进程内共享的默认token计数器"""
+    global _default_counter
+    if _default_counter is None:
+        _default_counter = TokenCounter()
+    return _default_counter
+
+@dataclass
+class TextChunk:
+    """按token预算分割得到的文本段"""
+    text: str
+    token_count: int
+
+def _split_keep(text: str, separator: str) -> List[str]:
+    """按分隔符切分，分隔符保留在前一段末尾"""
+    parts = text.split(separator)
+    pieces = [part + separator for part in parts[:-1]]
+    if parts[-1]:
+        pieces.append(parts[-1])
+    return [piece for piece in pieces if piece]
+
+def _hard_cut(text: str, counter: TokenCounter, max_tokens: int) -> List[Tuple[str, int]]:
+    """没有可用分隔符时，二分查找不超过 max_tokens 的最长前缀"""
+    units = []
+    while text:
+        count = counter.count(text, cache=False)
+        if count <= max_tokens:
+            units.append((text, count))
             break
+        low, high = 1, len(text)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if counter.count(text[:mid], cache=False) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        units.append((text[:low], counter.count(text[:low], cache=False)))
+        text = text[low:]
+    return units
+
+def _token_units(
+    texts: Sequence[str],
+    counter: TokenCounter,
+    max_tokens: int,
+    separators: Sequence[str]
+) -> List[List[Tuple[str, int]]]:
+    """
+    把每篇文档切成不超过 max_tokens 的最小单元
+    
+    每一轮把所有文档中待处理的片段一起交给 count_many 批量计数，
+    超出预算的片段用下一级分隔符继续切分。
+    """
+    # 每个元素为 (文本, token数) 或 (文本, None, 下一级分隔符序号)
+    docs = [[(text, None, 0)] if text else [] for text in texts]
+    while True:
+        pending = [unit[0] for doc in docs for unit in doc if unit[1] is None]
+        if not pending:
+            break
+        counts = iter(counter.count_many(pending))
+        for doc_index, doc in enumerate(docs):
+            units = []
+            for unit in doc:
+                if unit[1] is not None:
+                    units.append(unit)
+                    continue
+                text, _, level = unit
+                count = next(counts)
+                if count <= max_tokens:
+                    units.append((text, count))
+                elif level < len(separators):
+                    units.extend((piece, None, level + 1) for piece in _split_keep(text, separators[level]))
+                else:
+                    units.extend(_hard_cut(text, counter, max_tokens))
+            docs[doc_index] = units
+    return docs
+
+def _pack_units(
+    units: List[Tuple[str, int]],
+    max_tokens: int,
+    overlap_tokens: int
+) -> List[TextChunk]:
+    """贪心合并相邻单元，并把上一段末尾不超过 overlap_tokens 的单元带入下一段"""
+    chunks = []
+    window: List[Tuple[str, int]] = []
+    window_tokens = 0
+    fresh = False  # 窗口中是否有尚未输出的单元
+    
+    for text, count in units:
+        if window_tokens + count > max_tokens and fresh:
+            chunks.append(TextChunk("".join(t for t, _ in window), window_tokens))
+            # 保留末尾单元作为重叠部分
+            carried: List[Tuple[str, int]] = []
+            carried_tokens = 0
+            for unit in reversed(window):
+                if carried_tokens + unit[1] > overlap_tokens:
+                    break
+                carried.insert(0, unit)
+                carried_tokens += unit[1]
+            window, window_tokens = carried, carried_tokens
+            fresh = False
+        # 重叠部分加上新单元超出预算时，从头部丢弃重叠单元
+        while window and window_tokens + count > max_tokens:
+            window_tokens -= window.pop(0)[1]
+        window.append((text, count))
+        window_tokens += count
+        fresh = True
+    
+    if fresh:
+        chunks.append(TextChunk("".join(t for t, _ in window), window_tokens))
+    return chunks
+
+def split_texts_by_tokens(
+    texts: Sequence[str],
+    max_tokens: int = 512,
+    overlap_tokens: int = 64,
+    counter: Optional[TokenCounter] = None,
+    separators: Sequence[str] = DEFAULT_SEPARATORS
+) -> List[List[TextChunk]]:
+    """
+    按token预算批量分割多篇文档
+    
+    文档先按分隔符优先级切成小单元并批量计数，重复出现的单元直接命中缓存；
+    之后只累加单元的token数来组装段落，不会对候选段落重复编码。
+    段落的 token_count 为各单元token数之和，与整段重新编码的结果可能略有差异。
+    
+    Args:
+        texts: 文档列表
+        max_tokens: 每段最大token数
+        overlap_tokens: 相邻两段的最大重叠token数
+        counter: token计数器，默认使用 get_token_counter()
+        separators: 按优先级排列的分隔符
+        
+    Returns:
+        List[List[TextChunk]]: 每篇文档的分段结果
+        
+    Raises:
+        ValueError: 当 overlap_tokens 不小于 max_tokens 时
+        
+    Examples:
+        >>> results = split_texts_by_tokens(documents, max_tokens=1000, overlap_tokens=100)
+        >>> for chunks in results:
+        ...     print([chunk.token_count for chunk in chunks])
+    """
+    if max_tokens <= 0 or overlap_tokens < 0 or overlap_tokens >= max_tokens:
+        raise ValueError("max_tokens must be positive and greater than overlap_tokens")
+    
+    counter = counter or get_token_counter()
+    return [
+        _pack_units(units, max_tokens, overlap_tokens)
+        for units in _token_units(texts, counter, max_tokens, separators)
+    ]
+
+def split_text_by_tokens(
+    text: str,
+    max_tokens: int = 512,
+    overlap_tokens: int = 64,
+    counter: Optional[TokenCounter] = None,
+    separators: Sequence[str] = DEFAULT_SEPARATORS
+) -> List[TextChunk]:
+    """
+    按token预算分割文本
+    
+    Args:
+        text: 输入文本
+        max_tokens: 每段最大token数
+        overlap_tokens: 相邻两段的最大重叠token数
+        counter: token计数器，默认使用 get_token_counter()
+        separators: 按优先级排列的分隔符
+        
+    Returns:
+        List[TextChunk]: 带token数的文本段列表
+        
+    Examples:
+        >>> chunks = split_text_by_tokens(text, max_tokens=1000, overlap_tokens=100)
+        >>> sum(chunk.token_count for chunk in chunks)
+    """
+    return split_texts_by_tokens([text], max_tokens, overlap_tokens, counter, separators)[0]
+
+# 与原先逐项交替的写法匹配同一字符集合（%XX 已包含在 $-_ 范围内），合并为单个字符类回溯更少
+URL_PATTERN = r'http[s]?://[a-zA-Z0-9$-_@.&+!*\\(),]+'
+NUMBER_PATTERN = r'\d+'
+PUNCTUATION_PATTERN = r'[^\w\s]'
+
+# 匹配到最后一个空白字符为止，用于在新读入的块中定位截断点
+_LAST_SPACE = re.compile(r'.*\s', re.S)
+# 强制截断时末尾保留的字符数，足以容纳尚未读完的 "https://" 前缀
+_CUT_HOLDBACK = 8
+
+class TextCleaner:
+    """
+    预编译的文本清理器
+    
+    构造时把启用的规则合并成一个正则，清理时只扫描一遍文本。
+    各规则匹配的都是互不重叠的字符，按 URL -> 数字 -> 标点的优先级合并后
+    结果与依次执行三次替换相同。对象可以被 pickle，能直接传给进程池。
+    """
+    
+    def __init__(
+        self,
+        remove_urls: bool = True,
+        remove_numbers: bool = False,
+        remove_punctuation: bool = False
+    ):
+        """
+        初始化文本清理器
+        
+        Args:
+            remove_urls: 是否删除URL
+            remove_numbers: 是否删除数字
+            remove_punctuation: 是否删除标点符号
             
-        # 在最大长度位置寻找最近的分隔符
-        split_pos = text.rfind(separator, start, end)
-        if split_pos == -1:
-            split_pos = end
+        Examples:
+            >>> cleaner = TextCleaner(remove_numbers=True)
+            >>> cleaner("访问 https://example.com 了解更多。123")
+            '访问  了解更多。'
+        """
+        self.remove_urls = remove_urls
+        self.remove_numbers = remove_numbers
+        self.remove_punctuation = remove_punctuation
+        patterns = [
+            pattern for enabled, pattern in (
+                (remove_urls, URL_PATTERN),
+                (remove_numbers, NUMBER_PATTERN),
+                (remove_punctuation, PUNCTUATION_PATTERN)
+            ) if enabled
+        ]
+        self._regex = re.compile("|".join(patterns)) if patterns else None
+        self._sub = self._regex.sub if self._regex is not None else None
+    
+    def __call__(self, text: str) -> str:
+        return self.clean(text)
+    
+    def __reduce__(self):
+        return (TextCleaner, (self.remove_urls, self.remove_numbers, self.remove_punctuation))
+    
+    def clean(self, text: str) -> str:
+        """
+        清理单条文本
+        
+        Args:
+            text: 输入文本
             
-        segments.append(text[start:split_pos])
-        start = split_pos - overlap  # 保持重叠
+        Returns:
+            str: 清理后的文本
+        """
+        if self._sub is not None:
+            text = self._sub('', text)
+        return text.strip()
+    
+    def iter_clean(
+        self,
+        source: Union[str, IO, Iterable[str]],
+        read_size: int = 1024 * 1024,
+        encoding: str = "utf-8"
+    ) -> Iterator[str]:
+        """
+        流式清理，输出拼接后与 clean(全文) 相同
+        
+        各规则的匹配都不包含空白字符，因此每块在最后一个空白处截断后分别替换，
+        结果与整体替换一致；全文首尾的空白被去掉。没有空白的长文本（如中文）在累积超过
+        read_size 后强制截断，截断点不落在 URL、数字等匹配的内部，内存占用约为一次读取的大小。
         
-    return segments
+        Args:
+            source: 输入文本、文件对象 / mmap 或字符串迭代器
+            read_size: 每次从文件读取的大小
+            encoding: 字节流的编码
+            
+        Returns:
+            Iterator[str]: 清理后的文本块
+            
+        Examples:
+            >>> with open("corpus.txt", encoding="utf-8") as f:
+            ...     for segment in iter_split_text(cleaner.iter_clean(f), max_length=1000):
+            ...         process(segment)
+        """
+        carry: List[str] = []   # 最后一个空白之后、尚未处理的文本
+        carry_length = 0
+        started = False
+        pending = ""   # 尚不确定是否位于全文末尾的空白
+        pieces = _iter_source(source, read_size, encoding)
+        while True:
+            piece = next(pieces, None)
+            if piece is None:
+                head = "".join(carry)
+            else:
+                match = _LAST_SPACE.match(piece)
+                if match is not None:
+                    head = "".join(carry) + piece[:match.end()]
+                    rest = piece[match.end():]
+                    carry, carry_length = [rest], len(rest)
+                else:
+                    carry.append(piece)
+                    carry_length += len(piece)
+                    if carry_length <= read_size:
+                        continue
+                    text = "".join(carry)
+                    cut = self._safe_cut(text)
+                    head = text[:cut]
+                    carry, carry_length = [text[cut:]], len(text) - cut
+            if self._sub is not None:
+                head = self._sub('', head)
+            if not started:
+                head = head.lstrip()
+                started = bool(head)
+            body = head.rstrip()
+            if body:
+                yield pending + body
+                pending = head[len(body):]
+            else:
+                pending += head
+            if piece is None:
+                return
+    
+    def _safe_cut(self, text: str) -> int:
+        """
+        为没有空白的文本选择截断位置
+        
+        text 的开头是安全的截断点，因此其中的匹配与全文中的匹配相同。截断点避开所有匹配的内部，
+        并在末尾保留 _CUT_HOLDBACK 个字符，不会拆开尚未读完的 URL。
+        整段都是同一个匹配时无法截断，返回0。
+        """
+        if self._regex is None:
+            return len(text)
+        cut = len(text) - _CUT_HOLDBACK
+        for match in self._regex.finditer(text):
+            if match.end() > cut:
+                cut = min(cut, match.start())
+                break
+        return max(cut, 0)
+    
+    def clean_batch(self, texts: Sequence[str]) -> List[str]:
+        """
+        清理一批文本，作为进程池中的任务单元
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            List[str]: 清理后的文本列表
+        """
+        sub = self._sub
+        if sub is None:
+            return [text.strip() for text in texts]
+        return [sub('', text).strip() for text in texts]
+
+@lru_cache(maxsize=None)
+def get_text_cleaner(
+    remove_urls: bool = True,
+    remove_numbers: bool = False,
+    remove_punctuation: bool = False
+) -> TextCleaner:
+    """获取指定选项的共享清理器，相同选项只编译一次"""
+    return TextCleaner(remove_urls, remove_numbers, remove_punctuation)
 
 def clean_text(
     text: str,
@@ -70,13 +657,353 @@ def clean_text(
         >>> clean_text(text)
         '访问 了解更多。123'
     """
-    if remove_urls:
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+    return get_text_cleaner(
+        bool(remove_urls),
+        bool(remove_numbers),
+        bool(remove_punctuation)
+    ).clean(text)
+    
+def clean_texts(
+    texts: Iterable[str],
+    remove_urls: bool = True,
+    remove_numbers: bool = False,
+    remove_punctuation: bool = False,
+    workers: int = 0,
+    chunk_size: int = 1024,
+    max_in_flight: Optional[int] = None
+) -> Iterator[str]:
+    """
+    批量清理文本，按输入顺序流式返回结果
+    
+    workers 大于0时使用进程池，文本按 chunk_size 条打包后再跨进程传递，
+    以摊薄序列化和进程间通信的开销；同时在途的批次数有上限，输入可以是生成器。
+    
+    Args:
+        texts: 文本序列
+        remove_urls: 是否删除URL
+        remove_numbers: 是否删除数字
+        remove_punctuation: 是否删除标点符号
+        workers: 进程数，0表示在当前进程中处理
+        chunk_size: 每个进程任务包含的文本条数
+        max_in_flight: 同时在途的批次数，默认为 workers 的2倍
+        
+    Returns:
+        Iterator[str]: 清理后的文本
+        
+    Examples:
+        >>> with open("corpus.txt") as f:
+        ...     for line in clean_texts(f, remove_numbers=True, workers=4):
+        ...         print(line)
+    """
+    cleaner = get_text_cleaner(bool(remove_urls), bool(remove_numbers), bool(remove_punctuation))
+    if workers <= 0:
+        for text in texts:
+            yield cleaner.clean(text)
+        return
+    
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch in bounded_map(
+            executor,
+            cleaner.clean_batch,
+            chunked(texts, chunk_size),
+            max_in_flight or workers * 2
+        ):
+            yield from batch
+
+class MinHasher:
+    """
+    计算文本的 MinHash 签名
+    
+    文本先压缩空白并转为字符 n-gram（对中文同样有效），n-gram 用滚动多项式哈希
+    一次性向量化计算，再经过 num_perm 个 multiply-shift 哈希 ((a*x+b) mod 2**64) >> 32 取最小值，
+    整个过程没有取模运算。
+    对象只包含哈希参数，可以廉价地 pickle 到工作进程中计算签名。
+    """
+    
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        """
+        初始化 MinHash 计算器
+        
+        Args:
+            num_perm: 签名长度（哈希函数个数）
+            shingle_size: 字符 n-gram 的长度
+            seed: 随机种子，签名只有在参数相同时才能比较
+            
+        Examples:
+            >>> hasher = MinHasher(num_perm=128)
+            >>> hasher.similarity(hasher.signature(a), hasher.signature(b))
+        """
+        import numpy as np
+        
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        rng = np.random.RandomState(seed)
+        # multiply-shift 要求乘数为奇数
+        self._a = rng.randint(0, 2 ** 63, size=num_perm, dtype=np.uint64) << np.uint64(1) | np.uint64(1)
+        self._b = rng.randint(0, 2 ** 63, size=num_perm, dtype=np.uint64) << np.uint64(1)
+    
+    def __reduce__(self):
+        return (MinHasher, (self.num_perm, self.shingle_size, self.seed))
+    
+    def _shingles(self, text: str):
+        """返回去重后的 n-gram 哈希数组"""
+        import numpy as np
+        
+        text = " ".join(text.split())
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        size = min(self.shingle_size, len(codes))
+        if size == 0:
+            return codes
+        count = len(codes) - size + 1
+        hashes = np.zeros(count, dtype=np.uint64)
+        for i in range(size):
+            hashes = hashes * np.uint64(1099511628211) + codes[i:i + count]
+        return np.unique(hashes)
+    
+    def signature(self, text: str):
+        """
+        计算单条文本的签名
+        
+        Args:
+            text: 输入文本
+            
+        Returns:
+            numpy.ndarray: 长度为 num_perm 的 uint32 数组
+        """
+        import numpy as np
+        
+        shingles = self._shingles(text)
+        if len(shingles) == 0:
+            return np.full(self.num_perm, 0xFFFFFFFF, dtype=np.uint32)
+        values = (shingles[:, None] * self._a + self._b) >> np.uint64(32)
+        return values.min(axis=0).astype(np.uint32)
+    
+    @staticmethod
+    def similarity(a, b) -> float:
+        """根据两个签名估计 Jaccard 相似度"""
+        return float((a == b).mean())
+
+class MinHashIndex:
+    """
+    基于 MinHash + LSH 分桶的近似重复检索索引
+    
+    签名被切成 bands 段，每段哈希后放入对应的桶，查询时只比较至少有一段相同的候选，
+    再用完整签名估计相似度，因此查询耗时与索引规模基本无关。
+    分段参数按 threshold 自动选择，使相似度达到 threshold 的文本以很高概率成为候选；
+    查询时使用更低的阈值会降低召回率。
+    """
     
-    if remove_numbers:
-        text = re.sub(r'\d+', '', text)
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        bands: Optional[int] = None,
+        seed: int = 1,
+        hasher: Optional[MinHasher] = None
+    ):
+        """
+        初始化索引
+        
+        Args:
+            threshold: 默认的相似度阈值
+            num_perm: 签名长度
+            shingle_size: 字符 n-gram 的长度
+            bands: LSH 分段数，必须整除 num_perm，默认按 threshold 选择
+            seed: 随机种子
+            hasher: 已有的 MinHasher（可选），提供时忽略 num_perm、shingle_size 和 seed
+            
+        Examples:
+            >>> index = MinHashIndex(threshold=0.85)
+            >>> for chunk in chunks:
+            ...     if index.add_if_new(chunk):
+            ...         summarize(chunk)
+        """
+        import numpy as np
+        
+        self.hasher = hasher or MinHasher(num_perm, shingle_size, seed)
+        self.threshold = threshold
+        num_perm = self.hasher.num_perm
+        self.bands = bands or self._choose_bands(num_perm, threshold)
+        if num_perm % self.bands:
+            raise ValueError("bands must divide num_perm")
+        self.rows = num_perm // self.bands
+        self.keys: List = []
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
     
-    if remove_punctuation:
-        text = re.sub(r'[^\w\s]', '', text)
+    @staticmethod
+    def _choose_bands(num_perm: int, threshold: float) -> int:
+        """选择使 S 曲线拐点 (1/b)^(1/r) 略低于阈值的分段数，偏向高召回"""
+        best = 1
+        for bands in range(1, num_perm + 1):
+            if num_perm % bands:
+                continue
+            if (1 / bands) ** (bands / num_perm) <= threshold - 0.1:
+                break
+            best = bands
+        return best
     
-    return text.strip() 
\ No newline at end of file
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def _band_keys(self, signatures):
+        """把 (n, num_perm) 签名折叠为 (n, bands) 的64位分段哈希"""
+        import numpy as np
+        
+        rows = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        keys = np.full(rows.shape[:2], 14695981039346656037, dtype=np.uint64)
+        for i in range(self.rows):
+            keys = (keys ^ rows[:, :, i]) * np.uint64(1099511628211)
+        return keys
+    
+    def add_signatures(self, signatures, keys: Optional[Sequence] = None) -> None:
+        """
+        批量加入已计算的签名
+        
+        Args:
+            signatures: (n, num_perm) 的签名数组
+            keys: 每条签名对应的标识，默认为其序号
+        """
+        import numpy as np
+        
+        signatures = np.asarray(signatures, dtype=np.uint32).reshape(-1, self.hasher.num_perm)
+        start = len(self.keys)
+        count = len(signatures)
+        self.keys.extend(keys if keys is not None else range(start, start + count))
+        
+        # 按容量倍增，摊销追加的复制开销
+        if start + count > len(self._signatures):
+            capacity = max(start + count, 2 * len(self._signatures), 1024)
+            grown = np.empty((capacity, self.hasher.num_perm), dtype=np.uint32)
+            grown[:start] = self._signatures[:start]
+            self._signatures = grown
+        self._signatures[start:start + count] = signatures
+        
+        for offset, band_keys in enumerate(self._band_keys(signatures).tolist()):
+            for band, key in enumerate(band_keys):
+                self._buckets[band].setdefault(key, []).append(start + offset)
+    
+    def add(self, text: str, key=None) -> None:
+        """
+        加入一条文本
+        
+        Args:
+            text: 输入文本
+            key: 文本标识，默认为其序号
+        """
+        self.add_signatures([self.hasher.signature(text)], None if key is None else [key])
+    
+    def query_signature(self, signature, threshold: Optional[float] = None) -> List[Tuple[Any, float]]:
+        """
+        查询与签名相似的已有条目
+        
+        Args:
+            signature: 查询签名
+            threshold: 相似度阈值，默认使用索引的 threshold
+            
+        Returns:
+            List[Tuple[Any, float]]: (标识, 估计相似度) 列表，按相似度降序
+        """
+        import numpy as np
+        
+        threshold = self.threshold if threshold is None else threshold
+        signature = np.asarray(signature, dtype=np.uint32)
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature[None, :])[0].tolist()):
+            candidates.update(self._buckets[band].get(key, ()))
+        if not candidates:
+            return []
+        ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        scores = (self._signatures[ids] == signature).mean(axis=1)
+        keep = scores >= threshold
+        order = np.argsort(-scores[keep], kind="stable")
+        return [(self.keys[i], float(s)) for i, s in zip(ids[keep][order].tolist(), scores[keep][order].tolist())]
+    
+    def query(self, text: str, threshold: Optional[float] = None) -> List[Tuple[Any, float]]:
+        """查询与文本相似的已有条目，参数和返回值同 query_signature"""
+        return self.query_signature(self.hasher.signature(text), threshold)
+    
+    def is_near_duplicate(self, text: str, threshold: Optional[float] = None) -> bool:
+        """
+        判断索引中是否已有与文本近似重复的条目
+        
+        Args:
+            text: 输入文本
+            threshold: 相似度阈值，默认使用索引的 threshold
+            
+        Returns:
+            bool: 是否近似重复
+        """
+        return bool(self.query(text, threshold))
+    
+    def add_if_new(self, text: str, key=None, threshold: Optional[float] = None, signature=None) -> bool:
+        """
+        文本不是近似重复时加入索引
+        
+        Args:
+            text: 输入文本
+            key: 文本标识
+            threshold: 相似度阈值
+            signature: 已计算的签名（可选），避免重复计算
+            
+        Returns:
+            bool: 是否加入（即不是重复文本）
+        """
+        if signature is None:
+            signature = self.hasher.signature(text)
+        if self.query_signature(signature, threshold):
+            return False
+        self.add_signatures([signature], None if key is None else [key])
+        return True
+    
+    def save(self, path: str) -> None:
+        """
+        保存索引到 .npz 文件，标识需要能被 JSON 序列化
+        
+        Args:
+            path: 文件路径
+        """
+        import json
+        import numpy as np
+        
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                signatures=self._signatures[:len(self.keys)],
+                keys=np.array(json.dumps(self.keys, ensure_ascii=False)),
+                params=np.array([
+                    self.hasher.num_perm,
+                    self.hasher.shingle_size,
+                    self.hasher.seed,
+                    self.bands
+                ]),
+                threshold=np.array(self.threshold)
+            )
+    
+    @classmethod
+    def load(cls, path: str) -> "MinHashIndex":
+        """
+        从 save 生成的文件加载索引
+        
+        Args:
+            path: 文件路径
+            
+        Returns:
+            MinHashIndex: 加载的索引
+        """
+        import json
+        import numpy as np
+        
+        with np.load(path) as data:
+            num_perm, shingle_size, seed, bands = data["params"].tolist()
+            index = cls(
+                threshold=float(data["threshold"]),
+                bands=bands,
+                hasher=MinHasher(num_perm, shingle_size, seed)
+            )
+            index.add_signatures(data["signatures"], json.loads(str(data["keys"])))
+        return index
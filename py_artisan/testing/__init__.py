@@ -0,0 +1 @@
+"""测试工具包模块"""
@@ -0,0 +1,280 @@
+"""本地 HTTP 服务，供基准测试和单元测试共用
+
+RangeFileServer 提供支持 Range、If-Range 和 If-None-Match 的静态文件，可以模拟不支持 Range
+或传输中断的服务器；OpenAIStubServer 模拟 OpenAI 兼容接口，回显最后一条消息，可以设置每个请求的
+固定延迟和流式输出的 token 间隔。两者都在后台线程中运行，用作上下文管理器，并记录收到的请求。
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+class _LocalServer:
+    """在后台线程中运行的 ThreadingHTTPServer"""
+    
+    handler = BaseHTTPRequestHandler
+    
+    def __init__(self):
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self._server = None
+        self.base_url = None
+    
+    def __enter__(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        server.daemon_threads = True
+        server.request_queue_size = 128
+        server.state = self
+        self._server = server
+        self.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+    
+    def _begin(self, request) -> None:
+        with self.lock:
+            self.requests.append(request)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+    
+    def _end(self) -> None:
+        with self.lock:
+            self.active -= 1
+
+class _FileHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _serve(self, send_body: bool) -> None:
+        state = self.server.state
+        state._begin((self.command, self.path, dict(self.headers)))
+        with state.lock:
+            state.clients.add(self.client_address)
+        try:
+            self._send(state, send_body)
+        finally:
+            state._end()
+    
+    def _send(self, state: "RangeFileServer", send_body: bool) -> None:
+        data = state.files.get(self.path)
+        if data is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        etag = state.etag(self.path)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        start, end = 0, len(data) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)$", self.headers.get("Range") or "")
+        partial = bool(state.accept_ranges and match and self.headers.get("If-Range") in (None, etag))
+        if partial:
+            start = int(match.group(1))
+            if match.group(2):
+                end = min(int(match.group(2)), len(data) - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            self.send_response(200)
+        if state.accept_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if not send_body:
+            return
+        
+        view = memoryview(data)[start:end + 1]
+        with state.lock:
+            fail = partial and state.fail_ranges > 0
+            if fail:
+                state.fail_ranges -= 1
+        if fail:
+            # 只发送一半内容后断开连接
+            self.wfile.write(view[:len(view) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        for offset in range(0, len(view), 256 * 1024):
+            self.wfile.write(view[offset:offset + 256 * 1024])
+    
+    def do_HEAD(self):
+        self._serve(send_body=False)
+    
+    def do_GET(self):
+        self._serve(send_body=True)
+
+class RangeFileServer(_LocalServer):
+    """
+    支持 Range 请求的本地文件服务
+    
+    ETag 为文件内容的 md5，修改 files 中的内容后 If-Range / If-None-Match 随之失效。
+    accept_ranges 为 False 时忽略 Range 并且不返回 Accept-Ranges；fail_ranges 大于0时，
+    接下来的这么多个 Range 响应只发送一半内容就断开连接。
+    
+    Examples:
+        >>> with RangeFileServer({"/data.bin": payload}) as server:
+        ...     FileDownloader.download(server.url("/data.bin"), "data.bin", max_workers=4)
+    """
+    
+    handler = _FileHandler
+    
+    def __init__(self, files: Optional[Dict[str, bytes]] = None):
+        super().__init__()
+        self.files = files if files is not None else {}
+        self.accept_ranges = True
+        self.fail_ranges = 0
+        self.clients = set()
+        self._etags: Dict[str, tuple] = {}
+    
+    def etag(self, path: str) -> str:
+        """文件当前内容的 ETag，内容不变时不重复计算摘要"""
+        data = self.files[path]
+        with self.lock:
+            cached = self._etags.get(path)
+            if cached is not None and cached[0] is data:
+                return cached[1]
+        etag = '"%s"' % hashlib.md5(data).hexdigest()
+        with self.lock:
+            self._etags[path] = (data, etag)
+        return etag
+
+class _OpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_POST(self):
+        state = self.server.state
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        state._begin((self.path, dict(self.headers), payload))
+        try:
+            time.sleep(state.latency)
+            self._handle(payload)
+        finally:
+            state._end()
+    
+    def _handle(self, payload: dict) -> None:
+        if self.path == "/v1/embeddings":
+            self._send_embeddings(payload)
+            return
+        if self.path != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        prompt = payload["messages"][-1]["content"]
+        if prompt == "fail":
+            self._send_json(500, {"error": {"message": "server error"}})
+            return
+        answer = f"echo: {prompt}"
+        if payload.get("stream"):
+            self._send_stream(answer)
+            return
+        self._send_json(200, {
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "model": payload["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt),
+                "completion_tokens": len(answer),
+                "total_tokens": len(prompt) + len(answer)
+            }
+        })
+    
+    def _send_embeddings(self, payload: dict) -> None:
+        # 由文本哈希生成确定的向量
+        state = self.server.state
+        data = []
+        for index, text in enumerate(payload["input"]):
+            digest = hashlib.sha256(text.encode("utf-8")).digest()
+            vector = [digest[i % len(digest)] / 255 for i in range(state.embedding_dim)]
+            data.append({"object": "embedding", "index": index, "embedding": vector})
+        # 打乱顺序，客户端需要按 index 排序
+        data.reverse()
+        tokens = sum(len(text) for text in payload["input"])
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": payload["model"],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        })
+    
+    def _send_stream(self, answer: str) -> None:
+        state = self.server.state
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        
+        def send(text: str):
+            data = text.encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+        
+        send(": keep-alive\n\n")
+        for i, word in enumerate(answer.split(" ")):
+            chunk = {"choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}}]}
+            send(f"data: {json.dumps(chunk)}\n\n")
+            if state.token_delay:
+                time.sleep(state.token_delay)
+        send('data: {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}\n\n')
+        send("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+class OpenAIStubServer(_LocalServer):
+    """
+    OpenAI 兼容接口的本地模拟服务
+    
+    chat/completions 回显最后一条消息（"echo: ..."），内容为 "fail" 时返回 500；
+    embeddings 返回由文本哈希生成的向量，并且倒序排列。
+    
+    Examples:
+        >>> with OpenAIStubServer(latency=0.05) as server:
+        ...     client = OpenAIClient("test", base_url=server.url("/v1"))
+    """
+    
+    handler = _OpenAIHandler
+    
+    def __init__(self, latency: float = 0.0, token_delay: float = 0.0, embedding_dim: int = 8):
+        """
+        Args:
+            latency: 每个请求在响应前的固定延迟（秒）
+            token_delay: 流式输出时相邻 token 的间隔（秒）
+            embedding_dim: embeddings 接口返回的向量维度
+        """
+        super().__init__()
+        self.latency = latency
+        self.token_delay = token_delay
+        self.embedding_dim = embedding_dim
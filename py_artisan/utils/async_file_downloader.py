@@ -0,0 +1,244 @@
+"""Async file downloader module"""
+import asyncio
+import os
+import time
+import aiohttp
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, AsyncIterator, Iterable, Tuple, Union
+from urllib.parse import urlparse
+from py_artisan.utils.file_downloader import FileDownloader, DownloadResult
+
+class AsyncFileDownloader:
+    """Asyncio file downloader class"""
+    
+    def __init__(
+        self,
+        max_concurrency: int = 100,
+        limit_per_host: int = 0,
+        timeout: int = 30,
+        chunk_size: int = 256 * 1024,
+        io_workers: int = 4
+    ):
+        """
+        Initialize async downloader
+        
+        Args:
+            max_concurrency: Maximum number of concurrent transfers
+            limit_per_host: Maximum connections per host, 0 for no limit
+            timeout: Default request timeout in seconds
+            chunk_size: Size of chunks read from the network
+            io_workers: Threads used for file writes
+        
+        Examples:
+            >>> async with AsyncFileDownloader(max_concurrency=200) as downloader:
+            ...     path = await downloader.download_file('https://example.com/file.pdf')
+        """
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.io_workers = io_workers
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def __aenter__(self) -> 'AsyncFileDownloader':
+        self._get_session()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    async def close(self) -> None:
+        """Close the HTTP session and the file write executor"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._io_executor is not None:
+            # Wait for pending writes in a worker thread so the event loop keeps running
+            executor, self._io_executor = self._io_executor, None
+            await asyncio.to_thread(executor.shutdown, True)
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the shared session lazily inside the running event loop"""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.limit_per_host
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the file write executor lazily, so the downloader can be reopened after close()"""
+        if self._io_executor is None:
+            self._io_executor = ThreadPoolExecutor(max_workers=self.io_workers)
+        return self._io_executor
+    
+    async def get_stream(
+        self,
+        url: str,
+        referer: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[int] = None
+    ) -> aiohttp.ClientResponse:
+        """
+        Get response stream from URL
+        
+        The caller must release the response, e.g. with `async with`.
+        
+        Args:
+            url: File URL to download
+            referer: Referer URL (optional)
+            headers: Additional headers (optional)
+            timeout: Request timeout in seconds (optional)
+        
+        Returns:
+            aiohttp.ClientResponse: Response whose body can be read incrementally
+        
+        Raises:
+            aiohttp.ClientError: When download fails
+        
+        Examples:
+            >>> async with await downloader.get_stream(url) as response:
+            ...     async for chunk in response.content.iter_chunked(65536):
+            ...         handle(chunk)
+        """
+        response = await self._get_session().get(
+            url,
+            headers=FileDownloader._build_headers(referer, headers),
+            timeout=aiohttp.ClientTimeout(total=None, sock_read=timeout or self.timeout)
+        )
+        try:
+            response.raise_for_status()
+        except aiohttp.ClientResponseError:
+            response.release()
+            raise
+        return response
+    
+    async def download_file(
+        self,
+        url: str,
+        output_path: Optional[str] = None,
+        referer: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[int] = None,
+        chunk_size: Optional[int] = None
+    ) -> str:
+        """
+        Download file from URL to local path
+        
+        Network reads run on the event loop while file writes run on a
+        thread pool, so slow disks do not stall other transfers. The body is
+        written to '<output_path>.part' and renamed on success, so a failed
+        transfer leaves no truncated file behind.
+        
+        Args:
+            url: File URL to download
+            output_path: Local path to save file (optional)
+            referer: Referer URL (optional)
+            headers: Additional headers (optional)
+            timeout: Request timeout in seconds (optional)
+            chunk_size: Size of chunks to download (optional)
+        
+        Returns:
+            str: Path to downloaded file
+        
+        Examples:
+            >>> async with AsyncFileDownloader() as downloader:
+            ...     path = await downloader.download_file('https://example.com/file.pdf')
+        """
+        if not output_path:
+            file_name = os.path.basename(urlparse(url).path)
+            if not file_name:
+                file_name = 'downloaded_file'
+            output_path = file_name
+        
+        self._get_session()
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        part_path = f'{output_path}.part'
+        async with self._semaphore:
+            try:
+                response = await self.get_stream(url, referer=referer, headers=headers, timeout=timeout)
+                async with response:
+                    f = await loop.run_in_executor(executor, open, part_path, 'wb')
+                    try:
+                        async for chunk in response.content.iter_chunked(chunk_size or self.chunk_size):
+                            await loop.run_in_executor(executor, f.write, chunk)
+                    finally:
+                        await loop.run_in_executor(executor, f.close)
+                await loop.run_in_executor(executor, os.replace, part_path, output_path)
+            except BaseException:
+                FileDownloader._remove_files(part_path)
+                raise
+        
+        return output_path
+    
+    async def _download_one(self, url: str, output_path: str, **kwargs) -> DownloadResult:
+        """Download a single file, capturing errors in the result"""
+        started = time.perf_counter()
+        try:
+            path = await self.download_file(url, output_path, **kwargs)
+            return DownloadResult(url, path, elapsed=time.perf_counter() - started)
+        except Exception as e:
+            return DownloadResult(url, error=e, elapsed=time.perf_counter() - started)
+    
+    async def download_many(
+        self,
+        urls: Iterable[Union[str, Tuple[str, str]]],
+        output_dir: Optional[str] = None,
+        referer: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[int] = None
+    ) -> AsyncIterator[DownloadResult]:
+        """
+        Download many files concurrently on the current event loop
+        
+        At most 2 * max_concurrency tasks exist at a time, so very large URL
+        iterables are consumed lazily.
+        
+        Args:
+            urls: URLs, or (url, output_path) tuples
+            output_dir: Directory for files named after the URL (optional)
+            referer: Referer URL (optional)
+            headers: Additional headers (optional)
+            timeout: Request timeout in seconds (optional)
+        
+        Returns:
+            AsyncIterator[DownloadResult]: Results in completion order
+        
+        Examples:
+            >>> async with AsyncFileDownloader(max_concurrency=500) as downloader:
+            ...     async for result in downloader.download_many(urls, output_dir='downloads'):
+            ...         print(result.url, result.ok)
+        """
+        items = iter(urls)
+        pending = set()
+        try:
+            while True:
+                for item in items:
+                    url, output_path = item if isinstance(item, tuple) else (item, None)
+                    if not output_path:
+                        file_name = os.path.basename(urlparse(url).path) or 'downloaded_file'
+                        output_path = os.path.join(output_dir or '.', file_name)
+                    pending.add(asyncio.ensure_future(self._download_one(
+                        url,
+                        output_path,
+                        referer=referer,
+                        headers=headers,
+                        timeout=timeout
+                    )))
+                    if len(pending) >= self.max_concurrency * 2:
+                        break
+                
+                if not pending:
+                    break
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,94 @@
+"""并发工具模块"""
+from concurrent.futures import Executor, Future, FIRST_COMPLETED, wait
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Set, TypeVar
+
+T = TypeVar("T")
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    把可迭代对象按固定大小分批
+    
+    Args:
+        iterable: 输入序列，可以是生成器
+        size: 每批的元素个数
+        
+    Returns:
+        Iterator[List]: 依次产出的批次，最后一批可能不足 size
+        
+    Examples:
+        >>> list(chunked(range(5), 2))
+        [[0, 1], [2, 3], [4]]
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def bounded_map(
+    executor: Executor,
+    fn: Callable[..., Any],
+    iterable: Iterable[Any],
+    max_in_flight: int,
+    ordered: bool = True
+) -> Iterator[Any]:
+    """
+    在执行器上映射函数，同时最多提交 max_in_flight 个任务
+    
+    与 Executor.map 不同，输入按需读取，结果流式产出，
+    处理超大或无限序列时内存占用保持恒定。
+    
+    Args:
+        executor: 线程池或进程池
+        fn: 处理单个元素的函数
+        iterable: 输入序列
+        max_in_flight: 同时提交的最大任务数
+        ordered: True 时按输入顺序产出结果，否则按完成顺序
+        
+    Returns:
+        Iterator: 结果迭代器，任务抛出的异常会在取到对应结果时重新抛出
+        
+    Examples:
+        >>> with ProcessPoolExecutor() as executor:
+        ...     for result in bounded_map(executor, work, items, max_in_flight=16):
+        ...         print(result)
+    """
+    if max_in_flight <= 0:
+        raise ValueError("max_in_flight must be positive")
+    
+    items = iter(iterable)
+    queue: Deque[Future] = deque()
+    pending: Set[Future] = set()
+    
+    def submit(item: Any) -> None:
+        future = executor.submit(fn, item)
+        pending.add(future)
+        if ordered:
+            queue.append(future)
+    
+    try:
+        for item in islice(items, max_in_flight):
+            submit(item)
+        
+        while pending:
+            if ordered:
+                future = queue.popleft()
+                pending.discard(future)
+                result = future.result()
+                done = [future]
+            else:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # 先补充任务再产出结果，消费方处理结果时执行器不会空闲
+            for item in islice(items, len(done)):
+                submit(item)
+            if ordered:
+                yield result
+            else:
+                for future in done:
+                    yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -1,11 +1,139 @@
 """Configuration management module"""
 import os
-from typing import Any, Optional
-from dotenv import load_dotenv
+import hashlib
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple
+from dotenv import dotenv_values, load_dotenv
+
+_MISSING = object()
+
+_TRUE_VALUES = {'1', 'true', 'yes', 'on'}
+_FALSE_VALUES = {'0', 'false', 'no', 'off', ''}
+
+SettingsCallback = Callable[[FrozenSet[str], 'Settings'], None]
+
+class Settings:
+    """
+    Immutable snapshot of environment settings
+    
+    Typed getters parse and validate a value once and memoize the result, so
+    repeated reads on hot paths are a dict lookup. A new snapshot is published
+    by Config whenever the environment is reloaded; holders of an old snapshot
+    keep seeing consistent values.
+    """
+    
+    def __init__(self, values: Mapping[str, str], version: int = 0):
+        """
+        Initialize settings snapshot
+        
+        Args:
+            values: Environment variable values
+            version: Snapshot version, incremented on every published change
+            
+        Examples:
+            >>> settings = Settings({'OPENAI_TIMEOUT': '30'})
+            >>> settings.get_int('OPENAI_TIMEOUT')
+            30
+        """
+        self._values = MappingProxyType(dict(values))
+        self._parsed: Dict[Tuple[str, Callable], Any] = {}
+        self.version = version
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+    
+    def __getitem__(self, key: str) -> str:
+        return self._values[key]
+    
+    @property
+    def values(self) -> Mapping[str, str]:
+        """Read-only view of all raw values"""
+        return self._values
+    
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Get a raw value, or default when not set"""
+        return self._values.get(key, default)
+    
+    def _get_parsed(self, key: str, parse: Callable[[str], Any], default: Any, description: Optional[str]) -> Any:
+        """Parse a value once and memoize it"""
+        cache_key = (key, parse)
+        try:
+            return self._parsed[cache_key]
+        except KeyError:
+            pass
+        
+        raw = self._values.get(key)
+        if raw is None:
+            if default is _MISSING:
+                desc = f" ({description})" if description else ""
+                raise ValueError(f"Environment variable {key}{desc} is not set")
+            return default
+        try:
+            value = parse(raw)
+        except ValueError as e:
+            raise ValueError(f"Environment variable {key} has invalid value {raw!r}: {e}") from e
+        self._parsed[cache_key] = value
+        return value
+    
+    def get_str(self, key: str, default: Any = _MISSING, description: Optional[str] = None) -> str:
+        """
+        Get a string value
+        
+        Args:
+            key: Environment variable name
+            default: Value returned when not set; raises when omitted
+            description: Environment variable description for error message
+            
+        Returns:
+            str: Environment variable value
+            
+        Raises:
+            ValueError: When the variable is not set and no default is given
+        """
+        return self._get_parsed(key, str, default, description)
+    
+    def get_int(self, key: str, default: Any = _MISSING, description: Optional[str] = None) -> int:
+        """Get an integer value, see get_str"""
+        return self._get_parsed(key, int, default, description)
+    
+    def get_float(self, key: str, default: Any = _MISSING, description: Optional[str] = None) -> float:
+        """Get a float value, see get_str"""
+        return self._get_parsed(key, float, default, description)
+    
+    def get_bool(self, key: str, default: Any = _MISSING, description: Optional[str] = None) -> bool:
+        """Get a boolean value (1/true/yes/on or 0/false/no/off), see get_str"""
+        return self._get_parsed(key, _parse_bool, default, description)
+    
+    def diff(self, other: 'Settings') -> FrozenSet[str]:
+        """
+        Get the keys whose values differ between two snapshots
+        
+        Args:
+            other: Snapshot to compare with
+            
+        Returns:
+            FrozenSet[str]: Added, removed and changed keys
+        """
+        keys = set(self._values) | set(other._values)
+        return frozenset(key for key in keys if self._values.get(key) != other._values.get(key))
+
+def _parse_bool(value: str) -> bool:
+    normalized = value.strip().lower()
+    if normalized in _TRUE_VALUES:
+        return True
+    if normalized in _FALSE_VALUES:
+        return False
+    raise ValueError(f"expected a boolean, got {value!r}")
 
 class Config:
     """Configuration management class"""
     
+    _settings: Optional[Settings] = None
+    _file_states: Dict[str, Tuple[int, int, str]] = {}
+    _subscribers: List[SettingsCallback] = []
+    _lock = threading.RLock()
+    
     @staticmethod
     def get_env(key: str, description: str = None) -> Any:
         """
@@ -46,4 +174,122 @@ class Config:
             >>> Config.load_env()  # Load from .env
             >>> Config.load_env('.env.local')  # Load from custom file
         """
-        return load_dotenv(env_path, override=True)
+        Config.settings()  # Snapshot the current values so the change can be diffed
+        loaded = load_dotenv(env_path, override=True)
+        Config.refresh()
+        return loaded
+
+    @classmethod
+    def settings(cls) -> Settings:
+        """
+        Get the current settings snapshot
+        
+        The first call snapshots os.environ. Later snapshots are published by
+        load_env, reload and refresh.
+        
+        Returns:
+            Settings: Current immutable snapshot
+            
+        Examples:
+            >>> timeout = Config.settings().get_int('OPENAI_TIMEOUT', 30)
+        """
+        settings = cls._settings
+        if settings is None:
+            with cls._lock:
+                if cls._settings is None:
+                    cls._settings = Settings(os.environ)
+                settings = cls._settings
+        return settings
+    
+    @classmethod
+    def _file_state(cls, env_path: str) -> Optional[Tuple[int, int, str]]:
+        """Get (mtime_ns, size, sha256) of an env file, hashing only when stat changed"""
+        try:
+            stat = os.stat(env_path)
+        except OSError:
+            return None
+        previous = cls._file_states.get(env_path)
+        if previous is not None and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+            return previous
+        with open(env_path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        return stat.st_mtime_ns, stat.st_size, digest
+    
+    @classmethod
+    def reload(cls, env_path: Optional[str] = None, force: bool = False) -> bool:
+        """
+        Reload a .env file only when its contents changed
+        
+        A stat call decides whether the file may have changed; the file is
+        hashed only when its mtime or size moved, and parsed only when the
+        hash differs. This makes reload cheap enough to call periodically.
+        
+        Args:
+            env_path: Path to .env file, defaults to '.env' in current directory
+            force: Reload even when the file did not change
+            
+        Returns:
+            bool: True if a new settings snapshot was published
+            
+        Examples:
+            >>> Config.reload()  # No-op unless .env changed
+        """
+        env_path = os.path.abspath(env_path or '.env')
+        with cls._lock:
+            cls.settings()
+            state = cls._file_state(env_path)
+            previous = cls._file_states.get(env_path)
+            if state is not None:
+                cls._file_states[env_path] = state
+                if force or previous is None or previous[2] != state[2]:
+                    for key, value in dotenv_values(env_path).items():
+                        if value is not None:
+                            os.environ[key] = value
+                    force = True
+        # Subscribers are notified outside the lock
+        return cls.refresh() if force else False
+    
+    @classmethod
+    def refresh(cls) -> bool:
+        """
+        Snapshot os.environ and notify subscribers of changed keys
+        
+        Returns:
+            bool: True if any value changed
+        """
+        with cls._lock:
+            old = cls.settings()
+            new = Settings(os.environ, old.version + 1)
+            changed = new.diff(old)
+            if not changed:
+                return False
+            cls._settings = new
+            subscribers = list(cls._subscribers)
+        
+        for callback in subscribers:
+            callback(changed, new)
+        return True
+    
+    @classmethod
+    def subscribe(cls, callback: SettingsCallback) -> Callable[[], None]:
+        """
+        Register a callback invoked with (changed_keys, settings) on changes
+        
+        Args:
+            callback: Function called after a new snapshot is published
+            
+        Returns:
+            Callable[[], None]: Function that removes the subscription
+            
+        Examples:
+            >>> unsubscribe = Config.subscribe(lambda changed, settings: print(changed))
+        """
+        with cls._lock:
+            cls._subscribers.append(callback)
+        
+        def unsubscribe():
+            with cls._lock:
+                if callback in cls._subscribers:
+                    cls._subscribers.remove(callback)
+        
+        return unsubscribe
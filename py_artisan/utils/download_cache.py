@@ -0,0 +1,377 @@
+"""Download cache module"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+import requests
+from typing import Optional, BinaryIO, Dict, List
+from py_artisan.utils import metrics
+from py_artisan.utils.file_downloader import FileDownloader
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class FileLock:
+    """Inter-process exclusive lock backed by a lock file"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+    
+    def __enter__(self) -> 'FileLock':
+        self._file = open(self.path, 'a+b')
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
+
+class DownloadCache:
+    """
+    Content-addressed on-disk download cache
+    
+    Layout:
+        entries/<sha256(url)>.json  URL, validators and blob digest
+        blobs/<xx>/<sha256>         File contents, named by their sha256
+        tmp/                        In-progress downloads
+    
+    Entries are revalidated with If-None-Match / If-Modified-Since, so an
+    unchanged file costs one 304 round trip. The entry file mtime records the
+    last access, and the least recently used entries are evicted once the
+    blobs exceed max_size. The total blob size is kept in a 'size' file, so
+    inserts only scan the entries when the cache is over budget. Index
+    updates and entry lookups run under a file lock and every file is
+    published with an atomic rename, so several processes can share one
+    cache directory.
+    """
+    
+    # Automatic eviction shrinks the cache to this fraction of max_size, so
+    # the entry scan is not repeated on every insert into a full cache
+    EVICT_TARGET = 0.9
+    
+    def __init__(self, cache_dir: str, max_size: int = 10 * 1024 ** 3):
+        """
+        Initialize download cache
+        
+        Args:
+            cache_dir: Cache directory, created if missing
+            max_size: Maximum total size of cached blobs in bytes
+        
+        Examples:
+            >>> cache = DownloadCache('~/.cache/py_artisan/downloads', max_size=50 * 1024 ** 3)
+            >>> path = cache.fetch('https://example.com/model.bin')
+        """
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_size = max_size
+        for name in ('entries', 'blobs', 'tmp'):
+            os.makedirs(os.path.join(self.cache_dir, name), exist_ok=True)
+        self._lock_path = os.path.join(self.cache_dir, '.lock')
+        self._size_path = os.path.join(self.cache_dir, 'size')
+    
+    def _entry_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, 'entries', f'{key}.json')
+    
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, 'blobs', digest[:2], digest)
+    
+    @staticmethod
+    def _load_entry(entry_path: str) -> Optional[Dict]:
+        try:
+            with open(entry_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _read_entry(self, entry_path: str) -> Optional[Dict]:
+        entry = self._load_entry(entry_path)
+        if entry is None or not os.path.exists(self._blob_path(entry['sha256'])):
+            return None
+        return entry
+    
+    def _scan_entries(self) -> List:
+        """All entries as (access time, path, entry); the caller must hold the file lock"""
+        entries = []
+        entries_dir = os.path.join(self.cache_dir, 'entries')
+        for name in os.listdir(entries_dir):
+            path = os.path.join(entries_dir, name)
+            entry = self._load_entry(path)
+            try:
+                atime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if entry is not None:
+                entries.append((atime, path, entry))
+        return entries
+    
+    def _remove_blob(self, digest: str) -> int:
+        """Remove a blob and return its size; the caller must hold the file lock"""
+        blob_path = self._blob_path(digest)
+        try:
+            size = os.path.getsize(blob_path)
+            os.remove(blob_path)
+        except OSError:
+            return 0
+        return size
+    
+    def _write_entry(self, entry_path: str, entry: Dict) -> None:
+        tmp_path = os.path.join(self.cache_dir, 'tmp', uuid.uuid4().hex)
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, entry_path)
+    
+    def _touch(self, entry_path: str) -> Optional[str]:
+        """
+        Mark an entry as recently used and return its blob path
+        
+        Runs under the file lock, so another process cannot evict the blob
+        between the lookup and the access time update.
+        
+        Returns:
+            Optional[str]: Blob path, or None when the entry or blob is gone
+        """
+        with FileLock(self._lock_path):
+            entry = self._read_entry(entry_path)
+            if entry is None:
+                return None
+            os.utime(entry_path)
+            return self._blob_path(entry['sha256'])
+    
+    def _load_total(self) -> int:
+        """Indexed total blob size, rebuilt when missing; the caller must hold the file lock"""
+        try:
+            with open(self._size_path) as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            total = self.size()
+            self._store_total(total)
+            return total
+    
+    def _store_total(self, total: int) -> None:
+        tmp_path = os.path.join(self.cache_dir, 'tmp', uuid.uuid4().hex)
+        with open(tmp_path, 'w') as f:
+            f.write(str(total))
+        os.replace(tmp_path, self._size_path)
+    
+    def get(self, url: str) -> Optional[str]:
+        """
+        Get the cached file path for a URL without any network access
+        
+        Args:
+            url: File URL
+        
+        Returns:
+            Optional[str]: Path to the cached blob, or None when not cached
+        """
+        return self._touch(self._entry_path(url))
+    
+    def fetch(
+        self,
+        url: str,
+        referer: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: int = 30,
+        revalidate: bool = True,
+        session: Optional[requests.Session] = None
+    ) -> str:
+        """
+        Get the cached file for a URL, downloading it when missing or stale
+        
+        Args:
+            url: File URL
+            referer: Referer URL (optional)
+            headers: Additional headers (optional)
+            timeout: Request timeout in seconds
+            revalidate: Send a conditional request for cached entries
+            session: Session used for connection pooling (optional)
+        
+        Returns:
+            str: Path to the cached blob; treat it as read-only
+        
+        Raises:
+            requests.exceptions.RequestException: When download fails
+        
+        Examples:
+            >>> cache = DownloadCache('/tmp/downloads')
+            >>> with open(cache.fetch('https://example.com/corpus.txt'), 'rb') as f:
+            ...     data = f.read()
+        """
+        entry_path = self._entry_path(url)
+        entry = self._read_entry(entry_path)
+        if entry is not None and not revalidate:
+            blob_path = self._touch(entry_path)
+            if blob_path is not None:
+                metrics.inc('download_cache_requests_total', result='hit')
+                return blob_path
+            entry = None
+        
+        request_headers = FileDownloader._build_headers(referer, headers)
+        if entry is not None:
+            if entry.get('etag'):
+                request_headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                request_headers['If-Modified-Since'] = entry['last_modified']
+        
+        response = (session or requests).get(
+            url,
+            headers=request_headers,
+            stream=True,
+            timeout=timeout
+        )
+        with response:
+            if response.status_code == 304 and entry is not None:
+                blob_path = self._touch(entry_path)
+                if blob_path is not None:
+                    metrics.inc('download_cache_requests_total', result='revalidated')
+                    return blob_path
+                # Evicted by another process meanwhile, fetch it unconditionally
+                return self.fetch(url, referer, headers, timeout, revalidate, session)
+            if response.status_code == 304:
+                # Nothing cached to revalidate, the conditional headers came from the caller
+                conditional = {'if-none-match', 'if-modified-since', 'if-match', 'if-unmodified-since', 'if-range'}
+                stripped = {k: v for k, v in (headers or {}).items() if k.lower() not in conditional}
+                if headers and len(stripped) < len(headers):
+                    return self.fetch(url, referer, stripped, timeout, revalidate, session)
+                raise requests.exceptions.HTTPError(
+                    f'304 Not Modified for {url} without a cached entry',
+                    response=response
+                )
+            response.raise_for_status()
+            metrics.inc('download_cache_requests_total', result='miss')
+            
+            hasher = hashlib.sha256()
+            tmp_path = os.path.join(self.cache_dir, 'tmp', uuid.uuid4().hex)
+            try:
+                with open(tmp_path, 'wb') as f:
+                    size = FileDownloader._copy_stream(
+                        response.raw,
+                        f,
+                        64 * 1024,
+                        on_chunk=hasher.update
+                    )
+                digest = hasher.hexdigest()
+                blob_path = self._blob_path(digest)
+                
+                with FileLock(self._lock_path):
+                    total = self._load_total()
+                    previous = self._load_entry(entry_path)
+                    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                    if os.path.exists(blob_path):
+                        os.remove(tmp_path)
+                    else:
+                        os.replace(tmp_path, blob_path)
+                        total += size
+                    self._write_entry(entry_path, {
+                        'url': url,
+                        'sha256': digest,
+                        'size': size,
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified')
+                    })
+                    if previous is not None and previous['sha256'] != digest:
+                        # The content changed; drop the old blob unless another URL shares it.
+                        # Only this rare case scans the entries
+                        if all(other['sha256'] != previous['sha256'] for _, _, other in self._scan_entries()):
+                            total -= self._remove_blob(previous['sha256'])
+                    self._store_total(total)
+                    if total > self.max_size:
+                        self._evict(int(self.max_size * self.EVICT_TARGET), keep=entry_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        
+        return blob_path
+    
+    def open(self, url: str, **kwargs) -> BinaryIO:
+        """
+        Open the cached file for a URL, downloading it when missing or stale
+        
+        Args:
+            url: File URL
+            **kwargs: Arguments passed to fetch
+        
+        Returns:
+            BinaryIO: Binary file object of the cached blob
+        """
+        return open(self.fetch(url, **kwargs), 'rb')
+    
+    def size(self) -> int:
+        """Total size of cached blobs in bytes"""
+        total = 0
+        for root, _, files in os.walk(os.path.join(self.cache_dir, 'blobs')):
+            total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        return total
+    
+    def evict(self, max_size: Optional[int] = None) -> int:
+        """
+        Evict least recently used entries until blobs fit in max_size
+        
+        Also removes unreferenced blobs and rebuilds the size index.
+        
+        Args:
+            max_size: Size limit in bytes, defaults to the cache max_size
+        
+        Returns:
+            int: Number of evicted entries
+        """
+        with FileLock(self._lock_path):
+            return self._evict(max_size=max_size)
+    
+    def clear(self) -> None:
+        """Remove all cached entries and blobs"""
+        with FileLock(self._lock_path):
+            for name in ('entries', 'blobs'):
+                path = os.path.join(self.cache_dir, name)
+                shutil.rmtree(path, ignore_errors=True)
+                os.makedirs(path, exist_ok=True)
+            self._store_total(0)
+    
+    def _evict(self, max_size: Optional[int] = None, keep: Optional[str] = None) -> int:
+        """
+        Evict entries in LRU order, the caller must hold the file lock
+        
+        Blobs that no entry points to (e.g. left by an interrupted update)
+        are removed first, and the size index is recomputed from disk.
+        """
+        max_size = self.max_size if max_size is None else max_size
+        entries = self._scan_entries()
+        refs: Dict[str, int] = {}
+        for _, _, entry in entries:
+            refs[entry['sha256']] = refs.get(entry['sha256'], 0) + 1
+        
+        total = 0
+        for root, _, files in os.walk(os.path.join(self.cache_dir, 'blobs')):
+            for name in files:
+                if name in refs:
+                    total += os.path.getsize(os.path.join(root, name))
+                else:
+                    self._remove_blob(name)
+        
+        evicted = 0
+        for _, path, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= max_size:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            evicted += 1
+            digest = entry['sha256']
+            refs[digest] -= 1
+            if refs[digest] == 0:
+                total -= self._remove_blob(digest)
+        self._store_total(total)
+        return evicted
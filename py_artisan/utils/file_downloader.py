@@ -1,9 +1,104 @@
 """File downloader module"""
+import hashlib
+import json
 import os
 import random
+import shutil
+import threading
+import time
 import requests
-from typing import Optional, BinaryIO, Dict
+import urllib3
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field, asdict
+from requests.adapters import HTTPAdapter
+from typing import Optional, BinaryIO, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, Union, TYPE_CHECKING
 from urllib.parse import urlparse
+from py_artisan.utils import metrics
+
+if TYPE_CHECKING:
+    from py_artisan.utils.download_cache import DownloadCache
+
+# Errors that may interrupt a transfer and are worth retrying
+RETRYABLE_ERRORS = (
+    requests.exceptions.RequestException,
+    urllib3.exceptions.HTTPError,
+    OSError,
+)
+
+@dataclass
+class RemoteFileInfo:
+    """Remote file information returned by a probe request"""
+    size: Optional[int] = None
+    accept_ranges: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    
+    @property
+    def validator(self) -> Optional[str]:
+        """Validator usable in an If-Range header (strong ETag or Last-Modified)"""
+        if self.etag and not self.etag.startswith('W/'):
+            return self.etag
+        return self.last_modified
+
+@dataclass
+class DownloadCheckpoint:
+    """Resume state stored next to a partial download"""
+    url: str
+    size: Optional[int] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    offset: int = 0
+    # Ranged downloads: [start, end, downloaded] per segment
+    segments: List[List[int]] = field(default_factory=list)
+    
+    def matches(self, url: str, info: RemoteFileInfo) -> bool:
+        """Check whether the checkpoint still describes the remote file"""
+        if self.url != url or self.size != info.size:
+            return False
+        if not (info.etag or info.last_modified):
+            return False
+        return self.etag == info.etag and self.last_modified == info.last_modified
+    
+    def save(self, path: str) -> None:
+        """Atomically write the checkpoint as JSON"""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str) -> Optional['DownloadCheckpoint']:
+        """Load a checkpoint, returning None when missing or unreadable"""
+        try:
+            with open(path) as f:
+                return cls(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+@dataclass
+class DownloadResult:
+    """Result of a single download in a batch"""
+    url: str
+    path: Optional[str] = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+    size: int = 0
+    # Hex digests keyed by hash algorithm name
+    digests: Dict[str, str] = field(default_factory=dict)
+    
+    @property
+    def ok(self) -> bool:
+        """Whether the download succeeded"""
+        return self.error is None
+    
+    @property
+    def throughput(self) -> float:
+        """Average throughput in bytes per second"""
+        return self.size / self.elapsed if self.elapsed > 0 else 0.0
+
+class RemoteChangedError(requests.exceptions.RequestException):
+    """Raised when the remote file changed while resuming a download"""
 
 class FileDownloader:
     """File downloader class"""
@@ -42,18 +137,44 @@ class FileDownloader:
         'Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Mobile/15E148 Safari/604.1',
     ]
     
+    # Bytes written between checkpoint saves in resume mode
+    CHECKPOINT_INTERVAL = 4 * 1024 * 1024
+    
+    # Upper bound for adaptive read sizes
+    MAX_CHUNK_SIZE = 1024 * 1024
+    
     @classmethod
     def _get_random_user_agent(cls) -> str:
         """Get a random User-Agent string"""
         return random.choice(cls.USER_AGENTS)
     
+    @classmethod
+    def _build_headers(
+        cls,
+        referer: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        """Build request headers with User-Agent and referer"""
+        request_headers = dict(headers or {})
+        
+        # Add random User-Agent if not present
+        if 'User-Agent' not in request_headers:
+            request_headers['User-Agent'] = cls._get_random_user_agent()
+            
+        # Add referer if provided
+        if referer:
+            request_headers['Referer'] = referer
+            
+        return request_headers
+    
     @classmethod
     def get_stream(
         cls,
         url: str,
         referer: Optional[str] = None,
         headers: Optional[Dict[str, str]] = None,
-        timeout: int = 30
+        timeout: int = 30,
+        session: Optional[requests.Session] = None
     ) -> BinaryIO:
         """
         Get file stream from URL
@@ -63,6 +184,7 @@ class FileDownloader:
             referer: Referer URL (optional)
             headers: Additional headers (optional)
             timeout: Request timeout in seconds
+            session: Session used for connection pooling (optional)
             
         Returns:
             BinaryIO: File stream object
@@ -75,19 +197,10 @@ class FileDownloader:
             >>> with open('file.pdf', 'wb') as f:
             ...     f.write(stream.read())
         """
-        # Initialize headers
-        request_headers = headers or {}
-        
-        # Add random User-Agent if not present
-        if 'User-Agent' not in request_headers:
-            request_headers['User-Agent'] = cls._get_random_user_agent()
-            
-        # Add referer if provided
-        if referer:
-            request_headers['Referer'] = referer
+        request_headers = cls._build_headers(referer, headers)
             
         # Make request with stream=True
-        response = requests.get(
+        response = (session or requests).get(
             url,
             headers=request_headers,
             stream=True,
@@ -97,6 +210,315 @@ class FileDownloader:
         
         return response.raw
     
+    @classmethod
+    def probe(
+        cls,
+        url: str,
+        referer: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: int = 30,
+        session: Optional[requests.Session] = None
+    ) -> RemoteFileInfo:
+        """
+        Probe remote file size, validators and Range support with a HEAD request
+        
+        Args:
+            url: File URL to probe
+            referer: Referer URL (optional)
+            headers: Additional headers (optional)
+            timeout: Request timeout in seconds
+            session: Session used for connection pooling (optional)
+            
+        Returns:
+            RemoteFileInfo: Remote file information, empty when the probe fails
+            
+        Examples:
+            >>> info = FileDownloader.probe('https://example.com/file.bin')
+            >>> print(info.size, info.accept_ranges)
+        """
+        request_headers = cls._build_headers(referer, headers)
+        try:
+            response = (session or requests).head(
+                url,
+                headers=request_headers,
+                allow_redirects=True,
+                timeout=timeout
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            return RemoteFileInfo()
+        
+        content_length = response.headers.get('Content-Length')
+        size = int(content_length) if content_length and content_length.isdigit() else None
+        accept_ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+        return RemoteFileInfo(
+            size=size,
+            accept_ranges=accept_ranges,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+    
+    @staticmethod
+    def _split_ranges(size: int, segment_size: int) -> List[List[int]]:
+        """Split [0, size) into inclusive [start, end, downloaded] segments"""
+        return [
+            [start, min(start + segment_size, size) - 1, 0]
+            for start in range(0, size, segment_size)
+        ]
+    
+    @classmethod
+    def _download_segment(
+        cls,
+        url: str,
+        output_path: str,
+        segment: List[int],
+        headers: Dict[str, str],
+        timeout: int,
+        chunk_size: int,
+        max_retries: int,
+        on_progress,
+        session: Optional[requests.Session] = None
+    ) -> None:
+        """
+        Download one [start, end, downloaded] segment into output_path
+        
+        A failed attempt is retried from the last written byte, so a retry
+        only fetches the part of the segment that is still missing.
+        """
+        start, end = segment[0], segment[1]
+        attempt = 0
+        
+        while True:
+            position = start + segment[2]
+            if position > end:
+                return
+            range_headers = dict(headers)
+            range_headers['Range'] = f'bytes={position}-{end}'
+            try:
+                response = (session or requests).get(
+                    url,
+                    headers=range_headers,
+                    stream=True,
+                    timeout=timeout
+                )
+                response.raise_for_status()
+                if response.status_code != 206:
+                    response.close()
+                    if 'If-Range' in range_headers:
+                        raise RemoteChangedError(f"Remote file changed: {url}")
+                    raise ValueError(
+                        f"Server ignored range request for bytes {position}-{end}"
+                    )
+                
+                with response, open(output_path, 'r+b') as f:
+                    f.seek(position)
+                    
+                    def on_chunk(view: memoryview) -> None:
+                        # Another segment's thread may save the checkpoint at any
+                        # time, so only report bytes that have left this buffer
+                        f.flush()
+                        on_progress(segment, len(view))
+                    
+                    position += cls._copy_stream(
+                        response.raw,
+                        f,
+                        chunk_size,
+                        limit=end - position + 1,
+                        on_chunk=on_chunk
+                    )
+                        
+                if position <= end:
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"Connection closed at byte {position} of segment {start}-{end}"
+                    )
+                return
+            except RemoteChangedError:
+                raise
+            except RETRYABLE_ERRORS:
+                attempt += 1
+                if attempt > max_retries:
+                    raise
+                metrics.inc('download_retries_total')
+                time.sleep(min(0.5 * 2 ** (attempt - 1), 10))
+    
+    @classmethod
+    def _download_segmented(
+        cls,
+        url: str,
+        output_path: str,
+        checkpoint: DownloadCheckpoint,
+        checkpoint_path: Optional[str],
+        headers: Dict[str, str],
+        timeout: int,
+        chunk_size: int,
+        max_workers: int,
+        max_retries: int,
+        session: Optional[requests.Session] = None
+    ) -> None:
+        """Download the pending segments of a checkpoint concurrently"""
+        lock = threading.Lock()
+        unsaved = [0]
+        
+        def on_progress(segment: List[int], size: int) -> None:
+            with lock:
+                segment[2] += size
+                unsaved[0] += size
+                if checkpoint_path and unsaved[0] >= cls.CHECKPOINT_INTERVAL:
+                    checkpoint.save(checkpoint_path)
+                    unsaved[0] = 0
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    cls._download_segment,
+                    url, output_path, segment,
+                    headers, timeout, chunk_size, max_retries, on_progress, session
+                )
+                for segment in checkpoint.segments
+                if segment[0] + segment[2] <= segment[1]
+            ]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+            finally:
+                if checkpoint_path:
+                    executor.shutdown(wait=True)
+                    with lock:
+                        checkpoint.save(checkpoint_path)
+    
+    @classmethod
+    def _download_stream(
+        cls,
+        url: str,
+        output_path: str,
+        checkpoint: DownloadCheckpoint,
+        checkpoint_path: Optional[str],
+        headers: Dict[str, str],
+        timeout: int,
+        chunk_size: int,
+        session: Optional[requests.Session] = None,
+        hash_algorithms: Sequence[str] = ()
+    ) -> Dict[str, str]:
+        """
+        Download as a single stream, continuing from checkpoint.offset
+        
+        Returns:
+            Dict[str, str]: Hex digests of the whole file, hashed while streaming
+        """
+        request_headers = dict(headers)
+        if checkpoint.offset:
+            request_headers['Range'] = f'bytes={checkpoint.offset}-'
+            
+        response = (session or requests).get(
+            url,
+            headers=request_headers,
+            stream=True,
+            timeout=timeout
+        )
+        response.raise_for_status()
+        
+        if checkpoint.offset and response.status_code != 206:
+            # Server sent the full file, either because it changed or
+            # because it ignores ranges
+            checkpoint.offset = 0
+            checkpoint.etag = response.headers.get('ETag')
+            checkpoint.last_modified = response.headers.get('Last-Modified')
+            
+        hashers = [hashlib.new(name) for name in hash_algorithms]
+        unsaved = 0
+        
+        with response, open(output_path, 'r+b' if checkpoint.offset else 'wb') as f:
+            if checkpoint.offset and hashers:
+                # Hash the part that was downloaded by a previous call
+                cls._hash_stream(f, hashers, checkpoint.offset)
+            f.seek(checkpoint.offset)
+            f.truncate()
+            
+            def on_chunk(view: memoryview) -> None:
+                nonlocal unsaved
+                for hasher in hashers:
+                    hasher.update(view)
+                checkpoint.offset += len(view)
+                unsaved += len(view)
+                if checkpoint_path and unsaved >= cls.CHECKPOINT_INTERVAL:
+                    f.flush()
+                    checkpoint.save(checkpoint_path)
+                    unsaved = 0
+                    
+            try:
+                cls._copy_stream(response.raw, f, chunk_size, on_chunk=on_chunk)
+            finally:
+                if checkpoint_path:
+                    f.flush()
+                    checkpoint.save(checkpoint_path)
+                    
+        return {hasher.name: hasher.hexdigest() for hasher in hashers}
+    
+    @classmethod
+    def _copy_stream(
+        cls,
+        stream: BinaryIO,
+        f: BinaryIO,
+        chunk_size: int,
+        limit: Optional[int] = None,
+        on_chunk: Optional[Callable[[memoryview], None]] = None
+    ) -> int:
+        """
+        Copy stream into f through one reusable buffer
+        
+        Reads start at chunk_size and double, up to MAX_CHUNK_SIZE, while
+        the stream keeps filling the buffer.
+        
+        Returns:
+            int: Number of bytes copied
+        """
+        buffer = memoryview(bytearray(max(chunk_size, cls.MAX_CHUNK_SIZE)))
+        size = chunk_size
+        copied = 0
+        
+        while limit is None or copied < limit:
+            want = size if limit is None else min(size, limit - copied)
+            n = stream.readinto(buffer[:want])
+            if not n:
+                break
+            view = buffer[:n]
+            f.write(view)
+            if on_chunk:
+                on_chunk(view)
+            copied += n
+            if n == size and size < cls.MAX_CHUNK_SIZE:
+                size = min(size * 2, cls.MAX_CHUNK_SIZE)
+                
+        return copied
+    
+    @classmethod
+    def _hash_stream(cls, f: BinaryIO, hashers: List, limit: Optional[int] = None) -> None:
+        """Feed up to limit bytes of an open file into hashers"""
+        buffer = memoryview(bytearray(cls.MAX_CHUNK_SIZE))
+        remaining = limit
+        f.seek(0)
+        while remaining is None or remaining > 0:
+            want = len(buffer) if remaining is None else min(len(buffer), remaining)
+            n = f.readinto(buffer[:want])
+            if not n:
+                break
+            for hasher in hashers:
+                hasher.update(buffer[:n])
+            if remaining is not None:
+                remaining -= n
+    
+    @staticmethod
+    def _parse_digest(expected_digest: str) -> Tuple[str, str]:
+        """Split 'algorithm:hexdigest' into its parts, defaulting to sha256"""
+        algorithm, sep, digest = expected_digest.partition(':')
+        if not sep:
+            return 'sha256', expected_digest.lower()
+        return algorithm.lower(), digest.lower()
+    
     @classmethod
     def download_file(
         cls,
@@ -105,26 +527,118 @@ class FileDownloader:
         referer: Optional[str] = None,
         headers: Optional[Dict[str, str]] = None,
         timeout: int = 30,
-        chunk_size: int = 8192
+        chunk_size: int = 8192,
+        max_workers: int = 1,
+        segment_size: int = 8 * 1024 * 1024,
+        max_retries: int = 3,
+        resume: bool = False,
+        session: Optional[requests.Session] = None,
+        expected_digest: Optional[str] = None,
+        hash_algorithms: Sequence[str] = (),
+        cache: Optional['DownloadCache'] = None
     ) -> str:
         """
         Download file from URL to local path
         
+        When max_workers is greater than 1 and the server supports Range
+        requests, the file is fetched as concurrent byte ranges. Otherwise
+        it falls back to a single stream.
+        
+        With resume=True the data is written to '<output_path>.part' with a
+        '<output_path>.part.json' checkpoint, and a later call continues from
+        the checkpoint using Range + If-Range. The download restarts from zero
+        when the remote ETag, Last-Modified or size changed.
+        
         Args:
             url: File URL to download
             output_path: Local path to save file (optional)
             referer: Referer URL (optional)
             headers: Additional headers (optional)
             timeout: Request timeout in seconds
-            chunk_size: Size of chunks to download
+            chunk_size: Initial size of chunks to download
+            max_workers: Number of concurrent range requests
+            segment_size: Size of each byte range in segmented mode
+            max_retries: Retries per segment in segmented mode
+            resume: Keep partial data and continue interrupted downloads
+            session: Session used for connection pooling (optional)
+            expected_digest: Expected digest as 'algorithm:hex' or sha256 hex (optional)
+            hash_algorithms: hashlib algorithm names to compute (optional)
+            cache: DownloadCache to serve and store the file (optional)
             
         Returns:
             str: Path to downloaded file
             
+        Raises:
+            ValueError: When the file does not match expected_digest
+            
         Examples:
             >>> path = FileDownloader.download_file('https://example.com/file.pdf')
             >>> print(f'Downloaded to: {path}')
+            >>> path = FileDownloader.download_file(
+            ...     'https://example.com/model.bin',
+            ...     max_workers=8,
+            ...     segment_size=16 * 1024 * 1024,
+            ...     resume=True
+            ... )
         """
+        return cls.download(
+            url,
+            output_path=output_path,
+            referer=referer,
+            headers=headers,
+            timeout=timeout,
+            chunk_size=chunk_size,
+            max_workers=max_workers,
+            segment_size=segment_size,
+            max_retries=max_retries,
+            resume=resume,
+            session=session,
+            expected_digest=expected_digest,
+            hash_algorithms=hash_algorithms,
+            cache=cache
+        ).path
+    
+    @classmethod
+    @metrics.timed('download')
+    def download(
+        cls,
+        url: str,
+        output_path: Optional[str] = None,
+        referer: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: int = 30,
+        chunk_size: int = 8192,
+        max_workers: int = 1,
+        segment_size: int = 8 * 1024 * 1024,
+        max_retries: int = 3,
+        resume: bool = False,
+        session: Optional[requests.Session] = None,
+        expected_digest: Optional[str] = None,
+        hash_algorithms: Sequence[str] = (),
+        cache: Optional['DownloadCache'] = None
+    ) -> DownloadResult:
+        """
+        Download file from URL and report size, digests and throughput
+        
+        Takes the same arguments as download_file. Single-stream downloads
+        are hashed while the data arrives; segmented downloads arrive out of
+        order and are hashed in one pass over the finished file.
+        
+        Returns:
+            DownloadResult: Path, size, elapsed time and hex digests
+            
+        Raises:
+            ValueError: When the file does not match expected_digest
+            
+        Examples:
+            >>> result = FileDownloader.download(
+            ...     'https://example.com/model.bin',
+            ...     expected_digest='sha256:9f86d081884c7d65...'
+            ... )
+            >>> print(result.size, result.digests['sha256'], result.throughput)
+        """
+        started = time.perf_counter()
+        
         # Get file name from URL if output_path not provided
         if not output_path:
             file_name = os.path.basename(urlparse(url).path)
@@ -132,20 +646,320 @@ class FileDownloader:
                 file_name = 'downloaded_file'
             output_path = file_name
             
-        # Get file stream
-        stream = cls.get_stream(
+        algorithms = [name.lower() for name in hash_algorithms]
+        if expected_digest:
+            expected_algorithm, expected_hex = cls._parse_digest(expected_digest)
+            if expected_algorithm not in algorithms:
+                algorithms.append(expected_algorithm)
+                
+        request_headers = cls._build_headers(referer, headers)
+        part_path = f'{output_path}.part' if resume else output_path
+        checkpoint_path = f'{output_path}.part.json' if resume else None
+        
+        if cache is not None:
+            # Served from the blob store, the body is only fetched when stale
+            digests = cls._copy_from_cache(
+                cache,
+                url,
+                output_path,
+                algorithms,
+                referer=referer,
+                headers=headers,
+                timeout=timeout,
+                session=session
+            )
+            part_path, checkpoint_path, resume = output_path, None, False
+        else:
+            # A changed remote file restarts the download once
+            for attempt in range(2):
+                info = RemoteFileInfo()
+                if max_workers > 1 or resume:
+                    info = cls.probe(
+                        url,
+                        referer=referer,
+                        headers=headers,
+                        timeout=timeout,
+                        session=session
+                    )
+                checkpoint = cls._prepare_checkpoint(
+                    url, info, part_path, checkpoint_path, max_workers, segment_size
+                )
+                
+                download_headers = dict(request_headers)
+                if resume and info.validator and (checkpoint.offset or checkpoint.segments):
+                    download_headers['If-Range'] = info.validator
+                    
+                try:
+                    if checkpoint.segments:
+                        cls._download_segmented(
+                            url,
+                            part_path,
+                            checkpoint,
+                            checkpoint_path,
+                            download_headers,
+                            timeout,
+                            chunk_size,
+                            max_workers,
+                            max_retries,
+                            session
+                        )
+                        digests = {}
+                        if algorithms:
+                            hashers = [hashlib.new(name) for name in algorithms]
+                            with open(part_path, 'rb') as f:
+                                cls._hash_stream(f, hashers)
+                            digests = {hasher.name: hasher.hexdigest() for hasher in hashers}
+                    else:
+                        digests = cls._download_stream(
+                            url,
+                            part_path,
+                            checkpoint,
+                            checkpoint_path,
+                            download_headers,
+                            timeout,
+                            chunk_size,
+                            session,
+                            algorithms
+                        )
+                    break
+                except RemoteChangedError:
+                    if attempt or not checkpoint_path:
+                        raise
+                    cls._remove_files(part_path, checkpoint_path)
+                
+        if expected_digest and digests.get(expected_algorithm) != expected_hex:
+            cls._remove_files(part_path, checkpoint_path)
+            raise ValueError(
+                f"Checksum mismatch for {url}: expected {expected_algorithm}:{expected_hex}, "
+                f"got {digests.get(expected_algorithm)}"
+            )
+            
+        if resume:
+            os.replace(part_path, output_path)
+            cls._remove_files(checkpoint_path)
+            
+        result = DownloadResult(
             url,
-            referer=referer,
-            headers=headers,
-            timeout=timeout
+            output_path,
+            elapsed=time.perf_counter() - started,
+            size=os.path.getsize(output_path),
+            digests=digests
+        )
+        if metrics.is_enabled():
+            metrics.inc('download_bytes_total', result.size)
+            metrics.observe(
+                'download_throughput_bytes_per_second',
+                result.throughput,
+                buckets=metrics.BYTES_PER_SECOND_BUCKETS
+            )
+        return result
+    
+    @classmethod
+    def _copy_from_cache(
+        cls,
+        cache: 'DownloadCache',
+        url: str,
+        output_path: str,
+        algorithms: Sequence[str],
+        **kwargs
+    ) -> Dict[str, str]:
+        """Copy a cached blob to output_path and return its digests"""
+        blob_path = cache.fetch(url, **kwargs)
+        shutil.copyfile(blob_path, output_path)
+        
+        # Blobs are named by their sha256
+        digests = {'sha256': os.path.basename(blob_path)} if 'sha256' in algorithms else {}
+        hashers = [hashlib.new(name) for name in algorithms if name != 'sha256']
+        if hashers:
+            with open(blob_path, 'rb') as f:
+                cls._hash_stream(f, hashers)
+            digests.update({hasher.name: hasher.hexdigest() for hasher in hashers})
+        return digests
+    
+    @classmethod
+    def _prepare_checkpoint(
+        cls,
+        url: str,
+        info: RemoteFileInfo,
+        part_path: str,
+        checkpoint_path: Optional[str],
+        max_workers: int,
+        segment_size: int
+    ) -> DownloadCheckpoint:
+        """Reuse a matching checkpoint or start a fresh download"""
+        if checkpoint_path and os.path.exists(part_path):
+            checkpoint = DownloadCheckpoint.load(checkpoint_path)
+            if checkpoint and checkpoint.matches(url, info):
+                return checkpoint
+        if checkpoint_path:
+            cls._remove_files(part_path, checkpoint_path)
+            
+        checkpoint = DownloadCheckpoint(
+            url=url,
+            size=info.size,
+            etag=info.etag,
+            last_modified=info.last_modified
         )
+        if max_workers > 1 and info.accept_ranges and info.size and info.size > segment_size:
+            checkpoint.segments = cls._split_ranges(info.size, segment_size)
+            # Preallocate the output file
+            with open(part_path, 'wb') as f:
+                f.truncate(info.size)
+        if checkpoint_path:
+            checkpoint.save(checkpoint_path)
+        return checkpoint
+    
+    @staticmethod
+    def _remove_files(*paths: Optional[str]) -> None:
+        """Remove files, ignoring missing ones"""
+        for path in paths:
+            if path and os.path.exists(path):
+                os.remove(path)
+    
+    @staticmethod
+    def create_session(pool_size: int = 10) -> requests.Session:
+        """
+        Create a session whose connection pool holds pool_size connections per host
         
-        # Download file in chunks
-        with open(output_path, 'wb') as f:
+        Args:
+            pool_size: Maximum number of pooled connections per host
+            
+        Returns:
+            requests.Session: Session with pooled HTTP and HTTPS adapters
+            
+        Examples:
+            >>> session = FileDownloader.create_session(16)
+            >>> FileDownloader.download_file('https://example.com/a.pdf', session=session)
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    @classmethod
+    def _download_one(
+        cls,
+        url: str,
+        output_path: str,
+        **kwargs
+    ) -> DownloadResult:
+        """Download a single file, capturing errors in the result"""
+        started = time.perf_counter()
+        try:
+            return cls.download(url, output_path, **kwargs)
+        except Exception as e:
+            return DownloadResult(url, error=e, elapsed=time.perf_counter() - started)
+    
+    @classmethod
+    def download_many(
+        cls,
+        urls: Iterable[Union[str, Tuple[str, str]]],
+        output_dir: Optional[str] = None,
+        max_workers: int = 8,
+        max_per_host: int = 4,
+        referer: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: int = 30,
+        chunk_size: int = 8192,
+        session: Optional[requests.Session] = None,
+        cache: Optional['DownloadCache'] = None
+    ) -> Iterator[DownloadResult]:
+        """
+        Download many files concurrently over a shared connection pool
+        
+        URLs are read lazily and dispatched to a bounded thread pool, with at
+        most max_per_host transfers running against the same host. Results
+        are yielded as soon as each download finishes; failures are reported
+        in DownloadResult.error instead of stopping the batch.
+        
+        Args:
+            urls: URLs, or (url, output_path) tuples
+            output_dir: Directory for files named after the URL (optional)
+            max_workers: Maximum number of concurrent downloads
+            max_per_host: Maximum number of concurrent downloads per host
+            referer: Referer URL (optional)
+            headers: Additional headers (optional)
+            timeout: Request timeout in seconds
+            chunk_size: Size of chunks to download
+            session: Session to reuse, a pooled one is created by default
+            cache: DownloadCache to serve and store the files (optional)
+            
+        Returns:
+            Iterator[DownloadResult]: Results in completion order
+            
+        Examples:
+            >>> urls = ['https://example.com/a.pdf', 'https://example.com/b.pdf']
+            >>> for result in FileDownloader.download_many(urls, output_dir='downloads'):
+            ...     print(result.url, result.path if result.ok else result.error)
+        """
+        own_session = session is None
+        if own_session:
+            session = cls.create_session(max_workers)
+            
+        items = iter(urls)
+        exhausted = False
+        # Tasks waiting for a free slot on their host
+        deferred: Dict[str, deque] = defaultdict(deque)
+        deferred_count = 0
+        max_deferred = max_workers * 4
+        active: Dict[str, int] = defaultdict(int)
+        pending = {}
+        
+        def next_task() -> Optional[Tuple[str, str, str]]:
+            nonlocal exhausted, deferred_count
+            for host, queue in deferred.items():
+                if queue and active[host] < max_per_host:
+                    deferred_count -= 1
+                    return (host,) + queue.popleft()
+            while not exhausted and deferred_count < max_deferred:
+                item = next(items, None)
+                if item is None:
+                    exhausted = True
+                    break
+                url, output_path = item if isinstance(item, tuple) else (item, None)
+                if not output_path:
+                    file_name = os.path.basename(urlparse(url).path) or 'downloaded_file'
+                    output_path = os.path.join(output_dir or '.', file_name)
+                host = urlparse(url).netloc
+                if active[host] < max_per_host:
+                    return host, url, output_path
+                deferred[host].append((url, output_path))
+                deferred_count += 1
+            return None
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
             while True:
-                chunk = stream.read(chunk_size)
-                if not chunk:
+                while len(pending) < max_workers:
+                    task = next_task()
+                    if task is None:
+                        break
+                    host, url, output_path = task
+                    active[host] += 1
+                    future = executor.submit(
+                        cls._download_one,
+                        url,
+                        output_path,
+                        referer=referer,
+                        headers=headers,
+                        timeout=timeout,
+                        chunk_size=chunk_size,
+                        session=session,
+                        cache=cache
+                    )
+                    pending[future] = host
+                    
+                if not pending:
                     break
-                f.write(chunk)
-                
-        return output_path 
\ No newline at end of file
+                    
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    active[pending.pop(future)] -= 1
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            if own_session:
+                session.close()
@@ -0,0 +1,293 @@
+"""性能指标模块"""
+import os
+import time
+import asyncio
+import functools
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# 延迟（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+# 吞吐量（字节/秒），64KiB/s 到 1GiB/s
+BYTES_PER_SECOND_BUCKETS = tuple(float(64 * 1024 * 4 ** i) for i in range(8))
+# 生成速度（token/秒）
+TOKENS_PER_SECOND_BUCKETS = (1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0, 1000.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    """累积直方图，按 Prometheus 的方式记录各桶计数、总和与次数"""
+    
+    __slots__ = ("buckets", "counts", "sum", "count")
+    
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 最后一个为 +Inf
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return {"buckets": cumulative, "sum": self.sum, "count": self.count}
+
+class Span:
+    """
+    计时区间，进入时增加在途计数，退出时记录耗时
+    
+    同时维护三个指标：<name>_in_flight（gauge）、<name>_seconds（直方图）
+    以及出现异常时的 <name>_errors_total（counter）。
+    """
+    
+    __slots__ = ("registry", "name", "labels", "started", "elapsed")
+    
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.started = 0.0
+        self.elapsed = 0.0
+    
+    def __enter__(self) -> "Span":
+        self.registry.add_gauge(f"{self.name}_in_flight", 1, **self.labels)
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.elapsed = time.perf_counter() - self.started
+        registry = self.registry
+        registry.add_gauge(f"{self.name}_in_flight", -1, **self.labels)
+        registry.observe(f"{self.name}_seconds", self.elapsed, **self.labels)
+        if exc_type is not None:
+            registry.inc(f"{self.name}_errors_total", **self.labels)
+
+class _NullSpan:
+    """关闭指标时使用的空区间"""
+    
+    __slots__ = ()
+    elapsed = 0.0
+    
+    def __enter__(self) -> "_NullSpan":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    if not labels:
+        return ()
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+class MetricsRegistry:
+    """
+    进程内的指标注册表，包含 counter、gauge 和直方图
+    
+    关闭时（默认）所有记录方法在检查一次 enabled 后立即返回，span 返回共享的空对象，
+    因此埋点可以常驻在热路径上。开启后每次记录只做一次加锁的字典更新。
+    """
+    
+    def __init__(self, enabled: bool = False):
+        """
+        初始化指标注册表
+        
+        Args:
+            enabled: 是否记录指标
+            
+        Examples:
+            >>> registry = MetricsRegistry(enabled=True)
+            >>> with registry.span("download", mode="stream"):
+            ...     fetch()
+            >>> print(registry.to_prometheus())
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+    
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """counter 增加 value"""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+    
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        """设置 gauge 的值"""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+    
+    def add_gauge(self, name: str, delta: float, **labels) -> None:
+        """gauge 增加 delta，可以为负"""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[key] = series.get(key, 0) + delta
+    
+    def observe(self, name: str, value: float, buckets: Optional[Sequence[float]] = None, **labels) -> None:
+        """
+        向直方图记录一个值
+        
+        Args:
+            name: 指标名称
+            value: 观测值
+            buckets: 桶上界，仅在该指标第一次记录时生效，默认为 LATENCY_BUCKETS
+            **labels: 标签
+        """
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(buckets or LATENCY_BUCKETS)
+            histogram.observe(value)
+    
+    def span(self, name: str, **labels):
+        """
+        计时区间上下文管理器，见 Span
+        
+        Examples:
+            >>> with metrics.span("openai_request", endpoint="chat"):
+            ...     response = session.post(url, json=data)
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, labels)
+    
+    def timed(self, name: str, **labels) -> Callable[[Callable], Callable]:
+        """
+        用 span 包装函数的装饰器，支持协程函数
+        
+        是否记录在每次调用时判断，关闭时只多一次属性检查。
+        """
+        def decorator(fn: Callable) -> Callable:
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await fn(*args, **kwargs)
+                    with Span(self, name, labels):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+            
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with Span(self, name, labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def reset(self) -> None:
+        """清空所有指标"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+    
+    def snapshot(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """
+        导出当前指标
+        
+        Returns:
+            Dict: {"counters"|"gauges"|"histograms": {名称: [{"labels": {...}, "value": ...}]}}，
+            直方图的 value 包含累积的 buckets、sum 和 count
+        """
+        with self._lock:
+            return {
+                "counters": self._export(self._counters, lambda value: value),
+                "gauges": self._export(self._gauges, lambda value: value),
+                "histograms": self._export(self._histograms, Histogram.to_dict),
+            }
+    
+    @staticmethod
+    def _export(metrics: Dict[str, Dict[LabelKey, Any]], convert: Callable[[Any], Any]) -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            name: [{"labels": dict(key), "value": convert(value)} for key, value in sorted(series.items())]
+            for name, series in sorted(metrics.items())
+        }
+    
+    def to_prometheus(self, prefix: str = "py_artisan_") -> str:
+        """
+        导出为 Prometheus 文本格式
+        
+        Args:
+            prefix: 指标名称前缀
+            
+        Returns:
+            str: 可直接作为 /metrics 响应的文本
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for kind, metric_type in (("counters", "counter"), ("gauges", "gauge")):
+            for name, series in snapshot[kind].items():
+                lines.append(f"# TYPE {prefix}{name} {metric_type}")
+                for item in series:
+                    lines.append(f"{prefix}{name}{_format_labels(item['labels'])} {_format_value(item['value'])}")
+        for name, series in snapshot["histograms"].items():
+            lines.append(f"# TYPE {prefix}{name} histogram")
+            for item in series:
+                labels, value = item["labels"], item["value"]
+                for bound, count in value["buckets"]:
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    lines.append(f"{prefix}{name}_bucket{_format_labels(dict(labels, le=le))} {count}")
+                lines.append(f"{prefix}{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                lines.append(f"{prefix}{name}_count{_format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+# 库内所有埋点使用的默认注册表，设置环境变量 PY_ARTISAN_METRICS=1 时默认开启
+registry = MetricsRegistry(enabled=os.getenv("PY_ARTISAN_METRICS", "").lower() in ("1", "true", "yes", "on"))
+
+def enable() -> None:
+    """开启默认注册表"""
+    registry.enabled = True
+
+def disable() -> None:
+    """关闭默认注册表，已记录的指标保留"""
+    registry.enabled = False
+
+def is_enabled() -> bool:
+    return registry.enabled
+
+inc = registry.inc
+set_gauge = registry.set_gauge
+add_gauge = registry.add_gauge
+observe = registry.observe
+span = registry.span
+timed = registry.timed
+reset = registry.reset
+snapshot = registry.snapshot
+to_prometheus = registry.to_prometheus
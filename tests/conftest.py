@@ -0,0 +1,18 @@
+import pytest
+
+# The HTTP stand-ins are shared with the benchmark suite
+from py_artisan.testing.http_stub import OpenAIStubServer, RangeFileServer
+
+
+@pytest.fixture
+def file_server():
+    """Local HTTP file server with optional Range support"""
+    with RangeFileServer() as server:
+        yield server
+
+
+@pytest.fixture
+def openai_server():
+    """Local OpenAI-compatible server that echoes the last message"""
+    with OpenAIStubServer() as server:
+        yield server
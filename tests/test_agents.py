@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+import pytest
+from py_artisan.ai.langchain.llm_facetory import LLMFactory
+from py_artisan.ai.langchain.agents.base import BaseAgent
+
+class _SleepAgent(BaseAgent):
+    """按输入休眠的 agent，记录同时在途的调用数"""
+    
+    def __init__(self):
+        super().__init__("local")
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+    
+    def run(self, delay, fail=False):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(delay)
+            if fail and delay == 0:
+                raise RuntimeError("boom")
+            return delay * 2
+        finally:
+            with self.lock:
+                self.active -= 1
+
+class _AsyncAgent(_SleepAgent):
+    async def arun(self, delay, fail=False):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(delay)
+            return delay * 2
+        finally:
+            with self.lock:
+                self.active -= 1
+
+@pytest.fixture(autouse=True)
+def fake_llm(monkeypatch):
+    monkeypatch.setattr(LLMFactory, "get_or_create", classmethod(lambda cls, provider=None: object()))
+
+def test_run_many():
+    agent = _SleepAgent()
+    delays = [0.2, 0.0, 0.05, 0.0, 0.1, 0.0]
+    results = list(agent.run_many(iter(delays), max_concurrency=3, fail=True))
+    # 按完成顺序返回，慢的输入排在后面
+    assert results[-1].index == 0
+    assert sorted(r.index for r in results) == list(range(6))
+    assert agent.peak == 3
+    for result in results:
+        if result.input == 0:
+            assert isinstance(result.error, RuntimeError) and not result.ok
+        else:
+            assert result.output == result.input * 2
+    
+    with pytest.raises(RuntimeError):
+        list(agent.run_many(delays, fail=True, return_exceptions=False))
+
+def test_run_many_timeout_and_cancel():
+    agent = _SleepAgent()
+    start = time.monotonic()
+    results = {r.index: r for r in agent.run_many([0.5, 0.01, 0.01], timeout=0.1)}
+    assert time.monotonic() - start < 0.4
+    assert isinstance(results[0].error, TimeoutError)
+    assert results[1].output == 0.02
+    
+    calls = []
+    agent.run = lambda delay: calls.append(delay) or time.sleep(delay)
+    stream = agent.run_many([0.01] * 100, max_concurrency=2)
+    next(stream)
+    stream.close()
+    time.sleep(0.05)
+    # 停止迭代后未开始的输入被取消
+    assert len(calls) <= 4
+
+def test_run_many_timeout_does_not_cascade():
+    agent = _SleepAgent()
+    # 唯一的线程被超时的输入占用，后面的输入排队期间不计时
+    results = {r.index: r for r in agent.run_many([0.3, 0.01, 0.01], max_concurrency=1, timeout=0.1)}
+    assert isinstance(results[0].error, TimeoutError)
+    assert results[1].output == 0.02 and results[2].output == 0.02
+    assert results[1].elapsed < 0.1
+
+def test_arun_many():
+    async def main(agent, **kwargs):
+        return [r async for r in agent.arun_many([0.2, 0.05, 0.1, 0.05] * 3, **kwargs)]
+    
+    # 默认 arun 在线程池中执行同步的 run
+    agent = _SleepAgent()
+    results = asyncio.run(main(agent, max_concurrency=4))
+    assert agent.peak == 4
+    assert [r.output for r in sorted(results, key=lambda r: r.index)] == [0.4, 0.1, 0.2, 0.1] * 3
+    
+    agent = _AsyncAgent()
+    start = time.monotonic()
+    results = asyncio.run(main(agent, max_concurrency=12, timeout=0.15))
+    assert time.monotonic() - start < 0.2
+    assert sum(isinstance(r.error, TimeoutError) for r in results) == 3
+    assert agent.active == 0
+
+def test_arun_many_cancel():
+    agent = _AsyncAgent()
+    
+    async def main():
+        stream = agent.arun_many([0.01] + [10] * 5, max_concurrency=3)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+    
+    assert asyncio.run(main()).output == 0.02
+    assert agent.active == 0
@@ -1,6 +1,13 @@
+import asyncio
+import itertools
+import mmap
+import re
+import threading
+import time
 import pytest
-from py_artisan.ai import text_utils
-from py_artisan.ai.openai_utils import OpenAIClient
+from py_artisan.ai import text_utils, openai_utils
+from py_artisan.ai.openai_utils import OpenAIClient, RateLimiter
+from py_artisan.ai.response_cache import ResponseCache, SqliteCacheStore
 
 def test_split_text():
     text = "这是第一段。\n这是第二段。\n这是第三段。"
@@ -31,4 +38,304 @@ def test_openai_client():
     # 测试初始化
     client = OpenAIClient("test_key")
     assert client.api_key == "test_key"
-    assert "Authorization" in client.headers 
\ No newline at end of file
+    assert "Authorization" in client.headers 
+
+def _user(content):
+    return {"messages": [{"role": "user", "content": content}]}
+
+def test_chat_completion_many(openai_server):
+    openai_server.latency = 0.05
+    client = OpenAIClient("test_key", base_url=f"{openai_server.base_url}/v1")
+    requests_list = [_user(f"问题{i}") for i in range(10)]
+    requests_list[3] = _user("fail")
+    
+    results = client.chat_completion_many(requests_list, max_concurrency=4)
+    assert len(results) == 10
+    assert isinstance(results[3], Exception)
+    for i, result in enumerate(results):
+        if i != 3:
+            assert result["choices"][0]["message"]["content"] == f"echo: 问题{i}"
+    assert 1 < openai_server.max_active <= 4
+
+def test_chat_completion_many_grows_pool(openai_server, caplog):
+    openai_server.latency = 0.05
+    client = OpenAIClient("test_key", base_url=f"{openai_server.base_url}/v1", pool_size=2)
+    client.chat_completion(**_user("预热"))
+    old_adapter = client.session.get_adapter("http://")
+    
+    client.chat_completion_many([_user(f"问题{i}") for i in range(16)], max_concurrency=8)
+    assert client.pool_size == 8
+    # 被替换的适配器已关闭，其空闲连接随之释放
+    assert client.session.get_adapter("http://") is not old_adapter
+    assert len(old_adapter.poolmanager.pools) == 0
+    assert openai_server.max_active > 2
+    assert "Connection pool is full" not in caplog.text
+
+def test_achat_completion_many(openai_server):
+    openai_server.latency = 0.05
+    client = OpenAIClient("test_key", base_url=f"{openai_server.base_url}/v1")
+    requests_list = [_user(f"问题{i}") for i in range(10)] + [_user("fail")]
+    
+    results = asyncio.run(client.achat_completion_many(requests_list, max_concurrency=5))
+    assert [r["choices"][0]["message"]["content"] for r in results[:10]] == [
+        f"echo: 问题{i}" for i in range(10)
+    ]
+    assert isinstance(results[10], Exception)
+    assert openai_server.max_active <= 5
+
+def test_rate_limiter():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000)
+    # 初始额度为一分钟的配额
+    assert all(limiter.reserve(10) == 0 for _ in range(60))
+    assert limiter.reserve(10) == pytest.approx(1.0, abs=0.05)
+    
+    limiter = RateLimiter(tokens_per_minute=6000)
+    assert limiter.reserve(6000) == 0
+    assert limiter.reserve(600) == pytest.approx(6.0, abs=0.05)
+    limiter.refund(600)
+    assert limiter.reserve(0) == pytest.approx(0, abs=0.05)
+
+def test_iter_sse_events():
+    lines = [": ping", "event: message", "data: a", "data: b", "", ": ping", "", "data: [DONE]", "", "data: c", ""]
+    assert list(openai_utils.iter_sse_events(lines)) == ["a\nb"]
+
+def test_chat_completion_stream(openai_server):
+    openai_server.latency = 0.05
+    openai_server.token_delay = 0.01
+    client = OpenAIClient("test_key", base_url=f"{openai_server.base_url}/v1")
+    messages = [{"role": "user", "content": "一 二 三"}]
+    
+    stream = client.chat_completion(messages, stream=True)
+    assert "".join(stream) == "echo: 一 二 三"
+    assert stream.metrics.tokens == 4
+    assert stream.metrics.time_to_first_token >= 0.05
+    assert stream.metrics.tokens_per_second > 0
+    assert client.last_stream_metrics is stream.metrics
+    
+    async def consume():
+        return [token async for token in client.achat_completion_stream(messages)]
+    
+    assert "".join(asyncio.run(consume())) == "echo: 一 二 三"
+    assert client.last_stream_metrics.tokens == 4
+
+def test_response_cache(openai_server, tmp_path):
+    openai_server.latency = 0.1
+    store = SqliteCacheStore(str(tmp_path / "responses.db"))
+    client = OpenAIClient(
+        "test_key",
+        base_url=f"{openai_server.base_url}/v1",
+        cache=ResponseCache(store=store)
+    )
+    messages = [{"role": "user", "content": "你好"}]
+    
+    # temperature=0 的请求默认缓存
+    first = client.chat_completion(messages, temperature=0)
+    assert client.chat_completion(messages, temperature=0) == first
+    assert len(openai_server.requests) == 1
+    
+    # 其他请求需要显式开启
+    client.chat_completion(messages)
+    client.chat_completion(messages)
+    assert len(openai_server.requests) == 3
+    client.chat_completion(messages, cache=True)
+    client.chat_completion(messages, cache=True)
+    assert len(openai_server.requests) == 4
+    
+    # 并发的相同请求只调用一次上游
+    new_messages = [{"role": "user", "content": "并发"}]
+    results = client.chat_completion_many(
+        [{"messages": new_messages, "temperature": 0}] * 8,
+        max_concurrency=8
+    )
+    assert all(r == results[0] for r in results)
+    assert len(openai_server.requests) == 5
+    
+    stats = client.cache.stats()
+    assert stats["hits"] + stats["misses"] == 12
+    
+    # 持久化层在新的缓存实例中依然命中
+    client.cache = ResponseCache(store=store)
+    assert client.chat_completion(messages, temperature=0) == first
+    assert len(openai_server.requests) == 5
+
+def test_response_cache_store_read_outside_lock(tmp_path):
+    class SlowStore(SqliteCacheStore):
+        def get(self, key, default=None):
+            if key == "slow":
+                entered.set()
+                release.wait(5)
+            return super().get(key, default)
+    
+    entered, release = threading.Event(), threading.Event()
+    store = SlowStore(str(tmp_path / "responses.db"))
+    store.set("null", None)
+    cache = ResponseCache(store=store)
+    cache.set("fast", 1)
+    
+    reader = threading.Thread(target=cache.get, args=("slow",))
+    reader.start()
+    assert entered.wait(5)
+    try:
+        # 内存命中不等待其他线程的磁盘读取
+        done = threading.Event()
+        threading.Thread(target=lambda: cache.get("fast") == 1 and done.set()).start()
+        assert done.wait(1)
+    finally:
+        release.set()
+        reader.join()
+    
+    # 持久化层中的 null 是命中，不会重新计算
+    assert ResponseCache(store=store).get_or_compute("null", lambda: "computed") is None
+
+def test_response_cache_async(openai_server):
+    openai_server.latency = 0.1
+    client = OpenAIClient(
+        "test_key",
+        base_url=f"{openai_server.base_url}/v1",
+        cache=ResponseCache(ttl=0.2)
+    )
+    messages = [{"role": "user", "content": "你好"}]
+    
+    results = asyncio.run(client.achat_completion_many(
+        [{"messages": messages, "temperature": 0}] * 5
+    ))
+    assert all(r == results[0] for r in results)
+    assert len(openai_server.requests) == 1
+    
+    # 过期后重新请求
+    time.sleep(0.3)
+    client.chat_completion(messages, temperature=0)
+    assert len(openai_server.requests) == 2
+
+def _join_segments(segments, overlap):
+    return segments[0] + "".join(seg[overlap:] for seg in segments[1:])
+
+def test_iter_split_text(tmp_path):
+    text = ("第一句。第二句！Third sentence. " * 8 + "\n") * 50 + "x" * 5000
+    segments = list(text_utils.iter_split_text(text, max_length=300, overlap=50))
+    assert all(len(seg) <= 300 for seg in segments)
+    assert _join_segments(segments, 50) == text
+    # 优先在段落/行边界切分
+    assert segments[0].endswith("\n")
+    
+    # 从二进制文件读取，多字节字符跨越读取边界
+    path = tmp_path / "corpus.txt"
+    path.write_text(text, encoding="utf-8")
+    with open(path, "rb") as f:
+        from_file = list(text_utils.iter_split_text(f, max_length=300, overlap=50, read_size=1001))
+    assert from_file == segments
+    
+    with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0) as mm:
+        assert list(text_utils.iter_split_text(mm, max_length=300, overlap=50)) == segments
+
+def test_iter_split_text_progress():
+    # 分隔符紧贴窗口起点时旧实现会原地打转
+    text = "\n" + "a" * 9 + "\n" + "b" * 9
+    segments = list(text_utils.iter_split_text(text, max_length=10, overlap=5, separators=("\n",)))
+    assert _join_segments(segments, 5) == text
+    assert len(segments) < len(text)
+    
+    with pytest.raises(ValueError):
+        list(text_utils.iter_split_text("abc", max_length=10, overlap=10))
+
+class _CountingTokenizer(text_utils.SimpleTokenizer):
+    def __init__(self):
+        self.encoded = 0
+    
+    def encode_batch(self, texts):
+        self.encoded += len(texts)
+        return super().encode_batch(texts)
+
+def test_split_text_by_tokens():
+    tokenizer = _CountingTokenizer()
+    counter = text_utils.TokenCounter(tokenizer)
+    paragraph = "第一句话。第二句话！This is the third sentence. " * 6 + "\n\n"
+    text = paragraph * 10 + "x" * 500
+    
+    chunks = text_utils.split_text_by_tokens(text, max_tokens=64, overlap_tokens=16, counter=counter)
+    assert len(chunks) > 1
+    assert all(chunk.token_count <= 64 for chunk in chunks)
+    assert all(counter.count(chunk.text) == chunk.token_count for chunk in chunks)
+    assert chunks[-1].text.endswith("x")
+    
+    # 重复的段落和句子命中缓存，编码次数远少于单元数
+    encoded = tokenizer.encoded
+    results = text_utils.split_texts_by_tokens([text, text], max_tokens=64, overlap_tokens=16, counter=counter)
+    assert results == [chunks, chunks]
+    assert tokenizer.encoded == encoded
+    
+    with pytest.raises(ValueError):
+        text_utils.split_text_by_tokens(text, max_tokens=10, overlap_tokens=10)
+
+class _StrictSpecialTokenizer(text_utils.SimpleTokenizer):
+    """与 tiktoken 一样，encode 遇到特殊 token 时抛出 ValueError"""
+    
+    def encode(self, text):
+        if "<|endoftext|>" in text:
+            raise ValueError("Encountered text corresponding to disallowed special token")
+        return super().encode(text)
+    
+    def encode_batch(self, texts):
+        return [self.encode(text) for text in texts]
+    
+    def encode_ordinary(self, text):
+        return super().encode(text)
+    
+    def encode_ordinary_batch(self, texts):
+        return super().encode_batch(texts)
+
+def test_split_text_by_tokens_special_tokens():
+    counter = text_utils.TokenCounter(_StrictSpecialTokenizer())
+    text = "scraped page <|endoftext|> more text. " * 50
+    chunks = text_utils.split_text_by_tokens(text, max_tokens=32, overlap_tokens=8, counter=counter)
+    assert all(chunk.token_count <= 32 for chunk in chunks)
+    assert counter.count("<|endoftext|>") > 0
+
+def _clean_text_reference(text, remove_urls=True, remove_numbers=False, remove_punctuation=False):
+    if remove_urls:
+        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+    if remove_numbers:
+        text = re.sub(r'\d+', '', text)
+    if remove_punctuation:
+        text = re.sub(r'[^\w\s]', '', text)
+    return text.strip()
+
+def test_text_cleaner_matches_sequential_passes():
+    samples = [
+        "访问 https://example.com/a?b=1&c=2 了解更多。123 ！",
+        "1http://x.y/z99, price: $42.50!",
+        "  纯文本，没有链接  ",
+        "",
+    ]
+    for options in itertools.product([True, False], repeat=3):
+        cleaner = text_utils.TextCleaner(*options)
+        for sample in samples:
+            assert cleaner(sample) == _clean_text_reference(sample, *options)
+            assert text_utils.clean_text(sample, *options) == _clean_text_reference(sample, *options)
+
+def test_clean_texts():
+    texts = [f"第{i}行 https://example.com/{i} 数字{i}。" for i in range(50)]
+    expected = [text_utils.clean_text(text, remove_numbers=True) for text in texts]
+    assert list(text_utils.clean_texts(iter(texts), remove_numbers=True)) == expected
+    assert list(text_utils.clean_texts(iter(texts), remove_numbers=True, workers=2, chunk_size=7)) == expected
+
+def test_minhash_index(tmp_path):
+    index = text_utils.MinHashIndex(threshold=0.8)
+    texts = [f"文档{i}：" + "".join(chr(0x4e00 + (i * 37 + j * 11) % 2000) for j in range(200)) for i in range(200)]
+    for i, text in enumerate(texts):
+        index.add(text, key=f"doc-{i}")
+    assert len(index) == 200
+    
+    near = texts[42][:-3] + "改动了"
+    matches = index.query(near)
+    assert matches[0][0] == "doc-42" and matches[0][1] >= 0.8
+    assert index.is_near_duplicate(near)
+    assert not index.is_near_duplicate("一段从未出现过的全新文本，和索引中的任何内容都不相似。" * 3)
+    assert not index.add_if_new(near)
+    assert index.add_if_new("另一段全新的文本内容" * 10, key="new")
+    
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = text_utils.MinHashIndex.load(path)
+    assert len(loaded) == len(index)
+    assert loaded.query(near) == matches
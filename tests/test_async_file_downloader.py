@@ -0,0 +1,91 @@
+import asyncio
+import time
+import pytest
+from py_artisan.utils.async_file_downloader import AsyncFileDownloader
+from py_artisan.utils.file_downloader import FileDownloader
+
+PAYLOAD = bytes(range(256)) * 1024
+
+def test_download_file(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    output = tmp_path / 'data.bin'
+    
+    async def main():
+        async with AsyncFileDownloader(chunk_size=4096) as downloader:
+            return await downloader.download_file(
+                file_server.url('/data.bin'),
+                str(output),
+                referer='https://example.com/'
+            )
+    
+    assert asyncio.run(main()) == str(output)
+    assert output.read_bytes() == PAYLOAD
+    headers = file_server.requests[-1][2]
+    assert headers['Referer'] == 'https://example.com/'
+    assert headers['User-Agent'] in FileDownloader.USER_AGENTS
+
+def test_download_file_reopen_after_close(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    downloader = AsyncFileDownloader()
+    
+    async def main(name):
+        async with downloader:
+            return await downloader.download_file(file_server.url('/data.bin'), str(tmp_path / name))
+    
+    asyncio.run(main('a.bin'))
+    asyncio.run(main('b.bin'))
+    assert (tmp_path / 'b.bin').read_bytes() == PAYLOAD
+
+def test_close_does_not_block_event_loop():
+    downloader = AsyncFileDownloader()
+    
+    async def main():
+        # A slow pending write must not stall other tasks while close() waits for it
+        downloader._get_executor().submit(time.sleep, 0.3)
+        ticks = []
+        
+        async def tick():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+        
+        ticker = asyncio.create_task(tick())
+        await asyncio.sleep(0)
+        await downloader.close()
+        ticker.cancel()
+        return ticks
+    
+    ticks = asyncio.run(main())
+    assert len(ticks) > 5
+    assert downloader._io_executor is None
+
+def test_download_file_failure_leaves_no_partial_file(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    file_server.fail_ranges = 1
+    output = tmp_path / 'data.bin'
+    
+    async def main():
+        async with AsyncFileDownloader(chunk_size=4096) as downloader:
+            # The server drops ranged responses halfway through
+            await downloader.download_file(file_server.url('/data.bin'), str(output), headers={'Range': 'bytes=0-'})
+    
+    with pytest.raises(Exception):
+        asyncio.run(main())
+    assert list(tmp_path.iterdir()) == []
+
+def test_download_many(file_server, tmp_path):
+    for i in range(50):
+        file_server.files[f'/file{i}.bin'] = PAYLOAD[:100 + i]
+    urls = [file_server.url(f'/file{i}.bin') for i in range(50)]
+    urls.append(file_server.url('/missing.bin'))
+    
+    async def main():
+        async with AsyncFileDownloader(max_concurrency=5) as downloader:
+            return [r async for r in downloader.download_many(urls, output_dir=str(tmp_path))]
+    
+    results = asyncio.run(main())
+    assert len(results) == 51
+    assert [r.url for r in results if not r.ok] == [file_server.url('/missing.bin')]
+    for i in range(50):
+        assert (tmp_path / f'file{i}.bin').read_bytes() == PAYLOAD[:100 + i]
+    assert file_server.max_active <= 5
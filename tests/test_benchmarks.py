@@ -0,0 +1,27 @@
+import json
+import pytest
+from benchmarks import run
+from benchmarks.corpus import make_text
+
+def test_corpus():
+    for script in ("latin", "cjk", "mixed"):
+        text = make_text(5000, script, seed=1)
+        assert len(text) == 5000 and text == make_text(5000, script, seed=1)
+        assert "\n\n" in text
+    assert any("一" <= char <= "龥" for char in make_text(1000, "cjk"))
+
+def test_run_with_baseline(tmp_path, capsys):
+    output = tmp_path / "results.json"
+    args = ["--quick", "--repeat", "1", "-k", "split_text/latin"]
+    assert run.main(args + ["--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert list(report["results"]) == ["split_text/latin"]
+    assert report["results"]["split_text/latin"]["unit"] == "MChars/s"
+    
+    # 基线快得多时记为退化
+    report["results"]["split_text/latin"]["median"] /= 100
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(report))
+    assert run.main(args + ["--baseline", str(baseline)]) == 0
+    assert run.main(args + ["--baseline", str(baseline), "--fail-on-regression"]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
@@ -0,0 +1,40 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from py_artisan.utils.concurrent_utils import bounded_map, chunked
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 3)) == []
+
+def test_bounded_map():
+    consumed = []
+    
+    def items():
+        for i in range(20):
+            consumed.append(i)
+            yield i
+    
+    def work(i):
+        time.sleep(0.001 * (i % 3))
+        return i * i
+    
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = bounded_map(executor, work, items(), max_in_flight=4)
+        assert next(results) == 0
+        # 输入按需读取，不会一次性提交全部任务
+        assert len(consumed) <= 5
+        assert list(results) == [i * i for i in range(1, 20)]
+        
+        unordered = bounded_map(executor, work, range(20), max_in_flight=4, ordered=False)
+        assert sorted(unordered) == [i * i for i in range(20)]
+
+def test_bounded_map_error():
+    def work(i):
+        if i == 3:
+            raise ValueError("bad item")
+        return i
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with pytest.raises(ValueError):
+            list(bounded_map(executor, work, range(10), max_in_flight=2))
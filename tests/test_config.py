@@ -0,0 +1,46 @@
+import os
+import pytest
+from py_artisan.utils.config import Config, Settings
+
+def test_settings_typed_getters():
+    settings = Settings({"TIMEOUT": "30", "TEMPERATURE": "0.5", "STREAM": "yes", "BAD": "abc"})
+    assert settings.get_int("TIMEOUT") == 30
+    assert settings.get_float("TEMPERATURE") == 0.5
+    assert settings.get_bool("STREAM") is True
+    assert settings.get_int("MISSING", 10) == 10
+    assert settings.get_str("TIMEOUT") == "30"
+    with pytest.raises(ValueError):
+        settings.get_int("BAD")
+    with pytest.raises(ValueError, match="Model name"):
+        settings.get_str("MISSING", description="Model name")
+    with pytest.raises(TypeError):
+        settings.values["TIMEOUT"] = "10"
+
+def test_reload_and_subscribe(tmp_path, monkeypatch):
+    env_path = tmp_path / ".env"
+    env_path.write_text("PY_ARTISAN_TEST_MODEL=a\nPY_ARTISAN_TEST_TIMEOUT=10\n")
+    notifications = []
+    unsubscribe = Config.subscribe(lambda changed, settings: notifications.append(changed))
+    try:
+        assert Config.reload(str(env_path))
+        settings = Config.settings()
+        assert settings.get_int("PY_ARTISAN_TEST_TIMEOUT") == 10
+        assert {"PY_ARTISAN_TEST_MODEL", "PY_ARTISAN_TEST_TIMEOUT"} <= notifications[-1]
+        
+        # 文件未变化时不重新加载
+        assert not Config.reload(str(env_path))
+        os.utime(env_path)
+        assert not Config.reload(str(env_path))
+        assert Config.settings() is settings
+        
+        env_path.write_text("PY_ARTISAN_TEST_MODEL=b\nPY_ARTISAN_TEST_TIMEOUT=10\n")
+        assert Config.reload(str(env_path))
+        assert notifications[-1] == {"PY_ARTISAN_TEST_MODEL"}
+        assert Config.settings().get("PY_ARTISAN_TEST_MODEL") == "b"
+        # 旧快照保持不变
+        assert settings.get("PY_ARTISAN_TEST_MODEL") == "a"
+    finally:
+        unsubscribe()
+        for key in ("PY_ARTISAN_TEST_MODEL", "PY_ARTISAN_TEST_TIMEOUT"):
+            monkeypatch.delenv(key, raising=False)
+        Config.refresh()
@@ -0,0 +1,139 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from py_artisan.utils.download_cache import DownloadCache
+from py_artisan.utils.file_downloader import FileDownloader
+
+PAYLOAD = bytes(range(256)) * 64
+
+def _fetch(cache_dir, url):
+    return DownloadCache(cache_dir).fetch(url)
+
+def test_fetch_and_revalidate(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    url = file_server.url('/data.bin')
+    cache = DownloadCache(str(tmp_path / 'cache'))
+    assert cache.get(url) is None
+    
+    path = cache.fetch(url)
+    with open(path, 'rb') as f:
+        assert f.read() == PAYLOAD
+    
+    # Second fetch is answered with 304
+    assert cache.fetch(url) == path
+    assert 'If-None-Match' in file_server.requests[-1][2]
+    
+    # No network access without revalidation
+    count = len(file_server.requests)
+    assert cache.fetch(url, revalidate=False) == path
+    assert cache.get(url) == path
+    assert len(file_server.requests) == count
+    
+    # Changed content is downloaded again
+    file_server.files['/data.bin'] = PAYLOAD[::-1]
+    with cache.open(url) as f:
+        assert f.read() == PAYLOAD[::-1]
+
+def test_lru_eviction(file_server, tmp_path):
+    for i in range(4):
+        file_server.files[f'/file{i}.bin'] = bytes([i]) * 1000
+    cache = DownloadCache(str(tmp_path / 'cache'), max_size=3500)
+    
+    for i in range(3):
+        cache.fetch(file_server.url(f'/file{i}.bin'))
+    # Touch file0 so file1 becomes the least recently used entry
+    cache.get(file_server.url('/file0.bin'))
+    cache.fetch(file_server.url('/file3.bin'))
+    
+    assert cache.size() <= 3500
+    assert cache.get(file_server.url('/file1.bin')) is None
+    assert cache.get(file_server.url('/file0.bin')) is not None
+    assert cache.get(file_server.url('/file3.bin')) is not None
+
+def test_evicted_blob_is_a_miss(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    url = file_server.url('/data.bin')
+    cache = DownloadCache(str(tmp_path / 'cache'))
+    path = cache.fetch(url)
+    
+    # Another process evicted the blob after the entry was written
+    os.remove(path)
+    assert cache.get(url) is None
+    assert cache.fetch(url, revalidate=False) == path
+    assert os.path.exists(path)
+
+def test_size_index(file_server, tmp_path, monkeypatch):
+    for i in range(4):
+        file_server.files[f'/file{i}.bin'] = bytes([i]) * 1000
+    cache = DownloadCache(str(tmp_path / 'cache'), max_size=10000)
+    scans = []
+    listdir = os.listdir
+    monkeypatch.setattr(os, 'listdir', lambda path: scans.append(path) or listdir(path))
+    
+    for i in range(4):
+        cache.fetch(file_server.url(f'/file{i}.bin'))
+    # Inserts under the size limit do not scan the entries
+    assert scans == []
+    assert DownloadCache(str(tmp_path / 'cache')).evict(max_size=2500) == 2
+    assert cache.size() == 2000
+    with open(tmp_path / 'cache' / 'size') as f:
+        assert int(f.read()) == 2000
+
+def test_changed_content_releases_old_blob(file_server, tmp_path):
+    file_server.files['/b.bin'] = b'b' * 1000
+    url = file_server.url('/a.bin')
+    cache = DownloadCache(str(tmp_path / 'cache'), max_size=2500)
+    cache.fetch(file_server.url('/b.bin'))
+    for i in range(4):
+        file_server.files['/a.bin'] = bytes([i]) * 1000
+        cache.fetch(url)
+    
+    # Replaced blobs are removed, so the live entry for /b.bin is kept
+    assert cache.size() == 2000
+    assert cache.get(file_server.url('/b.bin')) is not None
+    with open(cache.get(url), 'rb') as f:
+        assert f.read() == bytes([3]) * 1000
+    
+    # Orphaned blobs are swept by eviction
+    orphan = tmp_path / 'cache' / 'blobs' / 'ff' / ('ff' * 32)
+    orphan.parent.mkdir(exist_ok=True)
+    orphan.write_bytes(b'x' * 1000)
+    cache.evict(max_size=2000)
+    assert not orphan.exists()
+    assert cache.get(url) is not None and cache.get(file_server.url('/b.bin')) is not None
+
+def test_not_modified_without_entry(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    url = file_server.url('/data.bin')
+    etag = file_server.etag('/data.bin')
+    cache = DownloadCache(str(tmp_path / 'cache'))
+    
+    # A 304 caused by the caller's own validators is never cached as the content
+    path = cache.fetch(url, headers={'If-None-Match': etag})
+    with open(path, 'rb') as f:
+        assert f.read() == PAYLOAD
+
+def test_concurrent_processes(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    cache_dir = str(tmp_path / 'cache')
+    url = file_server.url('/data.bin')
+    
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        paths = set(executor.map(_fetch, [cache_dir] * 8, [url] * 8))
+    assert len(paths) == 1
+    assert DownloadCache(cache_dir).size() == len(PAYLOAD)
+
+def test_download_file_with_cache(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    cache = DownloadCache(str(tmp_path / 'cache'))
+    
+    for name in ('a.bin', 'b.bin'):
+        result = FileDownloader.download(
+            file_server.url('/data.bin'),
+            str(tmp_path / name),
+            cache=cache,
+            hash_algorithms=['sha256', 'md5']
+        )
+        assert (tmp_path / name).read_bytes() == PAYLOAD
+    assert result.digests['sha256'] == os.path.basename(cache.get(file_server.url('/data.bin')))
+    gets = [r for r in file_server.requests if r[0] == 'GET']
+    assert 'If-None-Match' in gets[-1][2]
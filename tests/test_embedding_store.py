@@ -0,0 +1,69 @@
+import hashlib
+import numpy as np
+from py_artisan.ai.embedding_store import EmbeddingStore, content_key
+from py_artisan.ai.openai_utils import OpenAIClient
+
+def test_embedding_store(tmp_path):
+    path = str(tmp_path / "store")
+    rng = np.random.default_rng(0)
+    vectors = rng.random((3000, 16), dtype=np.float32)
+    keys = [content_key(f"text {i}") for i in range(3000)]
+    
+    with EmbeddingStore(path) as store:
+        store.add(keys[:1000], vectors[:1000])
+        store.flush()
+        store.add(keys[1000:], vectors[1000:])
+        # 未 flush 的新键同样可以查到
+        assert np.array_equal(store.get(keys[2500]), vectors[2500])
+        store.add(keys[:10], vectors[:10] + 1)  # 已存在的键被跳过
+        assert len(store) == 3000
+    
+    store = EmbeddingStore(path)
+    assert len(store) == 3000 and store.dim == 16
+    assert isinstance(store.vectors, np.memmap)
+    rows, found = store.get_many([keys[5], content_key("missing"), keys[2999]])
+    assert rows[1] is None
+    assert np.array_equal(found[0], vectors[5]) and np.array_equal(found[2], vectors[2999])
+    assert not found[1].any()
+
+def test_flush_merges_pending_keys(tmp_path, monkeypatch):
+    path = str(tmp_path / "store")
+    rng = np.random.default_rng(1)
+    vectors = rng.random((2000, 4), dtype=np.float32)
+    keys = [content_key(f"text {i}") for i in range(2000)]
+    sorted_sizes = []
+    argsort = np.argsort
+    monkeypatch.setattr(np, "argsort", lambda a, *args, **kwargs: sorted_sizes.append(len(a)) or argsort(a, *args, **kwargs))
+    
+    with EmbeddingStore(path) as store:
+        for start in range(0, 2000, 500):
+            store.add(keys[start:start + 500], vectors[start:start + 500])
+            store.flush()
+    # 每次 flush 只排序新写入的键
+    assert sorted_sizes == [500] * 4
+    
+    store = EmbeddingStore(path)
+    index_keys = np.load(tmp_path / "store" / "index_keys.npy")
+    index_rows = np.load(tmp_path / "store" / "index_rows.npy")
+    assert np.array_equal(index_keys, np.sort(np.array(keys, dtype=np.uint64)))
+    assert np.array_equal(np.asarray(store._keys)[index_rows], index_keys)
+    assert all(np.array_equal(store.get(keys[i]), vectors[i]) for i in range(0, 2000, 37))
+
+def test_embeddings(openai_server, tmp_path):
+    client = OpenAIClient("test_key", base_url=f"{openai_server.base_url}/v1")
+    texts = [f"段落 {i}" for i in range(50)] + ["段落 3"]
+    
+    vectors = client.embeddings(texts, batch_size=16)
+    assert vectors.shape == (51, 8) and vectors.dtype == np.float32
+    expected = [b / 255 for b in hashlib.sha256("段落 7".encode("utf-8")).digest()[:8]]
+    assert np.allclose(vectors[7], expected)
+    assert np.array_equal(vectors[3], vectors[50])
+    # 50条不同文本按每批16条装包
+    assert len(openai_server.requests) == 4
+    
+    store = EmbeddingStore(str(tmp_path / "store"))
+    client.embeddings(texts, store=store, max_batch_tokens=100)
+    requests_before = len(openai_server.requests)
+    again = client.embeddings(texts, store=store)
+    assert len(openai_server.requests) == requests_before
+    assert np.array_equal(again, vectors)
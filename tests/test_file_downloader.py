@@ -0,0 +1,206 @@
+import hashlib
+import pytest
+from py_artisan.utils.file_downloader import FileDownloader, DownloadCheckpoint
+
+PAYLOAD = bytes(range(256)) * 4096  # 1 MiB
+
+def _range_requests(server):
+    return [r for r in server.requests if r[0] == 'GET' and 'Range' in r[2]]
+
+def test_download_file_single_stream(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    output = tmp_path / 'data.bin'
+    
+    path = FileDownloader.download_file(file_server.url('/data.bin'), str(output))
+    assert path == str(output)
+    assert output.read_bytes() == PAYLOAD
+    assert not _range_requests(file_server)
+
+def test_download_file_segmented(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    output = tmp_path / 'data.bin'
+    
+    FileDownloader.download_file(
+        file_server.url('/data.bin'),
+        str(output),
+        max_workers=4,
+        segment_size=100 * 1024
+    )
+    assert output.read_bytes() == PAYLOAD
+    # 1 MiB split into 100 KiB segments
+    assert len(_range_requests(file_server)) == 11
+
+def test_download_file_segmented_retry(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    file_server.fail_ranges = 2
+    output = tmp_path / 'data.bin'
+    
+    FileDownloader.download_file(
+        file_server.url('/data.bin'),
+        str(output),
+        max_workers=4,
+        segment_size=256 * 1024
+    )
+    assert output.read_bytes() == PAYLOAD
+    assert len(_range_requests(file_server)) == 4 + 2
+
+def test_download_file_without_range_support(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    file_server.accept_ranges = False
+    output = tmp_path / 'data.bin'
+    
+    FileDownloader.download_file(
+        file_server.url('/data.bin'),
+        str(output),
+        max_workers=4,
+        segment_size=100 * 1024
+    )
+    assert output.read_bytes() == PAYLOAD
+    assert not _range_requests(file_server)
+
+def test_download_file_resume_stream(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    url = file_server.url('/data.bin')
+    output = tmp_path / 'data.bin'
+    info = FileDownloader.probe(url)
+    half = len(PAYLOAD) // 2
+    (tmp_path / 'data.bin.part').write_bytes(PAYLOAD[:half])
+    DownloadCheckpoint(url=url, size=info.size, etag=info.etag, offset=half).save(
+        str(tmp_path / 'data.bin.part.json')
+    )
+    
+    FileDownloader.download_file(url, str(output), resume=True)
+    assert output.read_bytes() == PAYLOAD
+    assert not (tmp_path / 'data.bin.part').exists()
+    assert not (tmp_path / 'data.bin.part.json').exists()
+    gets = [r for r in file_server.requests if r[0] == 'GET']
+    assert gets[-1][2]['Range'] == f'bytes={half}-'
+    assert gets[-1][2]['If-Range'] == info.etag
+
+def test_download_file_resume_remote_changed(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    url = file_server.url('/data.bin')
+    output = tmp_path / 'data.bin'
+    (tmp_path / 'data.bin.part').write_bytes(b'x' * 1000)
+    DownloadCheckpoint(url=url, size=len(PAYLOAD), etag='"stale"', offset=1000).save(
+        str(tmp_path / 'data.bin.part.json')
+    )
+    
+    FileDownloader.download_file(url, str(output), resume=True)
+    assert output.read_bytes() == PAYLOAD
+    assert 'Range' not in file_server.requests[-1][2]
+
+def test_download_file_resume_segmented(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    file_server.fail_ranges = 1
+    url = file_server.url('/data.bin')
+    output = tmp_path / 'data.bin'
+    options = dict(max_workers=2, segment_size=256 * 1024, max_retries=0, resume=True)
+    
+    with pytest.raises(Exception):
+        FileDownloader.download_file(url, str(output), **options)
+    checkpoint = DownloadCheckpoint.load(str(tmp_path / 'data.bin.part.json'))
+    assert len(checkpoint.segments) == 4
+    assert any(done < end - start + 1 for start, end, done in checkpoint.segments)
+    
+    file_server.requests.clear()
+    FileDownloader.download_file(url, str(output), **options)
+    assert output.read_bytes() == PAYLOAD
+    assert all('If-Range' in r[2] for r in _range_requests(file_server))
+
+def test_download_file_checkpoint_only_claims_written_bytes(file_server, tmp_path, monkeypatch):
+    file_server.files['/data.bin'] = PAYLOAD
+    output = tmp_path / 'data.bin'
+    monkeypatch.setattr(FileDownloader, 'CHECKPOINT_INTERVAL', 1)
+    original_save = DownloadCheckpoint.save
+    saves = []
+    
+    def save(self, path):
+        # Read through a separate handle: only bytes that reached the OS are visible
+        if self.segments:
+            with open(f'{output}.part', 'rb') as f:
+                data = f.read()
+            for start, end, done in self.segments:
+                assert data[start:start + done] == PAYLOAD[start:start + done]
+            saves.append(path)
+        original_save(self, path)
+    
+    monkeypatch.setattr(DownloadCheckpoint, 'save', save)
+    FileDownloader.download_file(
+        file_server.url('/data.bin'),
+        str(output),
+        max_workers=4,
+        segment_size=128 * 1024,
+        chunk_size=1024,
+        resume=True
+    )
+    assert output.read_bytes() == PAYLOAD
+    assert len(saves) > 4
+
+def test_download_many(file_server, tmp_path):
+    for i in range(20):
+        file_server.files[f'/file{i}.bin'] = PAYLOAD[:1000 + i]
+    urls = [file_server.url(f'/file{i}.bin') for i in range(20)]
+    urls.append(file_server.url('/missing.bin'))
+    
+    results = list(FileDownloader.download_many(
+        urls,
+        output_dir=str(tmp_path),
+        max_workers=4,
+        max_per_host=2
+    ))
+    assert len(results) == 21
+    failed = [r for r in results if not r.ok]
+    assert [r.url for r in failed] == [file_server.url('/missing.bin')]
+    for i in range(20):
+        assert (tmp_path / f'file{i}.bin').read_bytes() == PAYLOAD[:1000 + i]
+    assert file_server.max_active <= 2
+    # Connections are reused from the pool
+    assert len(file_server.clients) <= 4
+
+def test_download_checksum(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    url = file_server.url('/data.bin')
+    sha256 = hashlib.sha256(PAYLOAD).hexdigest()
+    md5 = hashlib.md5(PAYLOAD).hexdigest()
+    
+    result = FileDownloader.download(
+        url,
+        str(tmp_path / 'a.bin'),
+        expected_digest=sha256,
+        hash_algorithms=['md5']
+    )
+    assert result.size == len(PAYLOAD)
+    assert result.digests == {'md5': md5, 'sha256': sha256}
+    assert result.throughput > 0
+    
+    # Segmented downloads are hashed after assembly
+    result = FileDownloader.download(
+        url,
+        str(tmp_path / 'b.bin'),
+        max_workers=4,
+        segment_size=100 * 1024,
+        expected_digest=f'md5:{md5}'
+    )
+    assert result.digests == {'md5': md5}
+    
+    with pytest.raises(ValueError):
+        FileDownloader.download_file(url, str(tmp_path / 'c.bin'), expected_digest='sha256:00')
+    assert not (tmp_path / 'c.bin').exists()
+
+def test_download_checksum_resume(file_server, tmp_path):
+    file_server.files['/data.bin'] = PAYLOAD
+    url = file_server.url('/data.bin')
+    info = FileDownloader.probe(url)
+    (tmp_path / 'data.bin.part').write_bytes(PAYLOAD[:1000])
+    DownloadCheckpoint(url=url, size=info.size, etag=info.etag, offset=1000).save(
+        str(tmp_path / 'data.bin.part.json')
+    )
+    
+    result = FileDownloader.download(
+        url,
+        str(tmp_path / 'data.bin'),
+        resume=True,
+        hash_algorithms=['sha256']
+    )
+    assert result.digests['sha256'] == hashlib.sha256(PAYLOAD).hexdigest()
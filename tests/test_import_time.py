@@ -0,0 +1,54 @@
+import subprocess
+import sys
+import pytest
+
+# 冷启动导入的时间预算（秒），留足余量以免在繁忙的 CI 机器上误报
+IMPORT_BUDGET = 0.5
+
+HEAVY_MODULES = ("requests", "aiohttp", "langchain", "langchain_core", "langchain_openai", "langchain_community", "numpy")
+
+def _import_profile(statement: str):
+    """在新的解释器中用 -X importtime 导入模块，返回 [(模块名, 嵌套深度, 累计耗时(微秒))]"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    profile = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            profile.append((name.strip(), depth, int(cumulative)))
+    return profile
+
+@pytest.mark.parametrize("module", [
+    "py_artisan.ai",
+    "py_artisan.ai.text_utils",
+    "py_artisan.ai.pipeline",
+    "py_artisan.ai.langchain.llm_facetory",
+    "py_artisan.ai.langchain.agents.base",
+])
+def test_light_import(module):
+    profile = _import_profile(f"import {module}")
+    imported = {name for name, _, _ in profile}
+    loaded = [name for name in HEAVY_MODULES if name in imported]
+    assert not loaded, f"{module} eagerly imports {loaded}"
+    
+    # 嵌套条目的耗时已经计入上一层的累计耗时，只统计顶层条目
+    total = sum(cost for name, depth, cost in profile if depth == 0 and name.split(".")[0] == "py_artisan")
+    assert total / 1e6 < IMPORT_BUDGET
+
+def test_lazy_submodules():
+    statement = (
+        "import sys, py_artisan.ai as ai; ai.text_utils.split_text('abc'); "
+        "print(' '.join(sorted(sys.modules)))"
+    )
+    result = subprocess.run([sys.executable, "-c", statement], capture_output=True, text=True, check=True)
+    modules = result.stdout.split()
+    assert "py_artisan.ai.text_utils" in modules
+    assert "py_artisan.ai.openai_utils" not in modules
+    assert "requests" not in modules
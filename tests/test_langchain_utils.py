@@ -1,3 +1,4 @@
+import math
 import pytest
 from py_artisan.ai.langchain.langchain_utils import (
     ChainConfig,
@@ -5,6 +6,7 @@ from py_artisan.ai.langchain.langchain_utils import (
     ConversationChain,
     DocumentChain
 )
+from py_artisan.ai.response_cache import ResponseCache
 
 def test_chain_config():
     # 测试默认配置
@@ -45,4 +47,105 @@ def test_document_chain():
     # 测试文档处理
     result = chain.run("这是一个测试文档")
     assert isinstance(result, str)
-    assert len(result) > 0 
\ No newline at end of file
+    assert len(result) > 0 
+
+def test_document_chain_map_reduce():
+    text = "".join(f"第{i}段内容。" * 20 + "\n" for i in range(40))
+    mapped = []
+    reduced = []
+    
+    def map_fn(chunk):
+        mapped.append(chunk)
+        return f"[{chunk}]"
+    
+    def reduce_fn(parts):
+        reduced.append(len(parts))
+        return "(" + "".join(parts) + ")"
+    
+    progress = []
+    chain = DocumentChain(
+        map_fn=map_fn,
+        reduce_fn=reduce_fn,
+        max_workers=8,
+        chunk_size=300,
+        chunk_overlap=0,
+        reduce_fan_in=3,
+        on_progress=lambda stage, done, total: progress.append((stage, done, total))
+    )
+    result = chain.run(text)
+    
+    stats = chain.last_stats
+    assert stats.chunks == len(mapped) > 9
+    # 每层每 reduce_fan_in 个结果合并一次，落单的结果直接进入下一层
+    expected, count = 0, stats.chunks
+    while count > 1:
+        expected += count // 3 + (count % 3 == 2)
+        count = -(-count // 3)
+    assert len(reduced) == expected
+    assert max(reduced) == 3
+    assert stats.reduce_levels == math.ceil(math.log(stats.chunks, 3))
+    assert result.count("[") == stats.chunks
+    assert progress[-1][0] == "reduce" and progress[-1][1] == progress[-1][2]
+    assert [p for p in progress if p[0] == "map"][-1] == ("map", stats.chunks, stats.chunks)
+    
+    # 重跑时全部命中缓存
+    mapped.clear()
+    reduced.clear()
+    assert chain.run(text) == result
+    assert mapped == [] and reduced == []
+    assert chain.last_stats.cache_hits > stats.chunks
+
+def test_document_chain_resume_after_failure():
+    text = "".join(f"段落{i}。" * 30 + "\n" for i in range(10))
+    calls = []
+    failing = [True]
+    
+    def flaky(chunk):
+        calls.append(chunk)
+        if "段落5" in chunk and failing[0]:
+            raise RuntimeError("upstream error")
+        return chunk[:3]
+    
+    chain = DocumentChain(map_fn=flaky, max_workers=1, chunk_size=200, chunk_overlap=0)
+    with pytest.raises(RuntimeError):
+        chain.run(text)
+    failed_calls = len(calls)
+    calls.clear()
+    failing[0] = False
+    chain.run(text)
+    # 只重新计算失败及之后尚未完成的段
+    assert len(calls) == chain.last_stats.chunks - chain.last_stats.cache_hits
+    assert len(calls) < chain.last_stats.chunks
+    assert failed_calls + len(calls) - 1 == chain.last_stats.chunks
+
+def test_document_chain_default_cache_holds_long_documents():
+    text = "".join(f"第{i}句。" for i in range(1500))
+    mapped = []
+    
+    def map_fn(chunk):
+        mapped.append(chunk)
+        return chunk
+    
+    chain = DocumentChain(map_fn=map_fn, chunk_size=8, chunk_overlap=0)
+    chain.run(text)
+    assert chain.last_stats.chunks > 1024
+    mapped.clear()
+    chain.run(text)
+    assert mapped == []
+
+def test_document_chain_cache_identity(tmp_path):
+    text = "".join(f"段落{i}。" * 30 + "\n" for i in range(5))
+    cache = ResponseCache(ttl=None)
+    upper = DocumentChain(map_fn=str.upper, cache=cache, chunk_size=200, chunk_overlap=0)
+    lower = DocumentChain(map_fn=str.lower, cache=cache, chunk_size=200, chunk_overlap=0)
+    upper.run(text)
+    lower.run(text)
+    # 处理函数不同的链不共享部分结果
+    assert lower.last_stats.cache_hits == 0
+    
+    # 持久化缓存在新的链实例（如进程重启后）中继续有效
+    path = str(tmp_path / "chain.db")
+    DocumentChain(map_fn=str.upper, cache_path=path, chunk_size=200, chunk_overlap=0).run(text)
+    chain = DocumentChain(map_fn=str.upper, cache_path=path, chunk_size=200, chunk_overlap=0)
+    chain.run(text)
+    assert chain.last_stats.cache_hits >= chain.last_stats.chunks
@@ -0,0 +1,104 @@
+import threading
+import time
+import pytest
+from py_artisan.ai.langchain.llm_facetory import LLMFactory
+from py_artisan.ai.langchain.agents.base import BaseAgent
+from py_artisan.utils.config import Config
+
+class _FakeLLM:
+    def __init__(self, config):
+        self.config = config
+
+@pytest.fixture
+def local_llm(monkeypatch):
+    """把 local provider 替换为计数的假模型，模拟耗时的加载过程"""
+    builds = []
+    
+    def create(config=None):
+        time.sleep(0.05)
+        builds.append(config)
+        return _FakeLLM(config)
+    
+    monkeypatch.setattr(LLMFactory, "_create_local_llm", staticmethod(create))
+    monkeypatch.setenv("LOCAL_MODEL_PATH", "/models/a.gguf")
+    monkeypatch.setenv("LOCAL_MODEL_TEMPERATURE", "0.2")
+    monkeypatch.setenv("LOCAL_MODEL_MAX_TOKENS", "256")
+    Config.refresh()
+    LLMFactory.evict()
+    yield builds
+    LLMFactory.evict()
+    monkeypatch.undo()
+    Config.refresh()
+
+def test_get_or_create(local_llm, monkeypatch):
+    llm = LLMFactory.get_or_create("local")
+    assert llm.config == {
+        "model_path": "/models/a.gguf", "temperature": 0.2, "max_tokens": 256,
+        "n_ctx": 2048, "n_batch": 512, "n_threads": None, "workers": 1
+    }
+    assert LLMFactory.get_or_create("LOCAL") is llm
+    assert LLMFactory.create_llm("local") is not llm
+    
+    # 配置变化后得到新的实例
+    monkeypatch.setenv("LOCAL_MODEL_PATH", "/models/b.gguf")
+    assert LLMFactory.get_or_create("local") is llm  # 读取的是配置快照
+    Config.refresh()
+    other = LLMFactory.get_or_create("local")
+    assert other is not llm
+    assert len(local_llm) == 3
+    
+    # refresh 已经移除了旧配置对应的实例
+    assert LLMFactory.evict("local") == 1
+    assert LLMFactory.get_or_create("local") is not other
+
+def test_get_or_create_concurrent(local_llm):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(LLMFactory.get_or_create("local"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(local_llm) == 1
+    assert all(llm is results[0] for llm in results)
+
+def test_prewarm_and_agents(local_llm, monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "local")
+    Config.refresh()
+    LLMFactory.prewarm(wait=False).join()
+    
+    class EchoAgent(BaseAgent):
+        def run(self, text):
+            return text
+    
+    agents = [EchoAgent() for _ in range(5)]
+    assert len(local_llm) == 1
+    assert all(agent.llm is agents[0].llm for agent in agents)
+
+def test_unsupported_provider():
+    with pytest.raises(ValueError):
+        LLMFactory.get_or_create("unknown")
+
+def test_settings_change_evicts(local_llm, monkeypatch):
+    llm = LLMFactory.get_or_create("local")
+    monkeypatch.setenv("OPENAI_API_MODEL", "gpt-4")
+    Config.refresh()
+    assert LLMFactory.get_or_create("local") is llm
+    
+    monkeypatch.setenv("LOCAL_MODEL_MAX_TOKENS", "512")
+    Config.refresh()
+    assert LLMFactory._registry == {}
+
+def test_evict_closes_pools(monkeypatch):
+    closed = []
+    
+    class Pool:
+        def close(self):
+            closed.append(self)
+    
+    class PooledLLM:
+        def __init__(self):
+            self.pool = Pool()
+    
+    monkeypatch.setattr(LLMFactory, "_registry", {("local", ()): PooledLLM(), ("openai", ()): object()})
+    assert LLMFactory.evict() == 2
+    assert len(closed) == 1
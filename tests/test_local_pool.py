@@ -0,0 +1,77 @@
+import gc
+import os
+import time
+import weakref
+import pytest
+from py_artisan.ai.langchain.local_pool import LocalInferencePool
+
+class StubModel:
+    """代替 LlamaCpp 的工作进程模型，回显 prompt 和所在进程"""
+    
+    def __init__(self, model_path, n_threads, n_batch, n_ctx, delay=0.0):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(model_path)
+        self.settings = (n_threads, n_batch, n_ctx)
+        self.delay = delay
+    
+    def invoke(self, prompt, stop=None):
+        if prompt == "fail":
+            raise RuntimeError("bad prompt")
+        if prompt == "crash":
+            os._exit(3)
+        time.sleep(self.delay)
+        return f"{prompt}|{os.getpid()}|{self.settings}"
+
+@pytest.fixture(scope="module")
+def model_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("models") / "tiny.gguf"
+    path.write_bytes(b"GGUF")
+    return str(path)
+
+def test_pool_dispatch(model_file):
+    with LocalInferencePool(model_file, workers=2, n_threads=3, n_batch=64, n_ctx=512,
+                            worker_factory=StubModel, delay=0.2, ready_timeout=60) as pool:
+        futures = [pool.submit(f"p{i}") for i in range(4)]
+        # 派发给在途请求最少的进程，负载均衡
+        assert pool.loads == [2, 2]
+        results = [future.result(10) for future in futures]
+        assert [r.split("|")[0] for r in results] == ["p0", "p1", "p2", "p3"]
+        assert len({r.split("|")[1] for r in results}) == 2
+        assert results[0].endswith("(3, 64, 512)")
+        assert pool.loads == [0, 0]
+        
+        with pytest.raises(RuntimeError, match="bad prompt"):
+            pool.invoke("fail")
+        assert pool.as_llm().invoke("hello").startswith("hello|")
+    
+    with pytest.raises(ValueError):
+        pool.submit("closed")
+
+def test_pool_load_failure(tmp_path):
+    with pytest.raises(ValueError, match="Failed to load model"):
+        LocalInferencePool(str(tmp_path / "missing.gguf"), workers=1, worker_factory=StubModel, ready_timeout=60)
+
+def test_pool_worker_crash(model_file):
+    with LocalInferencePool(model_file, workers=1, worker_factory=StubModel, ready_timeout=60) as pool:
+        # 进程退出时在途请求以异常结束，随后重新启动的进程继续处理请求
+        with pytest.raises(RuntimeError, match="exited unexpectedly"):
+            pool.invoke("crash", timeout=30)
+        assert pool.invoke("hello", timeout=60).startswith("hello|")
+        assert pool.loads == [0]
+    
+    with LocalInferencePool(model_file, workers=1, worker_factory=StubModel, ready_timeout=60, respawn=False) as pool:
+        with pytest.raises(RuntimeError, match="exited unexpectedly"):
+            pool.invoke("crash", timeout=30)
+        with pytest.raises(ValueError, match="exited"):
+            pool.submit("hello")
+
+def test_pool_garbage_collected(model_file):
+    pool = LocalInferencePool(model_file, workers=1, worker_factory=StubModel, ready_timeout=60)
+    assert pool.invoke("hello", timeout=30).startswith("hello|")
+    processes = list(pool._processes)
+    ref = weakref.ref(pool)
+    del pool
+    gc.collect()
+    # 后台线程只持有弱引用，推理池被回收时工作进程随之停止
+    assert ref() is None
+    assert not any(process.is_alive() for process in processes)
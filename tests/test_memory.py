@@ -0,0 +1,83 @@
+import threading
+import time
+from py_artisan.ai.langchain.memory import ConversationMemory, MESSAGE_OVERHEAD_TOKENS
+from py_artisan.ai.langchain.langchain_utils import ChainConfig, ConversationChain
+from py_artisan.ai.text_utils import SimpleTokenizer, TokenCounter
+
+COUNTER = TokenCounter(SimpleTokenizer())
+
+def test_window_budget():
+    memory = ConversationMemory(max_tokens=50, counter=COUNTER)
+    for i in range(100):
+        memory.append("user", f"第{i}条消息 " + "字" * 5)
+    window = memory.window()
+    assert window[-1]["content"].startswith("第99条")
+    assert memory.window_tokens <= 50
+    assert memory.window_tokens == sum(COUNTER.count(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in window)
+    # 没有摘要函数时窗口外的消息被丢弃，内存有上限
+    assert len(memory) == len(window)
+    
+    unbounded = ConversationMemory(counter=COUNTER)
+    for i in range(100):
+        unbounded.append("user", str(i))
+    assert len(unbounded) == len(unbounded.window()) == 100
+
+def test_background_summary():
+    calls = []
+    release = threading.Event()
+    
+    def summarize(previous, messages):
+        release.wait(5)
+        calls.append(len(messages))
+        return f"摘要（{(previous or '')[:2]}…共{len(messages)}条）"
+    
+    memory = ConversationMemory(max_tokens=60, counter=COUNTER, summarizer=summarize, summarize_after=4)
+    for i in range(30):
+        memory.append("user", f"第{i}条消息 " + "字" * 5)
+    # 摘要进行中追加消息不会被阻塞
+    assert len(memory) == 30
+    release.set()
+    memory.wait()
+    
+    window = memory.window()
+    assert window[0]["role"] == "system" and window[0]["content"].startswith("摘要")
+    assert window[-1]["content"].startswith("第29条")
+    assert memory.window_tokens <= 60
+    assert sum(calls) + len(memory) == 30
+    
+    memory.clear()
+    assert len(memory) == 0 and memory.window() == []
+
+def test_conversation_chain_memory():
+    chain = ConversationChain(ChainConfig(history_max_tokens=40))
+    for i in range(20):
+        chain.run(f"问题{i}")
+    assert 0 < len(chain.history) < 40
+    assert chain.history[-1]["role"] == "assistant"
+    assert chain.memory.window_tokens <= 40
+
+def test_conversation_chain_history_list_compat():
+    chain = ConversationChain()
+    chain.history.append({"role": "user", "content": "你好"})
+    chain.run("问题")
+    assert chain.history.to_list()[0] == {"role": "user", "content": "你好"}
+    assert len(chain.history) == 3
+    
+    chain.history = [{"role": "system", "content": "设定"}]
+    assert chain.history.to_list() == [{"role": "system", "content": "设定"}]
+    chain.history = []
+    assert len(chain.history) == 0
+
+def test_summary_failures_drop_backlog():
+    def summarize(previous, messages):
+        raise RuntimeError("摘要服务不可用")
+    
+    memory = ConversationMemory(
+        max_tokens=30, counter=COUNTER, summarizer=summarize, summarize_after=2, max_summary_failures=3
+    )
+    for i in range(200):
+        memory.append("user", f"第{i}条消息 " + "字" * 5)
+        memory.wait()
+    # 连续失败后窗口外积压的消息被丢弃，不会无限增长
+    assert len(memory) < 10
+    assert memory.window()[-1]["content"].startswith("第199条")
@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from py_artisan.utils import metrics
+from py_artisan.utils.metrics import MetricsRegistry
+from py_artisan.utils.file_downloader import FileDownloader
+from py_artisan.ai.openai_utils import OpenAIClient
+from py_artisan.ai.response_cache import ResponseCache
+
+def _value(snapshot, metric_type, name, **labels):
+    for item in snapshot[metric_type].get(name, []):
+        if item["labels"] == {k: str(v) for k, v in labels.items()}:
+            return item["value"]
+    return None
+
+def test_registry():
+    registry = MetricsRegistry()
+    registry.inc("requests_total")
+    with registry.span("work"):
+        pass
+    assert registry.snapshot() == {"counters": {}, "gauges": {}, "histograms": {}}
+    
+    registry.enabled = True
+    registry.inc("requests_total", route="/a")
+    registry.inc("requests_total", 2, route="/a")
+    registry.observe("size", 3.0, buckets=(1, 5))
+    registry.observe("size", 7.0)
+    with pytest.raises(RuntimeError):
+        with registry.span("work", kind="x"):
+            raise RuntimeError
+    
+    @registry.timed("job")
+    async def job():
+        await asyncio.sleep(0.01)
+    
+    asyncio.run(job())
+    snapshot = registry.snapshot()
+    assert _value(snapshot, "counters", "requests_total", route="/a") == 3
+    assert _value(snapshot, "histograms", "size")["buckets"] == [(1, 0), (5, 1), (float("inf"), 2)]
+    assert _value(snapshot, "gauges", "work_in_flight", kind="x") == 0
+    assert _value(snapshot, "counters", "work_errors_total", kind="x") == 1
+    assert _value(snapshot, "histograms", "job_seconds")["sum"] >= 0.01
+    
+    text = registry.to_prometheus(prefix="")
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/a"} 3' in text
+    assert 'size_bucket{le="5"} 1' in text and 'size_bucket{le="+Inf"} 2' in text
+    assert "size_sum 10" in text and "size_count 2" in text
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.reset()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+    metrics.reset()
+
+def test_library_instrumentation(enabled_metrics, file_server, openai_server, tmp_path):
+    file_server.files["/data.bin"] = b"x" * 100000
+    FileDownloader.download(file_server.url("/data.bin"), str(tmp_path / "data.bin"))
+    
+    client = OpenAIClient("test_key", base_url=f"{openai_server.base_url}/v1", cache=ResponseCache())
+    messages = [{"role": "user", "content": "hi"}]
+    client.chat_completion(messages, temperature=0)
+    client.chat_completion(messages, temperature=0)
+    for _ in client.chat_completion(messages, stream=True):
+        pass
+    
+    snapshot = metrics.snapshot()
+    assert _value(snapshot, "counters", "download_bytes_total") == 100000
+    assert _value(snapshot, "histograms", "download_seconds")["count"] == 1
+    assert _value(snapshot, "histograms", "download_throughput_bytes_per_second")["count"] == 1
+    assert _value(snapshot, "histograms", "openai_request_seconds", endpoint="chat")["count"] == 1
+    assert _value(snapshot, "gauges", "openai_request_in_flight", endpoint="chat") == 0
+    assert _value(snapshot, "counters", "response_cache_requests_total", result="hit") == 1
+    assert _value(snapshot, "counters", "response_cache_requests_total", result="miss") == 1
+    assert _value(snapshot, "counters", "openai_stream_tokens_total") > 0
+    assert "py_artisan_download_seconds_bucket" in metrics.to_prometheus()
@@ -0,0 +1,82 @@
+import os
+import pytest
+from pathlib import Path
+from py_artisan.ai import text_utils
+from py_artisan.ai.pipeline import ChunkRecord, TextPipeline, preprocess_corpus
+
+def _documents(tmp_path: Path):
+    texts = [
+        ("第一篇文档。访问 https://example.com 了解更多。\n" * 30),
+        ("Second document. " * 80),
+        ("第一篇文档。访问 https://example.com 了解更多。\n" * 30),  # 与第一篇重复
+    ]
+    path = tmp_path / "doc.txt"
+    path.write_text("文件中的文档，" * 100, encoding="utf-8")
+    return texts, [("a", texts[0]), ("b", texts[1]), ("c", texts[2]), path]
+
+def test_pipeline(tmp_path):
+    texts, documents = _documents(tmp_path)
+    records = list(preprocess_corpus(documents, max_length=200, overlap=20))
+    assert all(isinstance(record, ChunkRecord) for record in records)
+    assert [r.doc_id for r in records if r.doc_id == "c"] == []
+    assert {r.doc_id for r in records} == {"a", "b", str(tmp_path / "doc.txt")}
+    
+    # 偏移指向清理后文档中的位置
+    cleaned = text_utils.clean_text(texts[0])
+    for record in records:
+        if record.doc_id == "a":
+            assert cleaned[record.offset:record.offset + len(record.text)] == record.text
+    
+    no_dedupe = list(preprocess_corpus(documents, max_length=200, overlap=20, dedupe=False))
+    assert len(no_dedupe) > len(records)
+
+def test_pipeline_process_pool(tmp_path):
+    _, documents = _documents(tmp_path)
+    pipeline = TextPipeline(max_length=200, overlap=20)
+    expected = list(pipeline.run(documents))
+    assert list(pipeline.run(documents, workers=2, batch_size=1)) == expected
+    unordered = list(pipeline.run(documents, workers=2, batch_size=1, ordered=False))
+    # 重复的 a、c 两篇中先完成的一篇被保留，只比较内容
+    assert sorted((r.offset, r.text) for r in unordered) == sorted((r.offset, r.text) for r in expected)
+
+def test_pipeline_near_duplicates():
+    base = "页脚：本站内容仅供参考，转载请注明出处。联系我们 contact at example dot com。"
+    documents = [base + "第一篇", base + "第二篇", "完全不同的一段正文内容，讲的是另外一件事情。"]
+    records = list(preprocess_corpus(documents, max_length=200, overlap=20, near_duplicate_threshold=0.7))
+    assert [r.doc_id for r in records] == [0, 2]
+
+def test_pipeline_paths(tmp_path):
+    text = "访问 https://example.com/a 了解更多。第二句话！\n" * 2000 + "  \n"
+    path = tmp_path / "big.txt"
+    path.write_text(text, encoding="utf-8")
+    
+    expected = [(r.offset, r.text) for r in preprocess_corpus([text], max_length=300, overlap=30, dedupe=False)]
+    from_path = list(preprocess_corpus(paths=[str(path)], max_length=300, overlap=30, dedupe=False))
+    assert [(r.offset, r.text) for r in from_path] == expected
+    assert {r.doc_id for r in from_path} == {str(path)}
+    assert list(preprocess_corpus(paths=[("doc", str(path))], workers=1)) != []
+    
+    # 小块读取时清理结果与整体清理一致
+    cleaner = text_utils.TextCleaner(remove_numbers=True)
+    with open(path, encoding="utf-8") as f:
+        assert "".join(cleaner.iter_clean(f, read_size=97)) == cleaner.clean(text)
+
+def test_iter_clean_without_whitespace():
+    # 没有空白的长文本按 read_size 强制截断，不拆开 URL 和数字
+    text = "中文没有空格访问https://example.com/a了解更多第12345号。" * 5000
+    cleaner = text_utils.TextCleaner(remove_numbers=True, remove_punctuation=True)
+    pieces = [text[i:i + 50] for i in range(0, len(text), 50)]
+    cleaned = list(cleaner.iter_clean(iter(pieces), read_size=1000))
+    assert "".join(cleaned) == cleaner.clean(text)
+    assert len(cleaned) > 100
+    assert max(len(piece) for piece in cleaned) <= 1050
+
+def test_pipeline_path_strings_are_text(tmp_path, monkeypatch):
+    path = tmp_path / "README.md"
+    path.write_text("文件内容", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    # documents 中的字符串总是文本，即使与已存在的文件同名，也不访问文件系统
+    monkeypatch.setattr(os.path, "isfile", lambda p: pytest.fail("documents must not be stat'ed"))
+    assert [r.text for r in preprocess_corpus(["README.md"], dedupe=False)] == ["README.md"]
+    assert [r.text for r in preprocess_corpus([("a", str(path))], dedupe=False)] == [str(path)]
+    assert [r.text for r in preprocess_corpus(paths=["README.md"])] == ["文件内容"]
@@ -0,0 +1,59 @@
+import asyncio
+import io
+import threading
+import time
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from py_artisan.ai.langchain.streaming import AsyncQueueSink, NullSink, QueueSink, StdOutSink, resolve_sink
+
+def _consume(llm, sink):
+    for _ in llm.stream("hi", config={"callbacks": [sink]}):
+        pass
+
+def test_queue_sink_backpressure():
+    llm = FakeListChatModel(responses=["abcdefghij"])
+    sink = QueueSink(maxsize=2, timeout=5)
+    thread = threading.Thread(target=_consume, args=(llm, sink), daemon=True)
+    thread.start()
+    time.sleep(0.1)
+    # 队列满后生成暂停，等待消费
+    assert sink.queue.full() and sink.timings.token_count == 3
+    assert "".join(sink) == "abcdefghij"
+    thread.join()
+    assert sink.timings.token_count == 10
+    assert sink.timings.first_token_latency >= 0
+    assert len(sink.timings.gaps) == 9
+
+def test_null_and_stdout_sink():
+    llm = FakeListChatModel(responses=["hello"], sleep=0.01)
+    sink = NullSink()
+    _consume(llm, sink)
+    timings = sink.timings.to_dict()
+    assert timings["token_count"] == 5
+    assert timings["mean_gap"] >= 0.005 and timings["tokens_per_second"] > 0
+    
+    stream = io.StringIO()
+    _consume(llm, StdOutSink(stream))
+    assert stream.getvalue() == "hello"
+    
+    assert isinstance(resolve_sink("stdout"), StdOutSink)
+    assert resolve_sink(None) is None and resolve_sink(sink) is sink
+    with pytest.raises(ValueError):
+        resolve_sink("stderr")
+
+def test_async_queue_sink():
+    async def main():
+        llm = FakeListChatModel(responses=["streaming"])
+        sink = AsyncQueueSink(maxsize=1)
+        
+        async def generate():
+            async for _ in llm.astream("hi", config={"callbacks": [sink]}):
+                pass
+        
+        task = asyncio.ensure_future(generate())
+        tokens = [token async for token in sink]
+        await task
+        return tokens, sink.timings.token_count
+    
+    tokens, count = asyncio.run(main())
+    assert "".join(tokens) == "streaming" and count == 9